@@ -0,0 +1,278 @@
+# backup_db.py
+"""
+Online backups of the app database with SQLite's backup API.
+
+`backup` copies the database a few pages at a time, pausing between steps, while the app keeps
+running. In WAL mode readers and writers are never blocked by the copy, but a write made during
+the copy restarts it; after `max_restarts` restarts the copy is finished in one go while holding
+the write lock, so a busy database still gets backed up. Every run reports its throughput and
+for how long writers were blocked.
+
+Snapshots are rotated in config.BACKUP_DIR: a snapshot identical to the newest one is not kept,
+and only the newest config.BACKUP_KEEP are retained. `verify` restores a snapshot into a scratch
+file and checks its integrity and schema version; `restore` does the same and
+then copies the snapshot over the app database (stop the app first).
+
+Run from the src directory:
+    python backup_db.py snapshot
+    python backup_db.py backup path/to/copy.db
+    python backup_db.py verify db/backups/LetsInglesDB-20240101-120000.db
+    python backup_db.py restore db/backups/LetsInglesDB-20240101-120000.db
+"""
+import argparse
+import glob
+import hashlib
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+src_dir = os.path.dirname(os.path.abspath(__file__))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+import config
+from models.migrations import MIGRATIONS, get_version
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def _copy(source, dest, pages_per_step, step_pause_ms, max_restarts, stats):
+    """One stepped copy; raises _TooManyRestarts when writes keep restarting it."""
+    last = {'remaining': None, 'step_end': None}
+
+    def progress(status, remaining, total):
+        now = time.perf_counter()
+        stats['steps'] += 1
+        stats['pages'] = total
+        stats['step_seconds'] += now - last['step_end'] if last['step_end'] else now - stats['started']
+        if last['remaining'] is not None and remaining > last['remaining']:
+            stats['restarts'] += 1
+            if stats['restarts'] > max_restarts:
+                raise _TooManyRestarts()
+        last['remaining'] = remaining
+        # Between steps the source is not locked, so the app's queries run here.
+        if remaining and step_pause_ms:
+            time.sleep(step_pause_ms / 1000)
+        last['step_end'] = time.perf_counter()
+
+    source.backup(dest, pages=pages_per_step, progress=progress)
+
+
+def backup(source_path, dest_path, pages_per_step=None, step_pause_ms=None, max_restarts=3):
+    """
+    Copies the database at source_path to dest_path while it stays in use and returns a report:
+    size, seconds, MB/s, steps, restarts, whether the locked fallback was needed and
+    writer_blocked_seconds. In rollback-journal mode every step holds a shared lock, so the
+    step time counts as blocked; in WAL mode only the locked fallback blocks writers.
+    """
+    pages_per_step = pages_per_step or config.BACKUP_PAGES_PER_STEP
+    step_pause_ms = config.BACKUP_STEP_PAUSE_MS if step_pause_ms is None else step_pause_ms
+    part_path = dest_path + ".part"
+    if os.path.exists(part_path):
+        os.remove(part_path)
+
+    stats = {'steps': 0, 'pages': 0, 'restarts': 0, 'step_seconds': 0.0, 'started': time.perf_counter()}
+    source = sqlite3.connect(source_path, timeout=config.DB_POOL_TIMEOUT)
+    dest = sqlite3.connect(part_path)
+    locked_seconds = 0.0
+    try:
+        journal_mode = source.execute("PRAGMA journal_mode").fetchone()[0].lower()
+        try:
+            _copy(source, dest, pages_per_step, step_pause_ms, max_restarts, stats)
+            locked_copy = False
+        except _TooManyRestarts:
+            # A second connection holds the write lock, so nothing can change the source mid-copy.
+            locker = sqlite3.connect(source_path, timeout=config.DB_POOL_TIMEOUT, isolation_level=None)
+            try:
+                locker.execute("BEGIN IMMEDIATE")
+                lock_start = time.perf_counter()
+                source.backup(dest, pages=-1)
+                locked_seconds = time.perf_counter() - lock_start
+                locker.execute("COMMIT")
+            finally:
+                locker.close()
+            locked_copy = True
+        page_size = source.execute("PRAGMA page_size").fetchone()[0]
+        # The copy inherits WAL mode; a rollback journal keeps each snapshot a single file.
+        dest.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        dest.close()
+        source.close()
+    os.replace(part_path, dest_path)
+
+    seconds = time.perf_counter() - stats['started']
+    size = os.path.getsize(dest_path)
+    blocked = locked_seconds + (stats['step_seconds'] if journal_mode != "wal" else 0.0)
+    return {
+        'path': dest_path,
+        'bytes': size,
+        'pages': stats['pages'] or size // page_size,
+        'seconds': round(seconds, 3),
+        'mb_per_s': round(size / 1e6 / seconds, 1) if seconds else None,
+        'steps': stats['steps'],
+        'restarts': stats['restarts'],
+        'locked_copy': locked_copy,
+        'journal_mode': journal_mode,
+        'writer_blocked_seconds': round(blocked, 4),
+    }
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def list_snapshots(backup_dir=None):
+    """Returns the snapshot paths in backup_dir, oldest first."""
+    backup_dir = backup_dir or config.BACKUP_DIR
+    prefix = os.path.splitext(config.DB_NAME)[0]
+    return sorted(glob.glob(os.path.join(backup_dir, f"{prefix}-*.db")))
+
+
+def snapshot(source_path=None, backup_dir=None, keep=None, **backup_options):
+    """
+    Backs the app database up into a new timestamped snapshot and rotates old ones.
+    If the new snapshot is identical to the newest existing one it is discarded ('unchanged').
+    """
+    source_path = source_path or config.DB_PATH
+    backup_dir = backup_dir or config.BACKUP_DIR
+    keep = keep or config.BACKUP_KEEP
+    os.makedirs(backup_dir, exist_ok=True)
+
+    previous = list_snapshots(backup_dir)
+    prefix = os.path.splitext(config.DB_NAME)[0]
+    path = os.path.join(backup_dir, f"{prefix}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.db")
+    report = backup(source_path, path, **backup_options)
+
+    report['unchanged'] = bool(previous) and previous[-1] != path and _sha256(previous[-1]) == _sha256(path)
+    if report['unchanged']:
+        os.remove(path)
+        report['path'] = previous[-1]
+
+    snapshots = list_snapshots(backup_dir)
+    report['removed'] = snapshots[:-keep] if len(snapshots) > keep else []
+    for old in report['removed']:
+        os.remove(old)
+    return report
+
+
+def _check_copy(path):
+    """Runs the integrity and schema version checks on a database file and counts the rows of every table."""
+    conn = sqlite3.connect(path)
+    try:
+        integrity = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+        version = get_version(conn)
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+        row_counts = {table: conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in tables}
+    finally:
+        conn.close()
+    latest = MIGRATIONS[-1][0]
+    problems = [] if integrity == ["ok"] else integrity
+    # An older snapshot is fine: the app migrates it on start. A newer one needs newer code.
+    if version > latest:
+        problems.append(f"schema version {version} is newer than this code's {latest}")
+    return {'ok': not problems, 'problems': problems, 'schema_version': version, 'row_counts': row_counts}
+
+
+def verify(snapshot_path):
+    """Restores a snapshot into a scratch file, exactly as `restore` would, and checks the result."""
+    with tempfile.TemporaryDirectory() as tmp:
+        scratch = os.path.join(tmp, "restore-check.db")
+        source = sqlite3.connect(f"file:{snapshot_path}?mode=ro", uri=True)
+        dest = sqlite3.connect(scratch)
+        try:
+            source.backup(dest)
+        finally:
+            dest.close()
+            source.close()
+        report = _check_copy(scratch)
+    report['path'] = snapshot_path
+    return report
+
+
+def restore(snapshot_path, db_path=None):
+    """Verifies a snapshot and copies it over the app database. Returns the verify report."""
+    db_path = db_path or config.DB_PATH
+    report = verify(snapshot_path)
+    if not report['ok']:
+        return report
+    source = sqlite3.connect(f"file:{snapshot_path}?mode=ro", uri=True)
+    dest = sqlite3.connect(db_path, timeout=config.DB_POOL_TIMEOUT)
+    try:
+        source.backup(dest)
+    finally:
+        dest.close()
+        source.close()
+    report['restored_to'] = db_path
+    return report
+
+
+def _print_backup(report):
+    print(f"Backed up {report['bytes'] / 1e6:.1f} MB to {report['path']} in {report['seconds']}s "
+          f"({report['mb_per_s']} MB/s, {report['steps']} steps, {report['restarts']} restarts).")
+    locked = " (finished under the write lock)" if report['locked_copy'] else ""
+    print(f"Writers blocked for {report['writer_blocked_seconds']}s{locked}; journal mode {report['journal_mode']}.")
+
+
+def _print_check(report):
+    if report['ok']:
+        print(f"{report['path']}: OK (schema version {report['schema_version']}).")
+    else:
+        print(f"{report['path']}: FAILED")
+        for problem in report['problems']:
+            print(f"    {problem}")
+    for table, count in report['row_counts'].items():
+        print(f"    {table}: {count} rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Online backup, snapshot rotation and restore for the app database.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    snapshot_parser = commands.add_parser("snapshot", help="back up into a new rotated snapshot in BACKUP_DIR")
+    snapshot_parser.add_argument("--keep", type=int, default=config.BACKUP_KEEP, help="snapshots to retain")
+    backup_parser = commands.add_parser("backup", help="back up to a given file")
+    backup_parser.add_argument("dest")
+    for sub in (snapshot_parser, backup_parser):
+        sub.add_argument("--pages", type=int, default=config.BACKUP_PAGES_PER_STEP, help="pages copied per step")
+        sub.add_argument("--pause-ms", type=float, default=config.BACKUP_STEP_PAUSE_MS, help="pause between steps")
+    commands.add_parser("verify", help="restore a snapshot into a scratch file and check it").add_argument("snapshot")
+    commands.add_parser("restore", help="verify a snapshot, then copy it over the app database").add_argument("snapshot")
+    options = parser.parse_args()
+
+    try:
+        if options.command == "snapshot":
+            report = snapshot(keep=options.keep, pages_per_step=options.pages, step_pause_ms=options.pause_ms)
+            if report['unchanged']:
+                print(f"No changes since {report['path']}; snapshot not kept.")
+            else:
+                _print_backup(report)
+            for old in report['removed']:
+                print(f"Removed old snapshot {old}")
+        elif options.command == "backup":
+            _print_backup(backup(config.DB_PATH, options.dest, options.pages, options.pause_ms))
+        elif options.command == "verify":
+            report = verify(options.snapshot)
+            _print_check(report)
+            sys.exit(0 if report['ok'] else 1)
+        else:
+            report = restore(options.snapshot)
+            _print_check(report)
+            if not report['ok']:
+                print("Snapshot failed verification; the database was not touched.")
+                sys.exit(1)
+            print(f"Restored {options.snapshot} to {report['restored_to']}.")
+    except sqlite3.Error as e:
+        print(f"Database error during {options.command}: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# benchmarks/bench_assignment.py
+"""
+Compares the greedy and optimal matching strategies of MatchingService:
+match count, total score and run time on synthetic populations.
+
+Run from the src directory:
+    python -m benchmarks.bench_assignment
+"""
+import os
+import sys
+import time
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from benchmarks.synthetic import make_population
+from services.instructor_index import InstructorIndex
+from services.matching_service import MatchingService
+
+# (pending requests, instructors)
+SIZES = [(1000, 1000), (2000, 300), (10000, 1000), (10000, 5000)]
+
+
+def run(n_requests, n_instructors):
+    requests, instructors, skill_rows, availability_rows = make_population(n_requests, n_instructors)
+    index = InstructorIndex(instructors, skill_rows, availability_rows)
+    service = MatchingService(None, None)
+
+    results = {}
+    for strategy, match in (("greedy", service._match_batch), ("optimal", service._match_optimal)):
+        start = time.perf_counter()
+        matches = match(requests, instructors, index)
+        elapsed = time.perf_counter() - start
+        results[strategy] = (len(matches), sum(m['score'] for m in matches), elapsed)
+    return results
+
+
+def main():
+    print(f"{'size':>12} {'strategy':>9} {'matches':>8} {'total score':>12} {'time (s)':>9}")
+    for n_requests, n_instructors in SIZES:
+        size = f"{n_requests}x{n_instructors}"
+        for strategy, (count, total, elapsed) in run(n_requests, n_instructors).items():
+            print(f"{size:>12} {strategy:>9} {count:>8} {total:>12.1f} {elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# benchmarks/bench_bulk_assign.py
+"""
+Compares saving a matching run's assignments one request at a time (one transaction and
+commit per row, as the admin run used to) with Request.assign_many (one executemany in a
+single transaction).
+
+Run from the src directory:
+    python -m benchmarks.bench_bulk_assign
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from benchmarks.synthetic import make_population, write_database
+from models.database import Database
+from models.request import Request
+
+RUN_SIZES = [100, 1000, 10000]
+INSTRUCTORS = 500
+
+
+def per_row(model, assignments):
+    return sum(1 for req_id, instructor_id in assignments if model.assign_instructor(req_id, instructor_id))
+
+
+def bulk(model, assignments):
+    return sum(1 for saved in model.assign_many(assignments).values() if saved)
+
+
+def main():
+    print(f"{'rows':>6} {'mode':>8} {'seconds':>9} {'rows/s':>10} {'saved':>6}")
+    for size in RUN_SIZES:
+        requests, instructors, skill_rows, availability_rows = make_population(size, INSTRUCTORS)
+        assignments = [
+            (request['reqId'], instructors[i % len(instructors)]['userId']) for i, request in enumerate(requests)
+        ]
+        with tempfile.TemporaryDirectory() as work_dir:
+            template_path = os.path.join(work_dir, "template.db")
+            write_database(template_path, requests, instructors, skill_rows, availability_rows)
+            for name, run in (("per-row", per_row), ("bulk", bulk)):
+                path = os.path.join(work_dir, f"{name}.db")
+                shutil.copy(template_path, path)
+                db = Database(path)
+                start = time.perf_counter()
+                saved = run(Request(db), assignments)
+                seconds = time.perf_counter() - start
+                db.close()
+                print(f"{size:>6} {name:>8} {seconds:>9.3f} {size / seconds:>10.0f} {saved:>6}")
+
+
+if __name__ == "__main__":
+    main()
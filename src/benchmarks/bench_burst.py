@@ -0,0 +1,86 @@
+# benchmarks/bench_burst.py
+"""
+Simulates a peak-hour burst of learners clicking "Find Match" at the same moment and compares
+matching each click on its own (the old synchronous path) with the BatchMatcher, which groups
+the clicks of one window into a single matching pass.
+
+Run from the src directory:
+    python -m benchmarks.bench_burst
+"""
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from benchmarks.synthetic import make_population, write_database
+from models.database import Database
+from models.request import Request
+from models.user import User
+from services.batch_matcher import BatchMatcher
+from services.matching_service import MatchingService
+
+BURSTS = [50, 200, 1000]
+INSTRUCTORS = 1000
+WINDOW_SECONDS = 0.2
+
+
+def _service(template_path, work_dir):
+    path = os.path.join(work_dir, "run.db")
+    shutil.copy(template_path, path)
+    db = Database(path)
+    service = MatchingService(User(db), Request(db))
+    service.build_instructor_index()
+    return service
+
+
+def per_click(service, request_ids):
+    start = time.perf_counter()
+    matched = 0
+    for request_id in request_ids:
+        matched += len(service.match_requests(single_request_id=request_id, assign=True))
+    return time.perf_counter() - start, len(request_ids), matched
+
+
+def batched(service, request_ids):
+    matcher = BatchMatcher(service, window_seconds=WINDOW_SECONDS)
+    done = threading.Event()
+    results = []
+    lock = threading.Lock()
+
+    def notify(match):
+        with lock:
+            results.append(match)
+            if len(results) == len(request_ids):
+                done.set()
+
+    start = time.perf_counter()
+    for request_id in request_ids:
+        matcher.submit(request_id, notify)
+    done.wait()
+    elapsed = time.perf_counter() - start
+    matcher.stop()
+    return elapsed, matcher.batches_run, sum(1 for match in results if match)
+
+
+def main():
+    print(f"{'burst':>6} {'mode':>10} {'seconds':>9} {'passes':>7} {'matched':>8}")
+    for burst in BURSTS:
+        requests, instructors, skill_rows, availability_rows = make_population(burst, INSTRUCTORS)
+        request_ids = [r['reqId'] for r in requests]
+        with tempfile.TemporaryDirectory() as work_dir:
+            template_path = os.path.join(work_dir, "template.db")
+            write_database(template_path, requests, instructors, skill_rows, availability_rows)
+            for name, run in (("per-click", per_click), ("batched", batched)):
+                seconds, passes, matched = run(_service(template_path, work_dir), request_ids)
+                print(f"{burst:>6} {name:>10} {seconds:>9.3f} {passes:>7} {matched:>8}")
+    print(f"({INSTRUCTORS} instructors, {WINDOW_SECONDS}s window; batched time includes the window wait)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/bench_cache.py
+"""
+Compares the model lookups a dashboard build repeats (Skill.get_all, Profile.get and
+User.get_by_username) with and without the read-through QueryCache, and prints the cache's
+hit rate for the run.
+
+Run from the src directory:
+    python -m benchmarks.bench_cache
+"""
+import os
+import sys
+import tempfile
+import time
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from benchmarks.synthetic import make_population, write_database
+from models.cache import QueryCache
+from models.database import Database
+from models.profile import Profile
+from models.skill import Skill
+from models.user import User
+
+LOOKUPS = 20000
+USERS = 200
+
+
+def _run(db, users):
+    skill, profile, user = Skill(db), Profile(db), User(db)
+    start = time.perf_counter()
+    for i in range(LOOKUPS):
+        user_id, user_name = users[i % len(users)]
+        skill.get_all()
+        profile.get(user_id)
+        user.get_by_username(user_name)
+    return 3 * LOOKUPS / (time.perf_counter() - start)
+
+
+def main():
+    requests, instructors, skill_rows, availability_rows = make_population(1000, 200)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        write_database(path, requests, instructors, skill_rows, availability_rows)
+        db = Database(path)
+        with db.connect(read_only=True) as conn:
+            users = [(row['userId'], row['userName']) for row in conn.execute("SELECT userId, userName FROM user LIMIT ?", (USERS,))]
+        db.close()
+
+        uncached = _run(Database(path), users)
+        cache = QueryCache(max_entries=1024, ttl_seconds=60)
+        cached = _run(Database(path, cache=cache), users)
+        print(f"{'mode':>9} {'lookups/s':>11}")
+        print(f"{'uncached':>9} {uncached:>11.0f}")
+        print(f"{'cached':>9} {cached:>11.0f}")
+        print(f"cache: {cache.to_dict()}")
+
+
+if __name__ == "__main__":
+    main()
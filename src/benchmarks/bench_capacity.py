@@ -0,0 +1,49 @@
+# benchmarks/bench_capacity.py
+"""
+Compares matching throughput with one learner per instructor per run against
+slot-based capacity matching (SESSION_LENGTH_MINUTES sessions within each availability window).
+
+Run from the src directory:
+    python -m benchmarks.bench_capacity
+"""
+import os
+import sys
+import time
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from benchmarks.synthetic import make_population
+from services.instructor_index import InstructorIndex
+from services.matching_service import MatchingService
+from services.slot_book import SlotBook
+
+SIZES = [(2000, 200), (10000, 1000), (10000, 5000)]
+SESSION_MINUTES = 60
+
+
+def run(n_requests, n_instructors):
+    requests, instructors, skill_rows, availability_rows = make_population(n_requests, n_instructors)
+    index = InstructorIndex(instructors, skill_rows, availability_rows)
+    service = MatchingService(None, None)
+
+    for strategy, match in (("greedy", service._match_batch), ("optimal", service._match_optimal)):
+        for mode in ("one per run", "slots"):
+            slots = SlotBook(availability_rows, SESSION_MINUTES) if mode == "slots" else None
+            start = time.perf_counter()
+            matches = match(requests, instructors, index, slots)
+            elapsed = time.perf_counter() - start
+            yield strategy, mode, len(matches), sum(m['score'] for m in matches), elapsed
+
+
+def main():
+    print(f"{'size':>12} {'strategy':>9} {'capacity':>12} {'matches':>8} {'total score':>12} {'time (s)':>9}")
+    for n_requests, n_instructors in SIZES:
+        size = f"{n_requests}x{n_instructors}"
+        for strategy, mode, count, total, elapsed in run(n_requests, n_instructors):
+            print(f"{size:>12} {strategy:>9} {mode:>12} {count:>8} {total:>12.1f} {elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
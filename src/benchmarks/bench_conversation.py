@@ -0,0 +1,74 @@
+# benchmarks/bench_conversation.py
+"""
+Measures opening a conversation as its history grows: the old full-history query against the
+newest page and a page deep in the history (by cursor) from Message.get_conversation.
+
+Run from the src directory:
+    python -m benchmarks.bench_conversation
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from benchmarks.synthetic import make_population, write_database
+from models.database import Database
+from models.message import Message
+
+HISTORY_SIZES = [100, 10000, 100000]
+REPEAT = 20
+
+FULL_HISTORY_SQL = """
+    SELECT m.*, u_sender.userName as senderName
+    FROM messages m
+    JOIN user u_sender ON m.senderID = u_sender.userId
+    WHERE (senderID = ? AND receiverID = ?) OR (senderID = ? AND receiverID = ?)
+    ORDER BY timestamp ASC
+"""
+
+
+def _best_ms(fn):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    requests, instructors, skill_rows, availability_rows = make_population(10, 5)
+    print(f"{'messages':>9} {'full ms':>9} {'newest page ms':>15} {'middle page ms':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in HISTORY_SIZES:
+            path = os.path.join(tmp, f"chat{size}.db")
+            write_database(path, requests, instructors, skill_rows, availability_rows)
+            db = Database(path)
+            start = datetime(2024, 1, 1)
+            rows = [
+                (1 + i % 2, 2 - i % 2, f"message {i}", (start + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S"))
+                for i in range(size)
+            ]
+            with db.connect() as conn:
+                conn.executemany("INSERT INTO messages (senderID, receiverID, content, timestamp) VALUES (?, ?, ?, ?)", rows)
+            model = Message(db)
+            middle = (rows[size // 2][3], size // 2 + 1)
+
+            def full_history():
+                with db.connect(read_only=True) as conn:
+                    return conn.execute(FULL_HISTORY_SQL, (1, 2, 2, 1)).fetchall()
+
+            full = _best_ms(full_history)
+            newest = _best_ms(lambda: model.get_conversation(1, 2))
+            older = _best_ms(lambda: model.get_conversation(1, 2, before=middle))
+            db.close()
+            print(f"{size:>9} {full:>9.2f} {newest:>15.3f} {older:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# benchmarks/bench_db_mixed.py
+"""
+Mixed read/write throughput of the SQLite store under concurrent sessions.
+
+Several threads each run a chat-like workload (mostly Message.get_conversation reads, some
+Message.create writes). "before" is a single pool of read/write connections in SQLite's
+default rollback journal; "after" is the configured PRAGMA profile with the read pool and
+the single serialized writer. Failed operations (e.g. "database is locked") are counted.
+
+Run from the src directory:
+    python -m benchmarks.bench_db_mixed
+"""
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+import config
+from benchmarks.synthetic import make_population, write_database
+from models.database import Database, _Checkout, _ConnectionPool
+from models.message import Message
+
+THREADS = [2, 8, 16]
+OPS_PER_THREAD = 400
+WRITE_SHARE = 0.2
+USERS = 200
+
+
+class SharedPoolDatabase(Database):
+    """Reads and writes share one pool of read/write connections, as before the reader/writer split."""
+    def __init__(self, db_file, pool_size=5, pragmas=None):
+        super().__init__(db_file, pool_size=pool_size, pragmas=pragmas)
+        self._shared = _ConnectionPool(lambda: self._open_connection(), pool_size, 10, 30)
+
+    def connect(self, read_only=False):
+        return _Checkout(self._shared)
+
+
+def _run(db, n_threads):
+    model = Message(db)
+    errors = []
+
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(OPS_PER_THREAD):
+            a, b = rng.randint(1, USERS), rng.randint(1, USERS)
+            try:
+                if rng.random() < WRITE_SHARE:
+                    if model.create(a, b, "hello") is None:
+                        errors.append(1)
+                else:
+                    model.get_conversation(a, b)
+            except sqlite3.Error:
+                errors.append(1)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(n_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return n_threads * OPS_PER_THREAD / elapsed, len(errors)
+
+
+def main():
+    requests, instructors, skill_rows, availability_rows = make_population(USERS, 20)
+    profile = config.DB_PRAGMA_PROFILES[config.DB_PRAGMA_PROFILE]
+    with tempfile.TemporaryDirectory() as tmp:
+        template = os.path.join(tmp, "template.db")
+        write_database(template, requests, instructors, skill_rows, availability_rows)
+        conn = sqlite3.connect(template)
+        rng = random.Random(7)
+        conn.executemany(
+            "INSERT INTO messages (senderID, receiverID, content, timestamp) VALUES (?, ?, 'seed', '2024-01-01 00:00:00')",
+            [(rng.randint(1, USERS), rng.randint(1, USERS)) for _ in range(20000)]
+        )
+        conn.commit()
+        conn.close()
+
+        print(f"{'threads':>8} {'before ops/s':>13} {'errors':>7} {'after ops/s':>12} {'errors':>7}")
+        for n_threads in THREADS:
+            row = []
+            for name, make in (("before", lambda p: SharedPoolDatabase(p, pragmas=config.DB_PRAGMA_PROFILES["rollback"])),
+                               ("after", lambda p: Database(p, pragmas=profile))):
+                path = os.path.join(tmp, f"{name}.db")
+                shutil.copy(template, path)
+                db = make(path)
+                row.extend(_run(db, n_threads))
+                db.close()
+            print(f"{n_threads:>8} {row[0]:>13.0f} {row[1]:>7} {row[2]:>12.0f} {row[3]:>7}")
+    print(f"({OPS_PER_THREAD} operations per thread, {WRITE_SHARE:.0%} writes, profile '{config.DB_PRAGMA_PROFILE}')")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_db_pool.py
+"""
+Compares opening a new SQLite connection for every model call (the old Database.connect)
+with the pooled Database, for a small indexed lookup issued from several threads at once.
+
+Run from the src directory:
+    python -m benchmarks.bench_db_pool
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from benchmarks.synthetic import make_population, write_database
+from models.database import Database
+from models.request import Request
+
+THREADS = [1, 4, 16]
+CALLS_PER_THREAD = 2000
+
+
+class UnpooledDatabase(Database):
+    """The previous behaviour: a fresh connection per call, never closed explicitly."""
+    def connect(self, read_only=False):
+        conn = sqlite3.connect(self.db_file)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+
+def _run(db, n_threads, request_ids):
+    model = Request(db)
+
+    def worker(offset):
+        for i in range(CALLS_PER_THREAD):
+            model.get_by_id(request_ids[(offset + i) % len(request_ids)])
+
+    threads = [threading.Thread(target=worker, args=(t * 97,)) for t in range(n_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return n_threads * CALLS_PER_THREAD / (time.perf_counter() - start)
+
+
+def main():
+    requests, instructors, skill_rows, availability_rows = make_population(5000, 500)
+    request_ids = [r['reqId'] for r in requests]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        write_database(path, requests, instructors, skill_rows, availability_rows)
+        print(f"{'threads':>8} {'unpooled q/s':>14} {'pooled q/s':>12}")
+        for n_threads in THREADS:
+            unpooled = _run(UnpooledDatabase(path), n_threads, request_ids)
+            pooled_db = Database(path)
+            pooled = _run(pooled_db, n_threads, request_ids)
+            pooled_db.close()
+            print(f"{n_threads:>8} {unpooled:>14.0f} {pooled:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
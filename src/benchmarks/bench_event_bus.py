@@ -0,0 +1,78 @@
+# benchmarks/bench_event_bus.py
+"""
+Measures the cost of publishing one event as the number of connected sessions grows, with
+per-user topics (EventBus on Flet's pub/sub hub) and, for comparison, a single broadcast
+channel whose handlers drop the events meant for other users. Every user has two sessions open.
+Handlers run inline here, so the times include delivery to the subscribers.
+
+Run from the src directory:
+    python -m benchmarks.bench_event_bus
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from flet.pubsub.pubsub_client import PubSubClient
+from flet.pubsub.pubsub_hub import PubSubHub
+
+from services.event_bus import EventBus, MESSAGE_CREATED, REQUEST_MATCHED
+
+SESSIONS_PER_USER = 2
+
+
+def _run(sessions, publishes, per_user_topics, rng):
+    # Without an executor the hub calls sync handlers inline; the loop is only needed for async ones.
+    loop = asyncio.new_event_loop()
+    hub = PubSubHub(loop=loop)
+    users = sessions // SESSIONS_PER_USER
+    delivered = [0]
+
+    def on_event(payload):
+        delivered[0] += 1
+
+    for session in range(sessions):
+        user_id = session // SESSIONS_PER_USER
+        client = PubSubClient(hub, f"session-{session}")
+        if per_user_topics:
+            events = EventBus(client)
+            events.subscribe(user_id, MESSAGE_CREATED, on_event)
+            events.subscribe(user_id, REQUEST_MATCHED, on_event)
+        else:
+            client.subscribe(lambda payload, user_id=user_id: payload['to'] == user_id and on_event(payload))
+
+    publisher = EventBus(PubSubClient(hub, "publisher"))
+    targets = [rng.randrange(users) for _ in range(publishes)]
+    start = time.perf_counter()
+    for user_id in targets:
+        if per_user_topics:
+            publisher.publish(user_id, MESSAGE_CREATED, {'to': user_id})
+        else:
+            hub.send_all({'to': user_id})
+    seconds = time.perf_counter() - start
+    loop.close()
+    return seconds / publishes * 1e6, delivered[0] / publishes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish cost of per-user topics against a broadcast channel.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--publishes", type=int, default=20000)
+    options = parser.parse_args()
+
+    print(f"{'sessions':>9} {'topics us/event':>16} {'broadcast us/event':>19} {'deliveries/event':>17}")
+    for sessions in options.sessions:
+        topic_us, deliveries = _run(sessions, options.publishes, True, random.Random(7))
+        # Broadcasting costs O(sessions) per event, so fewer events are enough to time it.
+        broadcast_us, _ = _run(sessions, max(50, options.publishes * 100 // sessions), False, random.Random(7))
+        print(f"{sessions:>9} {topic_us:>16.2f} {broadcast_us:>19.2f} {deliveries:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
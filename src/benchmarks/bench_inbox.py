@@ -0,0 +1,81 @@
+# benchmarks/bench_inbox.py
+"""
+Compares rendering an inbox with the old query (DISTINCT over a join of user and messages on
+an OR condition) against Message.get_conversation_partners, served from conversation_summary,
+as the messages table grows. Also reports the cost the summary trigger adds to Message.create.
+
+Run from the src directory:
+    python -m benchmarks.bench_inbox
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from benchmarks.synthetic import make_population, write_database
+from models.database import Database
+from models.message import Message
+
+MESSAGE_COUNTS = [1000, 100000, 500000]
+USERS = 200
+REPEAT = 10
+CREATES = 2000
+
+OLD_INBOX_SQL = """
+    SELECT DISTINCT u.userId, u.userName
+    FROM user u
+    JOIN messages m ON u.userId = m.senderID OR u.userId = m.receiverID
+    WHERE (m.senderID = ? OR m.receiverID = ?) AND u.userId != ?
+"""
+
+
+def _best_ms(fn):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    requests, instructors, skill_rows, availability_rows = make_population(USERS, 20)
+    rng = random.Random(7)
+    print(f"{'messages':>9} {'old inbox ms':>13} {'summary inbox ms':>17} {'create us':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in MESSAGE_COUNTS:
+            path = os.path.join(tmp, f"inbox{count}.db")
+            write_database(path, requests, instructors, skill_rows, availability_rows)
+            db = Database(path)
+            with db.connect() as conn:
+                user_ids = [row[0] for row in conn.execute("SELECT userId FROM user")]
+                rows = []
+                for i in range(count):
+                    sender, receiver = rng.sample(user_ids, 2)
+                    rows.append((sender, receiver, f"message {i}", f"2024-01-01 00:{i // 60 % 60:02d}:{i % 60:02d}"))
+                conn.executemany("INSERT INTO messages (senderID, receiverID, content, timestamp) VALUES (?, ?, ?, ?)", rows)
+            model = Message(db)
+            user_id = user_ids[0]
+
+            def old_inbox():
+                with db.connect(read_only=True) as conn:
+                    return conn.execute(OLD_INBOX_SQL, (user_id, user_id, user_id)).fetchall()
+
+            old = _best_ms(old_inbox)
+            new = _best_ms(lambda: model.get_conversation_partners(user_id))
+            start = time.perf_counter()
+            for i in range(CREATES):
+                sender, receiver = rng.sample(user_ids, 2)
+                model.create(sender, receiver, f"new {i}")
+            create_us = (time.perf_counter() - start) / CREATES * 1e6
+            db.close()
+            print(f"{count:>9} {old:>13.2f} {new:>17.3f} {create_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/bench_login.py
+"""
+Logins per second at the configured scrypt cost. A burst of concurrent logins is run through
+the controller's path (User.authenticate on the bounded hash pool) for a few pool sizes, while a
+ticker coroutine measures how long the event loop was stalled. Also times the first login of
+users with legacy SHA-256 hashes, which upgrades them, against their next login.
+
+Run from the src directory:
+    python -m benchmarks.bench_login
+    python -m benchmarks.bench_login --n 32768 --workers 1 2 4 8
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+import config
+from benchmarks.synthetic import make_population, write_database
+from models.async_models import AsyncModel
+from models.database import Database
+from models.passwords import ScryptHasher, create_hash_executor
+from models.user import User
+
+PASSWORD = "correct horse battery staple"
+
+
+async def _burst(auth, names, logins):
+    """Runs `logins` concurrent logins; returns (logins/s, longest event loop stall in ms, failures)."""
+    stalls = [0.0]
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            before = time.perf_counter()
+            await asyncio.sleep(0.005)
+            stalls[0] = max(stalls[0], time.perf_counter() - before - 0.005)
+
+    tick = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    users = await asyncio.gather(*(auth.authenticate(names[i % len(names)], PASSWORD) for i in range(logins)))
+    seconds = time.perf_counter() - start
+    done.set()
+    await tick
+    return logins / seconds, stalls[0] * 1000, sum(user is None for user in users)
+
+
+def _timed_logins(model, names):
+    start = time.perf_counter()
+    for name in names:
+        assert model.authenticate(name, PASSWORD)
+    return (time.perf_counter() - start) / len(names) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Logins/sec with scrypt password hashes.")
+    parser.add_argument("--n", type=int, default=config.PASSWORD_SCRYPT_N, help="scrypt N")
+    parser.add_argument("--r", type=int, default=config.PASSWORD_SCRYPT_R, help="scrypt r")
+    parser.add_argument("--p", type=int, default=config.PASSWORD_SCRYPT_P, help="scrypt p")
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, config.PASSWORD_HASH_WORKERS])
+    options = parser.parse_args()
+
+    hasher = ScryptHasher(n=options.n, r=options.r, p=options.p, salt_bytes=config.PASSWORD_SALT_BYTES)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        write_database(path, *make_population(10, 2))
+        db = Database(path)
+        model = User(db, hasher)
+        names = [f"bench_user_{i}" for i in range(options.users)]
+        for name in names:
+            model.create("learner", name, PASSWORD, f"{name}@example.com")
+
+        print(f"scrypt N={options.n} r={options.r} p={options.p}, {os.cpu_count()} CPU(s), {options.logins} logins per burst")
+        print(f"{'workers':>8} {'logins/s':>9} {'max loop stall ms':>18}")
+        for workers in options.workers:
+            executor = create_hash_executor(workers)
+            rate, stall, failures = asyncio.run(_burst(AsyncModel(model, executor), names, options.logins))
+            executor.shutdown()
+            assert not failures
+            print(f"{workers:>8} {rate:>9.1f} {stall:>18.1f}")
+
+        # Legacy rows: the first login verifies the SHA-256 hash and stores a scrypt one.
+        legacy = [f"legacy_user_{i}" for i in range(options.users)]
+        with db.connect() as conn:
+            conn.executemany(
+                "INSERT INTO user (userRole, userName, userPass, userEmail) VALUES ('learner', ?, ?, ?)",
+                [(name, hashlib.sha256(PASSWORD.encode()).hexdigest(), f"{name}@example.com") for name in legacy]
+            )
+            conn.commit()
+        upgrade_ms = _timed_logins(model, legacy)
+        next_ms = _timed_logins(model, legacy)
+        with db.connect(read_only=True) as conn:
+            upgraded = conn.execute("SELECT COUNT(*) FROM user WHERE userName LIKE 'legacy_user_%' AND userPass LIKE 'scrypt$%'").fetchone()[0]
+        print(f"legacy SHA-256 login with upgrade: {upgrade_ms:.1f} ms, next login: {next_ms:.1f} ms ({upgraded}/{len(legacy)} upgraded)")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# benchmarks/bench_matching.py
+"""
+End-to-end benchmark of MatchingService.match_requests against a throwaway SQLite database.
+
+A synthetic population (learners, instructors, skills, availability and coordinates around
+the default Quezon City location) is written with a fixed seed into a temporary file that has
+the application schema. Each repetition runs on a fresh copy, so the timings include every
+query the matching run makes. Results are printed as JSON, so runs on different commits can be
+compared with --compare.
+
+Run from the src directory, e.g.:
+    python -m benchmarks.bench_matching --learners 10000 --instructors 1000 --output before.json
+    python -m benchmarks.bench_matching --learners 10000 --instructors 1000 --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from benchmarks.synthetic import make_population, write_database
+from models.database import Database
+from models.request import Request
+from models.user import User
+from services.matching_service import MatchingService, MATCHING_STRATEGIES
+
+
+class CountingDatabase(Database):
+    """Database that counts every SQL statement executed on the connections it hands out."""
+    def __init__(self, db_file):
+        self.query_count = 0
+        super().__init__(db_file)
+
+    def _open_connection(self, read_only=False):
+        conn = super()._open_connection(read_only)
+        conn.set_trace_callback(self._count)
+        return conn
+
+    def _count(self, statement):
+        self.query_count += 1
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=src_dir, text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _run_once(template_path, work_dir, options, trace_memory=False):
+    """Runs one matching pass on a fresh copy of the template database."""
+    path = os.path.join(work_dir, "run.db")
+    shutil.copy(template_path, path)
+    db = CountingDatabase(path)
+    service = MatchingService(User(db), Request(db), session_minutes=options.session_minutes)
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    matches = service.match_requests(
+        batch=options.batch, strategy=options.strategy, parallel=options.parallel, workers=options.workers,
+        assign=options.assign
+    )
+    elapsed = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'seconds': elapsed,
+        'matches': len(matches),
+        'total_score': sum(match['score'] for match in matches),
+        'queries': db.query_count,
+        'peak_python_bytes': peak,
+    }
+
+
+def run(options):
+    requests, instructors, skill_rows, availability_rows = make_population(
+        options.requests or options.learners, options.instructors, seed=options.seed, n_learners=options.learners
+    )
+    with tempfile.TemporaryDirectory() as work_dir:
+        template_path = os.path.join(work_dir, "template.db")
+        write_database(template_path, requests, instructors, skill_rows, availability_rows)
+
+        runs = [_run_once(template_path, work_dir, options) for _ in range(options.repeat)]
+        # Allocation tracing slows Python down, so memory is measured on a separate pass.
+        memory_run = _run_once(template_path, work_dir, options, trace_memory=True)
+
+    times = [r['seconds'] for r in runs]
+    best = min(times)
+    return {
+        'benchmark': "match_requests",
+        'commit': _git_commit(),
+        'timestamp': datetime.now().isoformat(timespec="seconds"),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'params': {
+            'learners': options.learners,
+            'requests': len(requests),
+            'instructors': options.instructors,
+            'seed': options.seed,
+            'strategy': options.strategy,
+            'batch': options.batch,
+            'parallel': options.parallel,
+            'workers': options.workers,
+            'session_minutes': options.session_minutes,
+            'assign': options.assign,
+            'repeat': options.repeat,
+        },
+        'results': {
+            'matches': runs[0]['matches'],
+            'total_score': round(runs[0]['total_score'], 3),
+            'seconds_best': round(best, 4),
+            'seconds_median': round(statistics.median(times), 4),
+            'matches_per_sec': round(runs[0]['matches'] / best, 1) if best else None,
+            'queries': runs[0]['queries'],
+            'peak_python_mb': round(memory_run['peak_python_bytes'] / 2**20, 2),
+        },
+    }
+
+
+def compare(result, baseline_path):
+    """Prints the relative change of each numeric result against a previous JSON run."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    if baseline.get('params') != result['params']:
+        print("warning: baseline was run with different parameters", file=sys.stderr)
+    print(f"{'metric':>16} {'baseline':>12} {'current':>12} {'change':>8}", file=sys.stderr)
+    for key, value in result['results'].items():
+        before = baseline.get('results', {}).get(key)
+        if isinstance(value, (int, float)) and isinstance(before, (int, float)) and before:
+            print(f"{key:>16} {before:>12} {value:>12} {100 * (value - before) / before:>+7.1f}%", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--learners", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=None, help="pending requests (default: one per learner)")
+    parser.add_argument("--instructors", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--strategy", choices=MATCHING_STRATEGIES, default="greedy")
+    parser.add_argument("--batch", action="store_true", help="use vectorized batch scoring")
+    parser.add_argument("--parallel", action="store_true", help="shard by requestDay on a process pool")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--session-minutes", type=int, default=None, help="match by session slots of this length")
+    parser.add_argument("--assign", action="store_true", help="also write the assignments, as the admin run does")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the JSON result to this file instead of stdout")
+    parser.add_argument("--compare", help="JSON result of an earlier run to compare against")
+    options = parser.parse_args()
+
+    result = run(options)
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(result, f, indent=2)
+    else:
+        print(json.dumps(result, indent=2))
+    if options.compare:
+        compare(result, options.compare)
+
+
+if __name__ == "__main__":
+    main()
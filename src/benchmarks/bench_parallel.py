@@ -0,0 +1,49 @@
+# benchmarks/bench_parallel.py
+"""
+Compares serial batch matching with requestDay-sharded parallel matching.
+
+Run from the src directory:
+    python -m benchmarks.bench_parallel
+"""
+import os
+import sys
+import time
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from benchmarks.synthetic import make_population
+from services.instructor_index import InstructorIndex
+from services.matching_service import MatchingService
+
+SIZES = [(10000, 5000), (50000, 5000)]
+WORKER_COUNTS = [1, 2, 4, os.cpu_count()]
+
+
+def run(n_requests, n_instructors):
+    requests, instructors, skill_rows, availability_rows = make_population(n_requests, n_instructors)
+    index = InstructorIndex(instructors, skill_rows, availability_rows)
+    service = MatchingService(None, None)
+
+    start = time.perf_counter()
+    matches = service._match_batch(requests, instructors, index)
+    yield "serial", len(matches), sum(m['score'] for m in matches), time.perf_counter() - start
+
+    for workers in sorted(set(WORKER_COUNTS)):
+        start = time.perf_counter()
+        matches = service._match_parallel(requests, instructors, index, workers)
+        yield f"{workers} workers", len(matches), sum(m['score'] for m in matches), time.perf_counter() - start
+
+
+def main():
+    print(f"cpu_count={os.cpu_count()}")
+    print(f"{'size':>12} {'mode':>10} {'matches':>8} {'total score':>12} {'time (s)':>9}")
+    for n_requests, n_instructors in SIZES:
+        size = f"{n_requests}x{n_instructors}"
+        for mode, count, total, elapsed in run(n_requests, n_instructors):
+            print(f"{size:>12} {mode:>10} {count:>8} {total:>12.1f} {elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
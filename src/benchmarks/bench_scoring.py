@@ -0,0 +1,74 @@
+# benchmarks/bench_scoring.py
+"""
+Compares the scalar scoring loop of MatchingService against the vectorized batch scorer.
+
+Run from the src directory:
+    python -m benchmarks.bench_scoring
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from benchmarks.synthetic import make_population
+from models.skill import skills_to_mask
+from services.instructor_index import InstructorIndex
+from services.matching_service import MatchingService
+
+SIZES = [(1000, 1000), (10000, 5000)]
+# The scalar loop is too slow to run in full on large inputs, so it is timed
+# on a sample of requests and extrapolated linearly.
+SCALAR_SAMPLE = 200
+
+
+def _scalar_scores(service, requests, instructors, index):
+    scores = np.empty((len(requests), len(instructors)), dtype=float)
+    for i, request in enumerate(requests):
+        required_mask = skills_to_mask(map(int, request['reqSkills'].split(',')))
+        for j, instructor in enumerate(instructors):
+            scores[i, j] = service._calculate_match_score(request, required_mask, instructor, index)
+    return scores
+
+
+def run(n_requests, n_instructors):
+    requests, instructors, skill_rows, availability_rows = make_population(n_requests, n_instructors)
+    index = InstructorIndex(instructors, skill_rows, availability_rows)
+    service = MatchingService(None, None)
+
+    sample = requests[:SCALAR_SAMPLE]
+    start = time.perf_counter()
+    scalar = _scalar_scores(service, sample, instructors, index)
+    scalar_time = (time.perf_counter() - start) * len(requests) / len(sample)
+
+    start = time.perf_counter()
+    vectorized = service.score_matrix(requests, instructors, index)
+    vector_time = time.perf_counter() - start
+
+    max_diff = float(np.max(np.abs(vectorized[:len(sample)] - scalar)))
+    return {
+        'requests': n_requests,
+        'instructors': n_instructors,
+        'scalar_s': scalar_time,
+        'vectorized_s': vector_time,
+        'speedup': scalar_time / vector_time,
+        'max_abs_diff': max_diff,
+    }
+
+
+def main():
+    print(f"{'size':>12} {'scalar (s)':>12} {'vector (s)':>12} {'speedup':>9} {'max |diff|':>12}")
+    for n_requests, n_instructors in SIZES:
+        result = run(n_requests, n_instructors)
+        size = f"{n_requests}x{n_instructors}"
+        print(f"{size:>12} {result['scalar_s']:>12.2f} {result['vectorized_s']:>12.3f} "
+              f"{result['speedup']:>8.1f}x {result['max_abs_diff']:>12.2e}")
+    print(f"(scalar times extrapolated from the first {SCALAR_SAMPLE} requests)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# benchmarks/bench_search.py
+"""
+Full-text search on a synthetic chat corpus (a million messages by default, words drawn from
+a Zipf-distributed vocabulary): the cost of loading it with the FTS triggers in place, then
+Message.search against LIKE '%word%' over the caller's own messages and over the whole table.
+
+Run from the src directory:
+    python -m benchmarks.bench_search
+    python -m benchmarks.bench_search --messages 100000
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from benchmarks.synthetic import make_population, write_database
+from models.database import Database
+from models.message import Message
+
+WORDS = (
+    "grammar vocabulary pronunciation fluency listening lesson practice question answer sentence "
+    "verb noun adjective tense past present future reading writing speaking homework schedule "
+    "session tomorrow today monday friday thanks hello please sorry great good better example "
+    "meaning word phrase idiom accent conversation exercise mistake correct review quiz test"
+).split()
+# Made-up words added to the vocabulary, so word frequencies follow a Zipf curve as in real text.
+EXTRA_WORDS = 20000
+QUERIES = 200
+INSERT_CHUNK = 50000
+
+
+def _vocabulary(rng):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    extra = {"".join(rng.choice(letters) for _ in range(rng.randint(4, 9))) for _ in range(EXTRA_WORDS)}
+    vocabulary = list(WORDS) + sorted(extra - set(WORDS))
+    weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    return vocabulary, weights
+
+
+def _sentence(rng, vocabulary, weights):
+    return " ".join(rng.choices(vocabulary, cum_weights=weights, k=rng.randint(4, 16)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=2000)
+    options = parser.parse_args()
+
+    rng = random.Random(11)
+    vocabulary, weights = _vocabulary(rng)
+    requests, instructors, skill_rows, availability_rows = make_population(options.users, options.users // 10)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "search.db")
+        write_database(path, requests, instructors, skill_rows, availability_rows)
+        db = Database(path)
+        with db.connect(read_only=True) as conn:
+            user_ids = [row[0] for row in conn.execute("SELECT userId FROM user")]
+
+        start = time.perf_counter()
+        for offset in range(0, options.messages, INSERT_CHUNK):
+            rows = []
+            for i in range(offset, min(offset + INSERT_CHUNK, options.messages)):
+                sender, receiver = rng.sample(user_ids, 2)
+                rows.append((sender, receiver, _sentence(rng, vocabulary, weights), f"2024-01-01 {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}"))
+            with db.connect() as conn:
+                conn.executemany("INSERT INTO messages (senderID, receiverID, content, timestamp) VALUES (?, ?, ?, ?)", rows)
+        load = time.perf_counter() - start
+        print(f"Loaded {options.messages} messages with the search and inbox triggers in {load:.1f}s "
+              f"({options.messages / load:.0f} rows/s); database {os.path.getsize(path) / 1e6:.0f} MB.")
+
+        model = Message(db)
+        # Query words follow the corpus distribution; half are typed-so-far prefixes.
+        searches = [
+            (rng.choice(user_ids), word if rng.random() < 0.5 else word[:max(3, len(word) - 2)])
+            for word in rng.choices(vocabulary, cum_weights=weights, k=QUERIES)
+        ]
+        like_own = """
+            SELECT messageID FROM messages
+            WHERE (senderID = ? OR receiverID = ?) AND content LIKE ?
+            ORDER BY timestamp DESC LIMIT 20
+        """
+        like_all = "SELECT messageID FROM messages WHERE content LIKE ? LIMIT 20 OFFSET 100000"
+
+        def run(fn):
+            start = time.perf_counter()
+            for user_id, word in searches:
+                fn(user_id, word)
+            return (time.perf_counter() - start) / len(searches) * 1000
+
+        with db.connect(read_only=True) as conn:
+            timings = {
+                "Message.search (FTS5)": run(lambda user_id, word: model.search(user_id, word)),
+                "LIKE, own messages": run(lambda user_id, word: conn.execute(like_own, (user_id, user_id, f"%{word}%")).fetchall()),
+            }
+            # A whole-table LIKE is slow enough that a handful of runs shows it.
+            searches = searches[:5]
+            timings["LIKE, whole table"] = run(lambda user_id, word: conn.execute(like_all, (f"%{word}%",)).fetchall())
+        db.close()
+
+    for name, ms in timings.items():
+        print(f"{name:>24}: {ms:9.2f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
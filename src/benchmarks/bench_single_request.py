@@ -0,0 +1,76 @@
+# benchmarks/bench_single_request.py
+"""
+Measures the latency of matching a single new request (a learner's "Find Match" click)
+against a growing backlog of pending requests, comparing the old approach of loading and
+filtering the full pending list with the Request.get_by_id + warm instructor index fast path.
+
+Run from the src directory:
+    python -m benchmarks.bench_single_request
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from benchmarks.synthetic import make_population, write_database
+from models.database import Database
+from models.request import Request
+from models.user import User
+from services.matching_service import MatchingService
+
+BACKLOGS = [1000, 10000, 50000]
+INSTRUCTORS = 1000
+CLICKS = 50
+
+
+def _legacy_single_match(service, request_id):
+    """The previous single-request path: filter every pending row, then rebuild the instructor index."""
+    requests = [r for r in service.request_model.get_pending() if r['reqId'] == request_id]
+    index = service.build_instructor_index()
+    return [service._find_best_instructor_for_request(r, index.instructors, index) for r in requests]
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples) * 1000, samples[int(len(samples) * 0.95) - 1] * 1000
+
+
+def run(n_pending):
+    requests, instructors, skill_rows, availability_rows = make_population(n_pending, INSTRUCTORS)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        write_database(path, requests, instructors, skill_rows, availability_rows)
+        db = Database(path)
+        service = MatchingService(User(db), Request(db))
+        service.build_instructor_index() # Warm the cache as a previous run would have
+
+        step = max(1, n_pending // CLICKS)
+        request_ids = [r['reqId'] for r in requests[::step][:CLICKS]]
+
+        results = {}
+        for name, match in (("legacy", lambda i: _legacy_single_match(service, i)),
+                            ("fast path", lambda i: service.match_requests(single_request_id=i))):
+            samples = []
+            for request_id in request_ids:
+                start = time.perf_counter()
+                match(request_id)
+                samples.append(time.perf_counter() - start)
+            results[name] = _percentiles(samples)
+        return results
+
+
+def main():
+    print(f"{'pending':>8} {'path':>10} {'p50 (ms)':>10} {'p95 (ms)':>10}")
+    for n_pending in BACKLOGS:
+        for name, (p50, p95) in run(n_pending).items():
+            print(f"{n_pending:>8} {name:>10} {p50:>10.2f} {p95:>10.2f}")
+    print(f"({INSTRUCTORS} instructors, {CLICKS} clicks per backlog size)")
+
+
+if __name__ == "__main__":
+    main()
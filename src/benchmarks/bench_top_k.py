@@ -0,0 +1,51 @@
+# benchmarks/bench_top_k.py
+"""
+Measures MatchingService.top_k latency for a single request as the number of instructors grows.
+
+Run from the src directory:
+    python -m benchmarks.bench_top_k
+"""
+import os
+import statistics
+import sys
+import time
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from benchmarks.synthetic import make_population
+from services.instructor_index import InstructorIndex
+from services.matching_service import MatchingService
+
+INSTRUCTOR_COUNTS = [1000, 5000, 20000]
+QUERIES = 200
+K = 5
+
+
+def run(n_instructors):
+    requests, instructors, skill_rows, availability_rows = make_population(QUERIES, n_instructors)
+    service = MatchingService(None, None, cache_ttl=float('inf'))
+    index = InstructorIndex(instructors, skill_rows, availability_rows)
+    service._warm_index = index
+    service._sync_spatial_index(instructors)
+
+    samples = []
+    for request in requests:
+        start = time.perf_counter()
+        service.top_k(request, K)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return statistics.median(samples) * 1000, samples[int(len(samples) * 0.95) - 1] * 1000
+
+
+def main():
+    print(f"{'instructors':>12} {'p50 (ms)':>10} {'p95 (ms)':>10}")
+    for n_instructors in INSTRUCTOR_COUNTS:
+        p50, p95 = run(n_instructors)
+        print(f"{n_instructors:>12} {p50:>10.2f} {p95:>10.2f}")
+    print(f"(k={K}, {QUERIES} requests)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/bench_write_behind.py
+"""
+Compares chat messages written with one commit each (Message.create as before) against the
+group-committing write-behind queue, with several threads sending at once as concurrent
+sessions would. Uses the "wal" PRAGMA profile with synchronous=FULL, so every commit is
+an fsync.
+
+Run from the src directory:
+    python -m benchmarks.bench_write_behind
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+import config
+from benchmarks.synthetic import make_population, write_database
+from models.database import Database
+from models.message import Message
+
+THREADS = [1, 8, 32]
+MESSAGES_PER_THREAD = 200
+
+
+def _run(db, n_threads):
+    model = Message(db)
+
+    def worker(sender):
+        for i in range(MESSAGES_PER_THREAD):
+            model.create(sender, sender + 1, f"message {i}")
+
+    threads = [threading.Thread(target=worker, args=(t + 1,)) for t in range(n_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return n_threads * MESSAGES_PER_THREAD / (time.perf_counter() - start)
+
+
+def main():
+    requests, instructors, skill_rows, availability_rows = make_population(100, 50)
+    pragmas = dict(config.DB_PRAGMA_PROFILES["wal"], synchronous="FULL")
+    print(f"{'threads':>8} {'per-row msg/s':>14} {'grouped msg/s':>14} {'rows/commit':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_threads in THREADS:
+            path = os.path.join(tmp, f"bench{n_threads}.db")
+            write_database(path, requests, instructors, skill_rows, availability_rows)
+            direct = Database(path, pragmas=pragmas)
+            per_row = _run(direct, n_threads)
+            direct.close()
+
+            grouped_db = Database(path, pragmas=pragmas)
+            write_queue = grouped_db.enable_write_behind(config.DB_WRITE_BATCH_ROWS, config.DB_WRITE_BATCH_MS)
+            grouped = _run(grouped_db, n_threads)
+            grouped_db.close()
+            rows_per_commit = write_queue.rows_written / max(write_queue.batches_written, 1)
+            print(f"{n_threads:>8} {per_row:>14.0f} {grouped:>14.0f} {rows_per_commit:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# benchmarks/synthetic.py
+import random
+import sqlite3
+
+import config
+from models.migrations import apply_migrations
+from services.instructor_index import DAYS_OF_WEEK
+
+# Default user location assigned at registration (see Controller.handle_register).
+DEFAULT_LAT = 14.6760
+DEFAULT_LONG = 121.0437
+
+SKILL_IDS = [1, 2, 3, 4, 5]
+
+
+def _location(rng, spread=0.35, missing_rate=0.02):
+    """Random coordinates around the default location; a small share of users have no location."""
+    if rng.random() < missing_rate:
+        return None, None
+    return DEFAULT_LAT + rng.uniform(-spread, spread), DEFAULT_LONG + rng.uniform(-spread, spread)
+
+
+def make_population(n_requests, n_instructors, seed=42, n_learners=None,
+                    skills_per_instructor=(2, 4), days_per_instructor=(2, 5), skills_per_request=(1, 2),
+                    spread=0.35, missing_rate=0.02):
+    """
+    Builds an in-memory synthetic population shaped like the model rows used by MatchingService.
+    Every request comes from its own learner unless n_learners is given, in which case the
+    requests are spread round-robin over that many learners.
+    Returns (requests, instructors, skill_rows, availability_rows).
+    """
+    rng = random.Random(seed)
+    # Separate stream for working hours, so adding them did not change the rest of the population.
+    hours_rng = random.Random(seed + 1)
+
+    instructors = []
+    skill_rows = []
+    availability_rows = []
+    for i in range(n_instructors):
+        instructor_id = i + 1
+        lat, lon = _location(rng, spread, missing_rate)
+        instructors.append({'userId': instructor_id, 'userLat': lat, 'userLong': lon})
+        for skill_id in rng.sample(SKILL_IDS, rng.randint(*skills_per_instructor)):
+            skill_rows.append({'instructorID': instructor_id, 'skillID': skill_id})
+        for day in rng.sample(DAYS_OF_WEEK, rng.randint(*days_per_instructor)):
+            start_hour = hours_rng.randint(7, 14)
+            end_hour = min(start_hour + hours_rng.randint(2, 8), 22)
+            availability_rows.append({
+                'instructorID': instructor_id, 'day': day,
+                'startTime': f"{start_hour:02d}:00", 'endTime': f"{end_hour:02d}:00"
+            })
+
+    if n_learners:
+        learner_rng = random.Random(seed + 2)
+        learner_locations = [_location(learner_rng, spread, missing_rate) for _ in range(n_learners)]
+
+    requests = []
+    for r in range(n_requests):
+        if n_learners:
+            learner = r % n_learners
+            lat, lon = learner_locations[learner]
+        else:
+            learner = r
+            lat, lon = _location(rng, spread, missing_rate)
+        skills = rng.sample(SKILL_IDS, rng.randint(*skills_per_request))
+        requests.append({
+            'reqId': r + 1,
+            'userId': n_instructors + learner + 1,
+            'reqSkills': ",".join(map(str, skills)),
+            'requestDay': rng.choice(DAYS_OF_WEEK),
+            'userName': f"learner{learner + 1}",
+            'userLat': lat,
+            'userLong': lon,
+        })
+
+    return requests, instructors, skill_rows, availability_rows
+
+
+# Tables FTS5 creates next to each full-text index.
+FTS5_SHADOW_SUFFIXES = ("data", "idx", "docsize", "config", "content")
+
+
+def copy_schema(source_path, conn):
+    """Creates every table, index, view and trigger of the database at source_path (read-only) in conn, without data."""
+    source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True)
+    try:
+        # Tables first: indexes, views and triggers can only be created once the tables they refer to exist.
+        rows = source.execute("""
+            SELECT name, sql FROM sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'
+            ORDER BY CASE type WHEN 'table' THEN 0 WHEN 'index' THEN 1 WHEN 'view' THEN 2 ELSE 3 END, rowid
+        """).fetchall()
+    finally:
+        source.close()
+    # CREATE VIRTUAL TABLE makes its own shadow tables (e.g. messages_fts_data), so they are not copied.
+    virtual_tables = [name for name, sql in rows if sql.upper().startswith("CREATE VIRTUAL TABLE")]
+    shadow_tables = {f"{table}_{suffix}" for table in virtual_tables for suffix in FTS5_SHADOW_SUFFIXES}
+    for name, statement in rows:
+        if name not in shadow_tables:
+            conn.execute(statement)
+
+
+def write_database(path, requests, instructors, skill_rows, availability_rows, schema_source=config.DB_PATH):
+    """
+    Writes a synthetic population into a fresh SQLite file at `path`, using the schema of the
+    application database brought up to date by the migrations. Learners are created from the
+    requests' userId and location.
+    Instructors get no password, so the file is only useful for benchmarks.
+    """
+    conn = sqlite3.connect(path)
+    try:
+        copy_schema(schema_source, conn)
+        conn.executemany(
+            "INSERT INTO skills (skillID, skillName) VALUES (?, ?)",
+            [(skill_id, f"Skill {skill_id}") for skill_id in SKILL_IDS]
+        )
+        conn.executemany(
+            "INSERT INTO user (userID, userRole, userName, userPass, userEmail, userLat, userLong) VALUES (?, 'instructor', ?, '', ?, ?, ?)",
+            [(i['userId'], f"instructor{i['userId']}", f"instructor{i['userId']}@example.com", i['userLat'], i['userLong']) for i in instructors]
+        )
+        conn.executemany(
+            "INSERT INTO user (userID, userRole, userName, userPass, userEmail, userLat, userLong) VALUES (?, 'learner', ?, '', ?, ?, ?)",
+            list({r['userId']: (r['userId'], r['userName'], f"{r['userName']}@example.com", r['userLat'], r['userLong']) for r in requests}.values())
+        )
+        conn.executemany(
+            "INSERT INTO instructor_skills (instructorID, skillID) VALUES (:instructorID, :skillID)", skill_rows
+        )
+        conn.executemany(
+            "INSERT INTO instructor_availability (instructorID, day, startTime, endTime) VALUES (:instructorID, :day, :startTime, :endTime)",
+            availability_rows
+        )
+        conn.executemany(
+            "INSERT INTO request (reqId, userId, reqSkills, requestDay, fulfilled) VALUES (?, ?, ?, ?, 'pending')",
+            [(r['reqId'], r['userId'], r['reqSkills'], r['requestDay']) for r in requests]
+        )
+        conn.commit()
+        apply_migrations(conn)
+    finally:
+        conn.close()
@@ -0,0 +1,191 @@
+# check_query_plans.py
+"""
+Checks that no model query falls back to a full table scan.
+
+A throwaway database is built from the migrations alone, every public model method is called
+once with sample arguments, and each SQL statement they run is captured and passed through
+EXPLAIN QUERY PLAN. Any step that scans a whole table (SCAN, with or without an index) fails
+the check, unless the method is listed in INTENTIONAL_SCANS because it reads the whole table
+on purpose. New model methods must be added to MODEL_CALLS, otherwise the check fails too.
+
+Run from the src directory:
+    python check_query_plans.py
+"""
+import inspect
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+
+src_dir = os.path.dirname(os.path.abspath(__file__))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from models.database import Database
+from models.migrations import migrate
+from models.user import User
+from models.skill import Skill
+from models.request import Request
+from models.session import Session
+from models.practice_material import PracticeMaterial
+from models.feedback import Feedback
+from models.profile import Profile
+from models.assignment import Assignment
+from models.message import Message
+from models.learner_stats import LearnerStats
+
+# Sample arguments for every public model method.
+MODEL_CALLS = {
+    User: {
+        'create': ("learner", "plan_check", "secret", "plan@example.com", 14.6, 121.0),
+        'authenticate': ("plan_check", "secret"),
+        'get_by_username': ("plan_check",),
+        'check_username': ("plan_check",),
+        'get_all_instructors': (),
+        'get_instructor_availability': (1,),
+        'get_instructor_skills': (1,),
+        'get_all_instructor_skills': (),
+        'get_all_instructor_availability': (),
+    },
+    Skill: {
+        'get_all': (),
+    },
+    Request: {
+        'create': (1, "1,2", "Monday"),
+        'get_pending': (),
+        'get_by_id': (1,),
+        'get_by_ids': ([1, 2, 3],),
+        'get_pending_for_instructor': (1,),
+        'get_booked_slots': (),
+        'assign_instructor': (1, 1, "09:00"),
+        'update_status': (1, "accepted"),
+        'assign_many': ([(1, 1, "09:00"), (2, 1)],),
+        'update_status_many': ([(1, "accepted"), (2, "declined")],),
+    },
+    Session: {
+        'create': (1, 1, 1, "2024-01-01"),
+        'get_by_instructor': (1,),
+        'get_by_learner': (1,),
+        'update_status': (1, "completed"),
+    },
+    PracticeMaterial: {
+        'create': (1, 1, 1, "Title", "https://example.com"),
+        'get_for_learner': (1,),
+        'search': (1, "grammar"),
+    },
+    Feedback: {
+        'create': (1, 1, 5, "Great"),
+        'check_exists': (1,),
+    },
+    Profile: {
+        'get': (1,),
+        'create_or_update': (1, {"firstName": "Plan"}),
+    },
+    Assignment: {
+        'create': (1, 1, "Title", "Description", "2024-01-01"),
+        'get_all': (),
+        'submit': (1, 1),
+        'get_submissions_by_learner': (1,),
+    },
+    Message: {
+        'create': (1, 2, "hello"),
+        'get_conversation_partners': (1,),
+        'get_conversation': (1, 2, 50, ("2024-01-01 00:00:00", 10)),
+        'mark_read': (1, 2),
+        'search': (1, "hello wor"),
+    },
+    LearnerStats: {
+        'get_stats': (1,),
+        'update_on_completion': (1, 1),
+    },
+}
+
+# Methods that read every row of a table by design, with the reason.
+INTENTIONAL_SCANS = {
+    (User, 'get_all_instructor_skills'): "bulk load of every instructor's skills for the matching index",
+    (User, 'get_all_instructor_availability'): "bulk load of every instructor's availability for the matching index",
+    (Skill, 'get_all'): "lists the whole skill catalogue",
+    (Assignment, 'get_all'): "lists every assignment",
+}
+
+
+class TracingDatabase(Database):
+    """Database that records every statement run on its connections."""
+    def __init__(self, db_file):
+        self.statements = []
+        super().__init__(db_file)
+
+    def _open_connection(self, read_only=False):
+        conn = super()._open_connection(read_only)
+        conn.set_trace_callback(self.statements.append)
+        return conn
+
+
+def _scan_steps(conn, statement):
+    """
+    Returns the query plan steps of a statement that scan a whole table. Scans of a subquery's
+    result (materialized or a co-routine) are not counted: the steps that fill it are checked.
+    """
+    keyword = statement.lstrip().split(None, 1)[0].upper()
+    if keyword not in ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH", "REPLACE"):
+        return []
+    # Statements FTS5 runs on its own shadow tables (addressed as 'main'.'<table>') are not model queries.
+    if "'main'." in statement:
+        return []
+    steps = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + statement)]
+    subqueries = {step.split(" ", 1)[1] for step in steps if step.startswith(("MATERIALIZE ", "CO-ROUTINE "))}
+    return [
+        step for step in steps
+        if step.startswith("SCAN ") and not step.startswith("SCAN (subquery-") and step[len("SCAN "):] not in subqueries
+        # A virtual table (FTS5) reports a scan even when it answers from its own index, as
+        # shown by a non-empty index string, e.g. "VIRTUAL TABLE INDEX 0:M1" for MATCH.
+        and not re.search(r"VIRTUAL TABLE INDEX \d+:\S", step)
+    ]
+
+
+def check():
+    """Runs every model call and returns a list of (model, method, statement, scan steps) failures."""
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "plans.db")
+        sqlite3.connect(path).close()
+        db = TracingDatabase(path)
+        migrate(db)
+        plan_conn = sqlite3.connect(path)
+
+        for model_class, calls in MODEL_CALLS.items():
+            model = model_class(db)
+            public = {name for name, _ in inspect.getmembers(model_class, inspect.isfunction) if not name.startswith('_')}
+            for name in sorted(public - set(calls)):
+                failures.append((model_class.__name__, name, None, ["method is missing from MODEL_CALLS"]))
+
+            for name, args in calls.items():
+                db.statements.clear()
+                getattr(model, name)(*args)
+                if (model_class, name) in INTENTIONAL_SCANS:
+                    continue
+                for statement in list(db.statements):
+                    scans = _scan_steps(plan_conn, statement)
+                    if scans:
+                        failures.append((model_class.__name__, name, " ".join(statement.split()), scans))
+
+        plan_conn.close()
+        db.close()
+    return failures
+
+
+def main():
+    failures = check()
+    for model_name, method, statement, scans in failures:
+        print(f"{model_name}.{method}: {'; '.join(scans)}")
+        if statement:
+            print(f"    {statement}")
+    if failures:
+        print(f"{len(failures)} query plan problem(s) found.")
+        sys.exit(1)
+    print("No model query scans a full table.")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,91 @@ RESUMES_DIR = os.path.join(ASSETS_DIR, "resumes")
 # --- DATABASE ---
 DB_NAME = "LetsInglesDB.db"
 DB_PATH = os.path.join(DB_DIR, DB_NAME)
+# Connections kept open and shared by all sessions; a query waits up to DB_POOL_TIMEOUT seconds for one.
+DB_POOL_SIZE = 5
+DB_POOL_TIMEOUT = 10
+# Idle connections older than this many seconds are checked with a cheap query before reuse.
+DB_POOL_HEALTH_CHECK_SECONDS = 30
+# Threads that run model queries for the async controller handlers (at most one per pooled reader).
+DB_EXECUTOR_WORKERS = DB_POOL_SIZE
+# Named PRAGMA profiles applied to every connection; DB_PRAGMA_PROFILE selects the active one.
+# "wal" lets the read pool run while the single writer commits; "rollback" is SQLite's default behaviour.
+DB_PRAGMA_PROFILES = {
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,      # KiB (16 MB) per connection
+        "mmap_size": 134217728,    # 128 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,      # ms
+    },
+    "rollback": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+}
+DB_PRAGMA_PROFILE = "wal"
+# Per-statement timing (calls, p50/p95/p99, rows) and a slow-query log with query plans, shown
+# on the admin dashboard. Off by default: disabled connections are plain sqlite3 connections.
+DB_QUERY_STATS = False
+DB_SLOW_QUERY_MS = 100
+DB_QUERY_STATS_PATH = os.path.join(DB_DIR, "query_stats.json")
+# Read-through cache for skills, profiles and users by name (LRU, entries expire after the TTL).
+# Writes through the models invalidate what they change; 0 entries turns the cache off.
+DB_CACHE_ENTRIES = 1024
+DB_CACHE_TTL_SECONDS = 60
+# Group commit for messages, feedback, practice material and submissions: rows from concurrent
+# sessions are written together, at most DB_WRITE_BATCH_ROWS per transaction and DB_WRITE_BATCH_MS
+# after the first one arrived (0: whatever queued up during the previous commit, no added delay).
+# At most DB_WRITE_QUEUE_SIZE rows wait; further inserts block. This only helps with concurrent
+# writers (a lone insert is committed inline anyway), so it stays off for the single-session desktop app.
+DB_WRITE_BEHIND = False
+DB_WRITE_BATCH_ROWS = 200
+DB_WRITE_BATCH_MS = 0
+DB_WRITE_QUEUE_SIZE = 10000
+# Online backups (backup_db.py): pages copied per step and the pause between steps, which is
+# when the app's own queries run, plus where snapshots go and how many are kept.
+BACKUP_DIR = os.path.join(DB_DIR, "backups")
+BACKUP_KEEP = 7
+BACKUP_PAGES_PER_STEP = 256
+BACKUP_STEP_PAUSE_MS = 5
+
+# --- PASSWORDS ---
+# scrypt cost of stored password hashes: N (CPU and memory cost, a power of two), r (block size)
+# and p (parallelism). One hash takes 128 * N * r bytes (16 MB here) and about 70 ms of CPU.
+# Hashes run on PASSWORD_HASH_WORKERS threads, which bounds the memory a burst of logins uses.
+# Changing the cost applies to new hashes; older ones are upgraded when their user next logs in.
+PASSWORD_SCRYPT_N = 2 ** 14
+PASSWORD_SCRYPT_R = 8
+PASSWORD_SCRYPT_P = 1
+PASSWORD_SALT_BYTES = 16
+PASSWORD_HASH_WORKERS = 4
+
+# --- MATCHING ---
+# Strategy for admin batch runs: "greedy" (first-come, fastest) or "optimal" (maximum-weight assignment).
+MATCHING_STRATEGY = "greedy"
+# Run greedy admin batches as requestDay shards on a process pool (None = one worker per CPU).
+# Off by default: it has not been measured faster than the serial run (see bench_parallel), and
+# without a session length its matches can differ from a sequential greedy run.
+MATCHING_PARALLEL = False
+MATCHING_WORKERS = None
+# Length of one tutoring session. Instructors are matched with as many learners as their weekly
+# availability (startTime/endTime) has room for; set to None to match each instructor once per run.
+SESSION_LENGTH_MINUTES = 60
+# Learners' "Find Match" clicks are collected for this many seconds and matched together in one pass.
+MATCHING_BATCH_WINDOW = 0.5
+MATCHING_BATCH_MAX_SIZE = 200
+# Number of instructors suggested on the learner's "Find Instructor" page.
+RECOMMENDATION_COUNT = 5
+# Seconds a learner's "Find Match" click may reuse the cached instructor index before reloading it.
+INSTRUCTOR_CACHE_TTL = 300
+
+# --- MESSAGES ---
+# Messages loaded per conversation page; older pages are fetched as the user scrolls back.
+MESSAGE_PAGE_SIZE = 50
+# Results returned by a full-text search of messages or practice materials.
+SEARCH_RESULT_LIMIT = 20
 
 # --- FONTS ---
 FONT_HEADER_PATH = os.path.join(ASSETS_DIR, "fonts", "OskariG2.otf")
@@ -1,35 +1,104 @@
 # controller.py
 from services.matching_service import MatchingService
+from services.batch_matcher import BatchMatcher
 from services.map_service import MapService
-import time
+from services.event_bus import EventBus, MESSAGE_CREATED, REQUEST_MATCHED
+from models.async_models import AsyncModel, make_async_models, create_db_executor
+from models.passwords import create_hash_executor
+from models.message import conversation_cursor
+from datetime import datetime
+import asyncio
+import uuid
+import config
 
 # Note: The 'models' are passed in during initialization in main.py,
 # so direct model imports here are not necessary unless for type hinting.
 
 class Controller:
-    """Main application controller. It handles UI events and interacts with the model."""
-    def __init__(self, models):
+    """
+    Main application controller. It handles UI events and interacts with the model.
+    Event handlers (handle_*) are coroutines: their queries run on the database executor through
+    `async_models`, so the Flet event loop stays responsive. Views start them with page.run_task.
+    """
+    def __init__(self, models, db_executor=None, hash_executor=None, matching_service=None, batch_matcher=None):
         self.models = models
-        # It's good practice to ensure the required models exist
-        self.matching_service = MatchingService(models.get('user'), models.get('request'))
+        self.async_models = make_async_models(models, db_executor or create_db_executor(config.DB_EXECUTOR_WORKERS))
+        # Logins and sign-ups hash passwords, which is slow on purpose; they run on their own pool
+        # so a burst of them cannot hold up other sessions' queries on the database executor.
+        self.async_auth = AsyncModel(models.get('user'), hash_executor or create_hash_executor(config.PASSWORD_HASH_WORKERS))
+        # The app passes in the matcher shared by all sessions (see main.py); a controller on its
+        # own builds a private one.
+        self.matching_service = matching_service or MatchingService(
+            models.get('user'), models.get('request'),
+            cache_ttl=config.INSTRUCTOR_CACHE_TTL, session_minutes=config.SESSION_LENGTH_MINUTES
+        )
+        self.batch_matcher = batch_matcher or BatchMatcher(
+            self.matching_service,
+            window_seconds=config.MATCHING_BATCH_WINDOW, max_batch_size=config.MATCHING_BATCH_MAX_SIZE,
+            strategy=config.MATCHING_STRATEGY
+        )
         self.map_service = MapService()
         self.view = None
         self.current_user = None
+        self.events = None
+        # Identifies the events this session published itself.
+        self.session_key = uuid.uuid4().hex
 
     def set_view(self, view):
         self.view = view
+        # Publishes to, and receives, other sessions' events through this session's page.
+        self.events = EventBus(view.page.pubsub) if view.page else None
+
+    # --- Real-time Events ---
+    def _subscribe_events(self):
+        """Subscribes this session to the logged-in user's topics, so it is updated without re-querying."""
+        if not self.events:
+            return
+        self.events.unsubscribe_all()
+        user_id = self.current_user['userId']
+        self.events.subscribe(user_id, MESSAGE_CREATED, self._on_message_created)
+        self.events.subscribe(user_id, REQUEST_MATCHED, self._on_request_matched_event)
+
+    def _on_message_created(self, message):
+        """Called on Flet's handler thread when a message to (or from) the current user is sent from any session."""
+        # The session that sent the message already shows it; the sender's other sessions do not.
+        if self.current_user and message.get('origin') != self.session_key:
+            self.view.notify_new_message(message, outgoing=message['senderID'] == self.current_user['userId'])
+
+    def _on_request_matched_event(self, match):
+        """Called on Flet's handler thread when one of the current user's requests, or a request for them, is matched."""
+        if not self.current_user:
+            return
+        if match['instructorId'] == self.current_user['userId']:
+            self.view.add_pending_request(match)
+        else:
+            self.view.show_success_dialog("We've found a potential match! The instructor has been notified. You will be able to schedule a session once they accept.")
+
+    def _publish_matches(self, matches):
+        """Tells the learner and the instructor of each saved match, in whichever sessions they have open."""
+        if not self.events:
+            return
+        for match in matches:
+            request = match['request']
+            event = {
+                'reqId': request['reqId'], 'userId': request['userId'], 'reqSkills': request.get('reqSkills'),
+                'skillMask': request.get('skillMask'), 'requestDay': request['requestDay'],
+                'learner_name': request.get('userName'), 'instructorId': match['instructor']['userId'],
+            }
+            self.events.publish(event['instructorId'], REQUEST_MATCHED, event)
+            self.events.publish(event['userId'], REQUEST_MATCHED, event)
 
     # --- Splash Screen and Login/Register Logic ---
-    def handle_login(self, username, password):
+    async def handle_login(self, username, password):
         if not username or not password:
             self.view.show_error_dialog("Username and password cannot be empty.")
             return
         self.view.show_loading_dialog(True)
-        time.sleep(1)  # Simulate network latency
-        user = self.models['user'].authenticate(username, password)
+        user = await self.async_auth.authenticate(username, password)
         self.view.show_loading_dialog(False)
         if user:
             self.current_user = user
+            self._subscribe_events()
             # Navigate based on user role
             if user['userRole'] == 'admin':
                 self.view.page.go("/admin")
@@ -41,11 +110,11 @@ class Controller:
         else:
             self.view.show_error_dialog("Login failed. Please check your username and password.")
 
-    def handle_register(self, role, first_name, last_name, middle_initial, username, email, password, verify_password, consent, resume_path=None):
+    async def handle_register(self, role, first_name, last_name, middle_initial, username, email, password, verify_password, consent, resume_path=None):
         if not all([first_name, last_name, username, email, password, verify_password]):
             self.view.show_error_dialog("Please fill in all required fields.")
             return
-        if self.models['user'].check_username(username):
+        if await self.async_models['user'].check_username(username):
             self.view.show_error_dialog(f"The username '{username}' is already taken.")
             return
         if password != verify_password:
@@ -59,23 +128,29 @@ class Controller:
             return
         
         # Create user with a default location (can be updated later)
-        user_id = self.models['user'].create(role, username, password, email, 14.6760, 121.0437)
+        self.view.show_loading_dialog(True)
+        user_id = await self.async_auth.create(role, username, password, email, 14.6760, 121.0437)
         
         if isinstance(user_id, int):
+            if role == 'instructor':
+                self.matching_service.update_instructor_location(user_id, 14.6760, 121.0437)
+                self.matching_service.invalidate_instructor_cache()
             profile_data = {
                 "first_name": first_name, 
                 "last_name": last_name, 
                 "middle_initial": middle_initial, 
                 "resume_path": resume_path
             }
-            self.models['profile'].create_or_update(user_id, profile_data)
+            await self.async_models['profile'].create_or_update(user_id, profile_data)
+            self.view.show_loading_dialog(False)
             self.view.show_success_dialog("Account successfully created!")
         else:
+            self.view.show_loading_dialog(False)
             self.view.show_error_dialog(f"Registration failed: {user_id}")
 
-    def check_username_availability(self, username):
+    async def check_username_availability(self, username):
         if not username: return
-        if self.models['user'].check_username(username):
+        if await self.async_models['user'].check_username(username):
             self.view.show_snackbar(f"Username '{username}' is not available.")
         else:
             self.view.show_snackbar(f"Username '{username}' is available!", "green")
@@ -86,10 +161,12 @@ class Controller:
             self.view._toggle_form('initial')
 
     def handle_logout(self):
+        if self.events:
+            self.events.unsubscribe_all()
         self.current_user = None
         self.view.page.go("/")
 
-    def handle_find_instructor(self, selected_skills, day):
+    async def handle_find_instructor(self, selected_skills, day):
         """Handles the learner's request to find an instructor."""
         if not self.current_user:
             self.view.show_error_dialog("You must be logged in to find an instructor.")
@@ -103,44 +180,63 @@ class Controller:
         skills_str = ",".join(map(str, selected_skills))
         
         # Create the request in the database
-        request_id = self.models['request'].create(
+        request_id = await self.async_models['request'].create(
             user_id=self.current_user['userId'],
             req_skills=skills_str,
             request_day=day
         )
 
         if isinstance(request_id, int):
-            self.view.show_loading_dialog(True)
-            # Run the matching process immediately after the request is created
-            self.handle_run_matching(single_request_id=request_id)
-            self.view.show_loading_dialog(False)
+            # Matching runs in the background with other requests made at the same moment;
+            # the learner is notified through the callback once their result is ready.
+            self.view.show_snackbar("Looking for an instructor... we'll let you know shortly.", "blue")
+            self.batch_matcher.submit(request_id, self._on_request_matched)
         else:
             self.view.show_error_dialog(f"Failed to create your request: {request_id}")
 
+    def _on_request_matched(self, match):
+        """
+        Called from the background matcher when a learner's request has been processed. A match is
+        published to the learner's and the instructor's sessions, which show it themselves.
+        """
+        if match:
+            self._publish_matches([match])
+        elif self.current_user:
+            self.view.show_snackbar("Could not find a suitable instructor at this time. Please try again later.", "orange")
+
     # --- Matchmaking Actions ---
-    def handle_run_matching(self, single_request_id=None):
+    async def handle_run_matching(self, single_request_id=None, strategy=None):
         """
-        Runs the greedy matching algorithm.
+        Runs the matching algorithm.
         If single_request_id is provided, it only matches that specific request.
-        Otherwise, it matches all pending requests.
+        Otherwise, it matches all pending requests with `strategy`: "greedy" (first-come, each
+        request takes its best remaining instructor) or "optimal" (maximum-weight assignment over
+        the whole backlog). It defaults to config.MATCHING_STRATEGY.
+        The run happens on a worker thread, so other sessions keep working meanwhile.
         """
         if not self.matching_service:
             self.view.show_error_dialog("Matching service is not available.")
             return
 
         print("Running matchmaking process...")
-        matches = self.matching_service.match_requests(single_request_id)
-        
+        self.view.show_loading_dialog(True)
+        # Full admin runs score the whole backlog as vectorized matrices with the configured strategy.
+        # The assignments are saved in one transaction, so a run is committed or rolled back as a whole.
+        if single_request_id:
+            matches = await asyncio.to_thread(self.matching_service.match_requests, single_request_id, assign=True)
+        else:
+            matches = await asyncio.to_thread(
+                self.matching_service.match_requests,
+                batch=True, strategy=strategy or config.MATCHING_STRATEGY,
+                parallel=config.MATCHING_PARALLEL, workers=config.MATCHING_WORKERS, assign=True
+            )
+        self.view.show_loading_dialog(False)
+        self._publish_matches(matches)
+
         if not matches:
             self.view.show_snackbar("Could not find a suitable instructor at this time. Please try again later.", "orange")
             return
 
-        # Assign the instructors to the requests in the database
-        for match in matches:
-            req_id = match['request']['reqId']
-            inst_id = match['instructor']['userId']
-            self.models['request'].assign_instructor(req_id, inst_id)
-
         # Show appropriate feedback to the user
         if single_request_id:
             self.view.show_success_dialog("We've found a potential match! The instructor has been notified. You will be able to schedule a session once they accept.")
@@ -149,35 +245,40 @@ class Controller:
         
         print(f"Found {len(matches)} matches:")
         for match in matches:
-            print(f"  - Request {match['request']['reqId']} matched with Instructor {match['instructor']['userId']}")
+            slot = match.get('slot')
+            slot_text = f" on {match['request']['requestDay']} {slot[0]}-{slot[1]}" if slot and slot[0] else ""
+            print(f"  - Request {match['request']['reqId']} matched with Instructor {match['instructor']['userId']}{slot_text}")
 
-    def handle_find_match_for_request(self, request_data):
+    async def get_instructor_recommendations(self, selected_skills, day):
         """
-        Uses the MatchingService to find the best instructor for a single, specific request.
-        This is useful for on-demand matching for a new request.
+        Returns the best instructors for the learner's current skill and day selection,
+        with their score components, without creating a request. Scored off the event loop.
         """
-        if not self.matching_service:
-            self.view.show_error_dialog("Matching service is not available.")
-            return None
-            
-        # We need all instructors for a single request match
-        all_instructors = self.models['user'].get_all_instructors()
-        best_instructor, score = self.matching_service._find_best_instructor_for_request(request_data, all_instructors)
-        
-        return best_instructor
+        if not self.current_user or not selected_skills or not day:
+            return []
+        request_data = {
+            'reqSkills': ",".join(map(str, selected_skills)),
+            'requestDay': day,
+            'userLat': self.current_user['userLat'],
+            'userLong': self.current_user['userLong']
+        }
+        return await asyncio.to_thread(self.matching_service.top_k, request_data, config.RECOMMENDATION_COUNT)
 
-    def get_pending_requests_for_instructor(self):
+    async def get_pending_requests_for_instructor(self):
         """
         Fetches all requests that have been assigned to the current instructor
         but have not yet been accepted or declined.
         """
         if not self.current_user:
             return []
-        return self.models['request'].get_pending_for_instructor(self.current_user['userId'])
+        return await self.async_models['request'].get_pending_for_instructor(self.current_user['userId'])
 
-    def handle_request_response(self, request_id, response):
+    async def handle_request_response(self, request_id, response):
         """Updates the status of a request to 'accepted' or 'declined' and refreshes the view."""
-        if self.models['request'].update_status(request_id, response):
+        if await self.async_models['request'].update_status(request_id, response):
+            if response in ('declined', 'cancelled'):
+                # The request's slot is free again; the warm slot book reloads bookings on next use.
+                self.matching_service.invalidate_instructor_cache()
             self.view.show_snackbar(f"Request has been {response}.", "green")
             # Refresh the content of the instructor dashboard
             self.view.page.go("/instructor") # This re-triggers the view creation
@@ -185,17 +286,39 @@ class Controller:
             self.view.show_error_dialog("Failed to update the request status.")
 
     # --- Data Fetching for Views ---
-    def get_user_profile(self):
+    async def get_user_profile(self):
         if not self.current_user: return None
-        return self.models['profile'].get(self.current_user['userId'])
+        return await self.async_models['profile'].get(self.current_user['userId'])
+
+    # --- Admin: Query Statistics ---
+    def get_query_stats(self):
+        """Returns the per-statement timings and slow-query log, or None when instrumentation is off."""
+        stats = self.models['user'].db.stats
+        return stats.to_dict() if stats else None
+
+    def get_cache_stats(self):
+        """Returns the model cache's hit/miss counters, or None when caching is off."""
+        cache = self.models['user'].db.cache
+        return cache.to_dict() if cache else None
 
-    def get_all_skills(self):
-        return self.models['skill'].get_all()
+    async def handle_export_query_stats(self):
+        stats = self.models['user'].db.stats
+        if not stats:
+            self.view.show_error_dialog("Query statistics are disabled. Set DB_QUERY_STATS = True in config.py.")
+            return
+        try:
+            await asyncio.to_thread(stats.dump_json, config.DB_QUERY_STATS_PATH)
+            self.view.show_snackbar(f"Query statistics saved to {config.DB_QUERY_STATS_PATH}", "green")
+        except OSError as e:
+            self.view.show_error_dialog(f"Could not save query statistics: {e}")
+
+    async def get_all_skills(self):
+        return await self.async_models['skill'].get_all()
         
-    def get_learner_assignments_with_status(self):
+    async def get_learner_assignments_with_status(self):
         if not self.current_user: return []
-        all_assignments = self.models['assignment'].get_all()
-        submitted_ids = self.models['assignment'].get_submissions_by_learner(self.current_user['userId'])
+        all_assignments = await self.async_models['assignment'].get_all()
+        submitted_ids = await self.async_models['assignment'].get_submissions_by_learner(self.current_user['userId'])
         assignments_with_status = []
         for assign in all_assignments:
             assignment_dict = dict(assign)
@@ -203,19 +326,41 @@ class Controller:
             assignments_with_status.append(assignment_dict)
         return assignments_with_status
 
-    def get_conversation_partners(self):
+    async def get_conversation_partners(self):
+        if not self.current_user: return []
+        return await self.async_models['message'].get_conversation_partners(self.current_user['userId'])
+
+    async def search_messages(self, text):
+        """Full-text search over the current user's own conversations."""
         if not self.current_user: return []
-        return self.models['message'].get_conversation_partners(self.current_user['userId'])
+        return await self.async_models['message'].search(self.current_user['userId'], text, config.SEARCH_RESULT_LIMIT)
 
-    def get_conversation(self, partner_id):
+    async def search_practice_materials(self, text):
+        """Full-text search over the titles of the current user's practice materials."""
         if not self.current_user: return []
-        return self.models['message'].get_conversation(self.current_user['userId'], partner_id)
+        return await self.async_models['practice_material'].search(self.current_user['userId'], text, config.SEARCH_RESULT_LIMIT)
+
+    async def handle_mark_conversation_read(self, partner_id):
+        """Clears the unread count of a conversation once it has been opened."""
+        if not self.current_user: return False
+        return await self.async_models['message'].mark_read(self.current_user['userId'], partner_id)
+
+    async def get_conversation(self, partner_id, before=None):
+        """
+        Returns (messages, older_cursor): the newest page of a conversation, or the page before the
+        `before` cursor when scrolling back. older_cursor is None once the first message is loaded.
+        """
+        if not self.current_user: return [], None
+        page = await self.async_models['message'].get_conversation(
+            self.current_user['userId'], partner_id, config.MESSAGE_PAGE_SIZE, before
+        )
+        return page, conversation_cursor(page, config.MESSAGE_PAGE_SIZE)
 
     # --- Profile Actions ---
-    def handle_update_profile(self, profile_data):
+    async def handle_update_profile(self, profile_data):
         if not self.current_user: return
         user_id = self.current_user['userId']
-        if self.models['profile'].create_or_update(user_id, profile_data):
+        if await self.async_models['profile'].create_or_update(user_id, profile_data):
             self.view.show_snackbar("Profile updated successfully!", "green")
             # Refresh the current view to show updated data
             self.view.page.go(self.view.page.route) 
@@ -223,12 +368,12 @@ class Controller:
             self.view.show_snackbar("Failed to update profile.")
 
     # --- Assignment Actions ---
-    def handle_create_assignment(self, skill_id, title, description, due_date):
+    async def handle_create_assignment(self, skill_id, title, description, due_date):
         if not self.current_user: return False
         if not all([skill_id, title, description, due_date]):
             self.view.show_error_dialog("All assignment fields are required.")
             return False
-        assignment_id = self.models['assignment'].create(self.current_user['userId'], skill_id, title, description, due_date)
+        assignment_id = await self.async_models['assignment'].create(self.current_user['userId'], skill_id, title, description, due_date)
         if isinstance(assignment_id, int):
             self.view.show_snackbar("Assignment created successfully!", "green")
             return True
@@ -236,22 +381,36 @@ class Controller:
             self.view.show_error_dialog(f"Failed to create assignment: {assignment_id}")
             return False
 
-    def handle_submit_assignment(self, assignment_id):
+    async def handle_submit_assignment(self, assignment_id):
         if not self.current_user: return
-        if self.models['assignment'].submit(assignment_id, self.current_user['userId']):
+        if await self.async_models['assignment'].submit(assignment_id, self.current_user['userId']):
             self.view.show_snackbar("Assignment submitted!", "green")
             self.view.page.go("/learner")
         else:
             self.view.show_error_dialog("Failed to submit assignment.")
 
     # --- Messaging Actions ---
-    def handle_send_message(self, receiver_id, content):
+    async def handle_send_message(self, receiver_id, content):
         if not self.current_user: return False
         if not content:
             self.view.show_snackbar("Message content cannot be empty.")
             return False
-        message_id = self.models['message'].create(self.current_user['userId'], receiver_id, content)
-        return isinstance(message_id, int)
+        sender_id = self.current_user['userId']
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        message_id = await self.async_models['message'].create(sender_id, receiver_id, content, timestamp)
+        if not isinstance(message_id, int):
+            return False
+        if self.events:
+            # The receiver's sessions, and the sender's other sessions, show it without polling.
+            message = {
+                'messageID': message_id, 'senderID': sender_id, 'senderName': self.current_user['userName'],
+                'receiverID': receiver_id, 'content': content, 'timestamp': timestamp,
+                'origin': self.session_key,
+            }
+            self.events.publish(receiver_id, MESSAGE_CREATED, message)
+            if receiver_id != sender_id:
+                self.events.publish(sender_id, MESSAGE_CREATED, message)
+        return True
 
     # --- Map Action ---
     def show_user_location_on_map(self, lat, lon):
@@ -2,7 +2,7 @@
 # init_db.py
 import sqlite3
 import os
-import hashlib
+import sys
 
 # --- Configuration ---
 # This ensures the script knows where to create the database.
@@ -10,138 +10,30 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_DIR = os.path.join(BASE_DIR, "db")
 DB_PATH = os.path.join(DB_DIR, "LetsInglesDB.db")
 
-def _hash_password(password):
-    """Hashes the password using SHA256."""
-    return hashlib.sha256(password.encode()).hexdigest()
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
 
-def execute_sql_from_string(sql_string, conn):
-    """Executes a multi-statement SQL string."""
-    try:
-        conn.executescript(sql_string)
-    except sqlite3.Error as e:
-        print(f"An error occurred: {e}")
+from models.migrations import apply_migrations
+from models.passwords import ScryptHasher
 
 def main():
     """Main function to set up the database."""
     # Ensure the 'db' directory exists
     os.makedirs(DB_DIR, exist_ok=True)
 
-    # --- SQL Schema Definition ---
-    # This schema is derived from the models in the application.
-    sql_schema = """
-    DROP TABLE IF EXISTS user;
-    CREATE TABLE user (
-        userID INTEGER PRIMARY KEY AUTOINCREMENT,
-        userRole TEXT NOT NULL CHECK(userRole IN ('learner', 'instructor', 'admin')),
-        userName TEXT UNIQUE NOT NULL,
-        userPass TEXT NOT NULL,
-        userEmail TEXT UNIQUE NOT NULL,
-        userLat REAL,
-        userLong REAL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    );
-
-    DROP TABLE IF EXISTS profile;
-    CREATE TABLE profile (
-        profileID INTEGER PRIMARY KEY AUTOINCREMENT,
-        userID INTEGER UNIQUE,
-        first_name TEXT,
-        last_name TEXT,
-        middle_initial TEXT,
-        resume_path TEXT,
-        FOREIGN KEY(userID) REFERENCES user(userID)
-    );
-
-    DROP TABLE IF EXISTS skill;
-    CREATE TABLE skill (
-        skillID INTEGER PRIMARY KEY AUTOINCREMENT,
-        skill_name TEXT UNIQUE NOT NULL,
-        skill_description TEXT
-    );
-
-    DROP TABLE IF EXISTS request;
-    CREATE TABLE request (
-        reqId INTEGER PRIMARY KEY AUTOINCREMENT,
-        userId INTEGER,
-        reqSkills TEXT, -- Storing as comma-separated string
-        requestDay TEXT,
-        requestDate TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        fulfilled TEXT DEFAULT 'pending', -- pending, matched, accepted, declined, cancelled
-        instructorId INTEGER,
-        FOREIGN KEY(userId) REFERENCES user(userID),
-        FOREIGN KEY(instructorId) REFERENCES user(userID)
-    );
-
-    DROP TABLE IF EXISTS session;
-    CREATE TABLE session (
-        sessionID INTEGER PRIMARY KEY AUTOINCREMENT,
-        requestID INTEGER,
-        instructorID INTEGER,
-        session_date TEXT,
-        status TEXT,
-        FOREIGN KEY(requestID) REFERENCES request(requestID),
-        FOREIGN KEY(instructorID) REFERENCES user(userID)
-    );
-
-    DROP TABLE IF EXISTS feedback;
-    CREATE TABLE feedback (
-        feedbackID INTEGER PRIMARY KEY AUTOINCREMENT,
-        sessionID INTEGER,
-        rating INTEGER,
-        comment TEXT,
-        FOREIGN KEY(sessionID) REFERENCES session(sessionID)
-    );
-
-    DROP TABLE IF EXISTS assignment;
-    CREATE TABLE assignment (
-        assignmentID INTEGER PRIMARY KEY AUTOINCREMENT,
-        instructorID INTEGER,
-        skillID INTEGER,
-        title TEXT NOT NULL,
-        description TEXT,
-        due_date TEXT,
-        FOREIGN KEY(instructorID) REFERENCES user(userID),
-        FOREIGN KEY(skillID) REFERENCES skill(skillID)
-    );
-
-    DROP TABLE IF EXISTS assignment_submission;
-    CREATE TABLE assignment_submission (
-        submissionID INTEGER PRIMARY KEY AUTOINCREMENT,
-        assignmentID INTEGER,
-        learnerID INTEGER,
-        submission_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY(assignmentID) REFERENCES assignment(assignmentID),
-        FOREIGN KEY(learnerID) REFERENCES user(userID)
-    );
-
-    DROP TABLE IF EXISTS message;
-    CREATE TABLE message (
-        messageID INTEGER PRIMARY KEY AUTOINCREMENT,
-        senderID INTEGER,
-        receiverID INTEGER,
-        content TEXT,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY(senderID) REFERENCES user(userID),
-        FOREIGN KEY(receiverID) REFERENCES user(userID)
-    );
-    """
-
     # --- Initial Data ---
-    # Default admin user and some skills
+    # Default admin user and some skills. Existing rows are left untouched.
+    # The admin's password is hashed at the default scrypt cost; the app upgrades the hash on the
+    # first login if config.py sets another.
     initial_data = [
-        ("INSERT INTO user (userRole, userName, userPass, userEmail) VALUES (?, ?, ?, ?);", 
-         ('admin', 'admin', _hash_password('admin'), 'admin@letsingles.com')),
-        
-        ("INSERT INTO skill (skill_name, skill_description) VALUES (?, ?);", 
-         ('Pronunciation', 'Practice clear and accurate pronunciation.')),
-        ("INSERT INTO skill (skill_name, skill_description) VALUES (?, ?);", 
-         ('Grammar', 'Improve your understanding of English grammar rules.')),
-        ("INSERT INTO skill (skill_name, skill_description) VALUES (?, ?);", 
-         ('Vocabulary', 'Expand your vocabulary with new words and phrases.')),
-        ("INSERT INTO skill (skill_name, skill_description) VALUES (?, ?);", 
-         ('Fluency', 'Develop smoother and more natural speech.')),
-        ("INSERT INTO skill (skill_name, skill_description) VALUES (?, ?);", 
-         ('Listening', 'Enhance your ability to understand spoken English.'))
+        ("INSERT OR IGNORE INTO user (userRole, userName, userPass, userEmail) VALUES (?, ?, ?, ?);",
+         ('admin', 'admin', ScryptHasher().hash('admin'), 'admin@letsingles.com')),
+
+        ("INSERT OR IGNORE INTO skills (skillName) VALUES (?);", ('Pronunciation',)),
+        ("INSERT OR IGNORE INTO skills (skillName) VALUES (?);", ('Grammar',)),
+        ("INSERT OR IGNORE INTO skills (skillName) VALUES (?);", ('Vocabulary',)),
+        ("INSERT OR IGNORE INTO skills (skillName) VALUES (?);", ('Fluency',)),
+        ("INSERT OR IGNORE INTO skills (skillName) VALUES (?);", ('Listening',))
     ]
 
     # --- Database Creation and Population ---
@@ -151,11 +43,11 @@ def main():
         cursor = conn.cursor()
 
         print("Connection to database successful.")
-        
-        # Execute the schema
-        print("Creating database schema...")
-        execute_sql_from_string(sql_schema, conn)
-        print("Schema created successfully.")
+
+        # The schema comes from the versioned migrations, so existing data is never dropped.
+        print("Applying schema migrations...")
+        applied = apply_migrations(conn)
+        print(f"Applied migrations: {applied or 'none, already up to date'}")
 
         # Insert the initial data
         print("Inserting initial data...")
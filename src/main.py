@@ -1,7 +1,9 @@
 # main.py
+import atexit
 import flet as ft
 import os
 import sys
+import threading
 
 # --- Path Setup ---
 # This allows importing from sibling directories (models, views, controllers)
@@ -12,7 +14,11 @@ if src_dir not in sys.path:
 # --- Component Imports ---
 import config
 from controllers.controller import Controller
-from models.database import Database
+from models.database import Database, QueryStats
+from models.async_models import create_db_executor
+from models.cache import QueryCache
+from models.migrations import migrate
+from models.passwords import ScryptHasher, create_hash_executor
 from models.user import User
 from models.skill import Skill
 from models.request import Request
@@ -22,8 +28,63 @@ from models.feedback import Feedback
 from models.profile import Profile
 from models.assignment import Assignment
 from models.message import Message
+from services.batch_matcher import BatchMatcher
+from services.matching_service import MatchingService
 from views.view import View
 
+_db = None
+_db_lock = threading.Lock()
+# One matcher for the whole app: every session books instructors' slots from the same warm
+# index and queues learners' requests into the same micro-batches. Created with the database.
+_matching_service = None
+_batch_matcher = None
+# Shared by every session's controller, so concurrent sessions cannot exhaust the connection pool.
+_db_executor = create_db_executor(config.DB_EXECUTOR_WORKERS)
+_hash_executor = create_hash_executor(config.PASSWORD_HASH_WORKERS)
+_password_hasher = ScryptHasher(
+    n=config.PASSWORD_SCRYPT_N, r=config.PASSWORD_SCRYPT_R, p=config.PASSWORD_SCRYPT_P,
+    salt_bytes=config.PASSWORD_SALT_BYTES
+)
+
+def get_database():
+    """Returns the connection pool shared by every Flet session, creating it on first use."""
+    global _db
+    with _db_lock:
+        if _db is None:
+            _db = Database(
+                db_file=config.DB_PATH, pool_size=config.DB_POOL_SIZE, pool_timeout=config.DB_POOL_TIMEOUT,
+                health_check_interval=config.DB_POOL_HEALTH_CHECK_SECONDS,
+                pragmas=config.DB_PRAGMA_PROFILES[config.DB_PRAGMA_PROFILE],
+                stats=QueryStats(slow_query_ms=config.DB_SLOW_QUERY_MS) if config.DB_QUERY_STATS else None,
+                cache=QueryCache(config.DB_CACHE_ENTRIES, config.DB_CACHE_TTL_SECONDS) if config.DB_CACHE_ENTRIES else None
+            )
+            # Bring older database files up to the current schema before any model uses them.
+            migrate(_db)
+            if config.DB_WRITE_BEHIND:
+                _db.enable_write_behind(config.DB_WRITE_BATCH_ROWS, config.DB_WRITE_BATCH_MS, config.DB_WRITE_QUEUE_SIZE)
+            # Runs when the app exits, so rows still waiting in the write-behind queue are committed.
+            atexit.register(_db.close)
+        return _db
+
+def get_matching():
+    """Returns the MatchingService and BatchMatcher shared by every Flet session, creating them on first use."""
+    global _matching_service, _batch_matcher
+    db = get_database()
+    with _db_lock:
+        if _matching_service is None:
+            _matching_service = MatchingService(
+                User(db, _password_hasher), Request(db),
+                cache_ttl=config.INSTRUCTOR_CACHE_TTL, session_minutes=config.SESSION_LENGTH_MINUTES
+            )
+            _batch_matcher = BatchMatcher(
+                _matching_service,
+                window_seconds=config.MATCHING_BATCH_WINDOW, max_batch_size=config.MATCHING_BATCH_MAX_SIZE,
+                strategy=config.MATCHING_STRATEGY
+            )
+            # atexit runs handlers last-in first-out, so queued requests are matched before the database closes.
+            atexit.register(_batch_matcher.stop)
+        return _matching_service, _batch_matcher
+
 def main(page: ft.Page):
     """The main function to initialize and run the Flet application."""
     # --- Page Configuration ---
@@ -35,10 +96,11 @@ def main(page: ft.Page):
     # --- Database and Model Initialization ---
     try:
         # The database path is now managed by config.py
-        db = Database(db_file=config.DB_PATH)
+        db = get_database()
+        matching_service, batch_matcher = get_matching()
         
         models = {
-            "user": User(db), "skill": Skill(db), "request": Request(db),
+            "user": User(db, _password_hasher), "skill": Skill(db), "request": Request(db),
             "session": Session(db), "practice_material": PracticeMaterial(db),
             "feedback": Feedback(db), "profile": Profile(db),
             "assignment": Assignment(db), "message": Message(db)
@@ -50,7 +112,10 @@ def main(page: ft.Page):
         return
 
     # --- MVC Initialization ---
-    controller = Controller(models)
+    controller = Controller(
+        models, db_executor=_db_executor, hash_executor=_hash_executor,
+        matching_service=matching_service, batch_matcher=batch_matcher
+    )
     view = View(controller)
     view.page = page
     controller.set_view(view)
@@ -29,7 +29,7 @@ class Assignment:
             JOIN user u ON a.instructorID = u.userId
             ORDER BY a.dueDate DESC
         """
-        with self.db.connect() as conn:
+        with self.db.connect(read_only=True) as conn:
             cursor = conn.cursor()
             cursor.execute(sql)
             return cursor.fetchall()
@@ -39,11 +39,8 @@ class Assignment:
         sql = "INSERT INTO submissions (assignmentID, learnerID, submissionDate) VALUES (?, ?, ?)"
         sub_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         try:
-            with self.db.connect() as conn:
-                cursor = conn.cursor()
-                cursor.execute(sql, (assignment_id, learner_id, sub_date))
-                conn.commit()
-                return True
+            self.db.insert(sql, (assignment_id, learner_id, sub_date))
+            return True
         except sqlite3.Error as e:
             print(f"Database error creating submission: {e}")
             return False
@@ -51,7 +48,7 @@ class Assignment:
     def get_submissions_by_learner(self, learner_id):
         """Checks which assignments a learner has submitted."""
         sql = "SELECT assignmentID FROM submissions WHERE learnerID = ?"
-        with self.db.connect() as conn:
+        with self.db.connect(read_only=True) as conn:
             cursor = conn.cursor()
             cursor.execute(sql, (learner_id,))
             return [row['assignmentID'] for row in cursor.fetchall()]
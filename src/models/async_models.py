@@ -0,0 +1,40 @@
+# models/async_models.py
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+
+def create_db_executor(max_workers):
+    """Thread pool that runs model queries off the Flet event loop."""
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+
+
+class AsyncModel:
+    """
+    Async variant of a model: every public method of the wrapped model is exposed as a
+    coroutine that runs the query on the database executor, e.g.
+    `user = await async_models['user'].authenticate(name, password)`.
+    Results, return values and error handling are exactly those of the synchronous model.
+    """
+    def __init__(self, model, executor):
+        self._model = model
+        self._executor = executor
+
+    def __getattr__(self, name):
+        attr = getattr(self._model, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(attr, *args, **kwargs))
+
+        # Cache the coroutine function so later lookups skip __getattr__.
+        setattr(self, name, call)
+        return call
+
+
+def make_async_models(models, executor):
+    """Wraps a {name: model} dict, as built in main.py, into {name: AsyncModel}."""
+    return {name: AsyncModel(model, executor) for name, model in models.items()}
@@ -0,0 +1,78 @@
+# models/cache.py
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache with a time-to-live, used by Database.cached for read-through model lookups.
+    At most `max_entries` results are kept; the least recently used one is evicted first, and an
+    entry older than `ttl_seconds` is reloaded on its next lookup. Models invalidate the entries
+    their own writes change (Database.invalidate), so the TTL only bounds how long a change made
+    outside the app (e.g. init_db.py) can go unnoticed.
+    """
+    def __init__(self, max_entries=1024, ttl_seconds=60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; a load that raced with one is returned but not stored.
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get_or_load(self, key, loader):
+        """Returns the cached value for key, calling loader() and storing its result on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                stored_at, value = entry
+                if now - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            generation = self._generation
+
+        # The query runs outside the lock, so a slow load does not block other lookups.
+        value = loader()
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic(), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, key):
+        """Drops one entry, e.g. after the row it was loaded from has been written."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generation += 1
+
+    def clear(self):
+        """Drops every entry and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def to_dict(self):
+        """Returns the hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries), 'max_entries': self.max_entries, 'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            }
@@ -1,29 +1,385 @@
 # models/database.py
 import sqlite3
 import os
+import json
+import threading
+import time
+import traceback
+from collections import deque
 
-class Database:
-    """Handles all database connections and operations."""
-    def __init__(self, db_file):
-        """Initializes the database connection."""
-        self.db_file = db_file
-        if not os.path.exists(self.db_file):
-            raise FileNotFoundError(f"Database file not found at: {self.db_file}")
+from models.write_queue import WriteBehindQueue
+
+# PRAGMA names a profile may set, in the order they are applied to each new connection.
+SUPPORTED_PRAGMAS = ("journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store", "busy_timeout")
+
+
+class QueryStats:
+    """
+    Per-statement timing collected by instrumented connections.
+
+    For every distinct SQL text it keeps the call count, total time, rows returned and a window
+    of the most recent `sample_size` latencies for p50/p95/p99. Statements slower than
+    `slow_query_ms` are also appended to a bounded slow-query log together with their
+    EXPLAIN QUERY PLAN and the model method that ran them.
+    """
+    def __init__(self, slow_query_ms=100, sample_size=1000, slow_log_size=200):
+        self.slow_query_ms = slow_query_ms
+        self.sample_size = sample_size
+        self.slow_log = deque(maxlen=slow_log_size)
+        self._statements = {}
+        self._lock = threading.Lock()
+
+    def record(self, conn, sql, params, seconds, rows):
+        key = " ".join(sql.split())
+        with self._lock:
+            entry = self._statements.get(key)
+            if entry is None:
+                entry = self._statements[key] = {'calls': 0, 'total_s': 0.0, 'rows': 0, 'samples': deque(maxlen=self.sample_size)}
+            entry['calls'] += 1
+            entry['total_s'] += seconds
+            entry['rows'] += rows
+            entry['samples'].append(seconds)
+        if seconds * 1000 >= self.slow_query_ms:
+            self._log_slow(conn, key, sql, params, seconds, rows)
+
+    def _log_slow(self, conn, key, sql, params, seconds, rows):
+        try:
+            # A plain cursor, so the plan lookup is not itself recorded.
+            plan = [row[3] for row in conn.cursor(sqlite3.Cursor).execute("EXPLAIN QUERY PLAN " + sql, params)]
+        except (sqlite3.Error, ValueError):
+            plan = []
+        caller = next((f"{os.path.basename(frame.filename)}:{frame.name}" for frame in reversed(traceback.extract_stack())
+                       if os.sep + "models" + os.sep in frame.filename and not frame.filename.endswith("database.py")), None)
+        self.slow_log.append({
+            'sql': key, 'params': [repr(p) for p in params] if isinstance(params, (list, tuple)) else repr(params),
+            'ms': round(seconds * 1000, 3), 'rows': rows, 'plan': plan, 'caller': caller,
+            'at': time.strftime("%Y-%m-%d %H:%M:%S"),
+        })
+
+    @staticmethod
+    def _percentile(sorted_samples, fraction):
+        return sorted_samples[min(len(sorted_samples) - 1, int(fraction * len(sorted_samples)))]
+
+    def summary(self):
+        """Returns one dict per statement, slowest total time first."""
+        with self._lock:
+            items = [(sql, dict(entry, samples=sorted(entry['samples']))) for sql, entry in self._statements.items()]
+        result = []
+        for sql, entry in items:
+            samples = entry['samples']
+            result.append({
+                'sql': sql,
+                'calls': entry['calls'],
+                'total_ms': round(entry['total_s'] * 1000, 3),
+                'p50_ms': round(self._percentile(samples, 0.50) * 1000, 3),
+                'p95_ms': round(self._percentile(samples, 0.95) * 1000, 3),
+                'p99_ms': round(self._percentile(samples, 0.99) * 1000, 3),
+                'rows': entry['rows'],
+            })
+        return sorted(result, key=lambda item: item['total_ms'], reverse=True)
+
+    def to_dict(self):
+        return {'statements': self.summary(), 'slow_queries': list(self.slow_log), 'slow_query_ms': self.slow_query_ms}
+
+    def dump_json(self, path):
+        """Writes the statistics and the slow-query log to a JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self.slow_log.clear()
+
+
+class _InstrumentedCursor(sqlite3.Cursor):
+    """
+    Cursor that times each statement. SQLite produces rows lazily, so a SELECT is recorded once
+    its rows are fetched (fetchall/fetchone/fetchmany or iterating to the end), or when the
+    cursor runs its next statement or is closed.
+    """
+    _pending = None
+
+    def execute(self, sql, parameters=()):
+        self._flush()
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        elapsed = time.perf_counter() - start
+        if self.description is None:
+            self.connection.stats.record(self.connection, sql, parameters, elapsed, max(self.rowcount, 0))
+        else:
+            self._pending = [sql, parameters, elapsed, 0]
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._flush()
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        self.connection.stats.record(self.connection, sql, (), time.perf_counter() - start, max(self.rowcount, 0))
+        return self
+
+    def _fetch(self, fetch, *args):
+        start = time.perf_counter()
+        result = fetch(*args)
+        if self._pending:
+            self._pending[2] += time.perf_counter() - start
+            self._pending[3] += len(result) if isinstance(result, list) else int(result is not None)
+            self._flush()
+        return result
+
+    def fetchall(self):
+        return self._fetch(super().fetchall)
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._flush()
+            raise
+        if self._pending:
+            self._pending[2] += time.perf_counter() - start
+            self._pending[3] += 1
+        return row
+
+    def fetchone(self):
+        return self._fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._fetch(super().fetchmany, self.arraysize if size is None else size)
+
+    def _flush(self):
+        if self._pending:
+            sql, parameters, elapsed, rows = self._pending
+            self._pending = None
+            self.connection.stats.record(self.connection, sql, parameters, elapsed, rows)
+
+    def close(self):
+        self._flush()
+        super().close()
+
+
+class _InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors (including those behind conn.execute) report to `stats`."""
+    stats = None
+
+    def cursor(self, factory=_InstrumentedCursor):
+        return super().cursor(factory)
+
+
+class _Checkout:
+    """Context manager returned by Database.connect(): borrows a connection for one `with` block."""
+    def __init__(self, pool, blocking=True):
+        self.pool = pool
+        self.blocking = blocking
         self.conn = None
 
-    def connect(self):
-        """Establishes a connection to the SQLite database."""
+    def __enter__(self):
+        self.conn = self.pool.acquire(self.blocking)
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.conn is not None:
+            self.pool.release(self.conn, failed=exc_type is not None)
+        return False
+
+
+class _ConnectionPool:
+    """
+    At most `size` connections made by `opener`, reused LIFO. A thread that checks out again
+    while it already holds a connection gets the same one back (see Database).
+    """
+    def __init__(self, opener, size, timeout, health_check_interval):
+        self.opener = opener
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._idle = []  # (connection, returned_at), most recently used last
+        self._idle_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._local = threading.local()
+
+    def held_connection(self):
+        """The connection the current thread has checked out, or None."""
+        return self._local.conn if getattr(self._local, 'depth', 0) else None
+
+    def _is_healthy(self, conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def acquire(self, blocking=True):
+        """Checks out a connection; with blocking=False returns None at once if none is free."""
+        local = self._local
+        if getattr(local, 'depth', 0):
+            local.depth += 1
+            return local.conn
+
+        if not blocking:
+            if not self._slots.acquire(blocking=False):
+                return None
+        elif not self._slots.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError(f"No database connection available after {self.timeout}s (pool size {self.size})")
         try:
-            self.conn = sqlite3.connect(self.db_file)
-            # This allows accessing columns by name, which is very convenient.
-            self.conn.row_factory = sqlite3.Row
-            return self.conn
+            conn = None
+            while conn is None:
+                with self._idle_lock:
+                    conn, returned_at = self._idle.pop() if self._idle else (None, None)
+                if conn is None:
+                    conn = self.opener()
+                elif time.monotonic() - returned_at > self.health_check_interval and not self._is_healthy(conn):
+                    self._discard(conn)
+                    conn = None
         except sqlite3.Error as e:
+            self._slots.release()
             print(f"Database connection error: {e}")
-            return None
+            raise
+
+        local.conn, local.depth = conn, 1
+        return conn
+
+    def release(self, conn, failed=False):
+        local = self._local
+        local.depth -= 1
+        if local.depth:
+            return
+        local.conn = None
+        try:
+            if failed:
+                conn.rollback()
+            else:
+                conn.commit()
+            healthy = not conn.in_transaction
+        except sqlite3.Error as e:
+            print(f"Database error while returning connection: {e}")
+            healthy = False
+
+        if healthy:
+            with self._idle_lock:
+                self._idle.append((conn, time.monotonic()))
+        else:
+            self._discard(conn)
+        self._slots.release()
 
     def close(self):
-        """Closes the database connection if it's open."""
-        if self.conn:
-            self.conn.close()
+        with self._idle_lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+
+class Database:
+    """
+    Handles all database connections and operations.
+
+    Writes go through a single writer connection, so they are serialized in Python instead of
+    failing with "database is locked"; reads use a pool of up to `pool_size` query-only
+    connections, which in WAL mode run alongside the writer. Both are used as
+    `with db.connect() as conn:` (writer) or `with db.connect(read_only=True) as conn:`, which
+    commit on success, roll back on error and return the connection. A thread that already
+    holds the writer also reads through it, so it sees its own uncommitted changes.
+    Idle connections are checked with a cheap query before reuse and replaced if broken.
+
+    `pragmas` is a profile from config.DB_PRAGMA_PROFILES, applied to every new connection.
+    With a QueryStats in `stats`, every statement is timed (see QueryStats); without one the
+    connections are plain sqlite3 connections and nothing is measured.
+    After enable_write_behind(), single-row inserts made through `insert` are group-committed
+    by a WriteBehindQueue.
+    With a QueryCache in `cache`, models serve their hot lookups through `cached` and drop
+    what their writes change with `invalidate`; without one every lookup queries the database.
+    """
+    def __init__(self, db_file, pool_size=5, pool_timeout=10, health_check_interval=30, pragmas=None, stats=None, cache=None):
+        """Initializes the reader pool and the writer connection."""
+        self.db_file = db_file
+        if not os.path.exists(self.db_file):
+            raise FileNotFoundError(f"Database file not found at: {self.db_file}")
+        self.pool_size = pool_size
+        self.stats = stats
+        self.cache = cache
+        self.write_queue = None
+        self.pragmas = dict(pragmas or {})
+        unknown = set(self.pragmas) - set(SUPPORTED_PRAGMAS)
+        if unknown:
+            raise ValueError(f"Unsupported PRAGMA(s) in profile: {', '.join(sorted(unknown))}")
+        self._writer = _ConnectionPool(lambda: self._open_connection(), 1, pool_timeout, health_check_interval)
+        self._readers = _ConnectionPool(lambda: self._open_connection(read_only=True), pool_size, pool_timeout, health_check_interval)
+        # Open the writer now so the journal mode is switched before any reader starts a transaction.
+        with _Checkout(self._writer):
+            pass
+
+    def _open_connection(self, read_only=False):
+        """Opens a new SQLite connection with the PRAGMA profile; it may be used by any thread, one at a time."""
+        if self.stats is None:
+            conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_file, check_same_thread=False, factory=_InstrumentedConnection)
+            conn.stats = self.stats
+        # This allows accessing columns by name, which is very convenient.
+        conn.row_factory = sqlite3.Row
+        for name in SUPPORTED_PRAGMAS:
+            # The journal mode is stored in the database file, so only the writer sets it.
+            if name in self.pragmas and not (read_only and name == "journal_mode"):
+                conn.execute(f"PRAGMA {name} = {self.pragmas[name]}")
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def connect(self, read_only=False, blocking=True):
+        """
+        Checks out the writer connection, or a reader when read_only=True, for use in a `with` block.
+        With blocking=False the block gets None instead of waiting when no connection is free.
+        """
+        if read_only and self._writer.held_connection() is None:
+            return _Checkout(self._readers, blocking)
+        return _Checkout(self._writer, blocking)
+
+    def enable_write_behind(self, max_batch_rows=200, max_delay_ms=0, max_pending=10000):
+        """Starts a WriteBehindQueue that group-commits the rows passed to `insert`."""
+        if self.write_queue is None:
+            self.write_queue = WriteBehindQueue(self, max_batch_rows, max_delay_ms, max_pending)
+        return self.write_queue
 
+    def insert(self, sql, params=()):
+        """
+        Runs one INSERT and returns the new rowid once it is committed, raising sqlite3.Error on failure.
+        With write-behind enabled the row goes through WriteBehindQueue.write, which shares a commit
+        with other threads' rows when they are waiting; a thread already inside a write transaction
+        inserts directly, as the queue would wait for its writer.
+        """
+        if self.write_queue is not None and self._writer.held_connection() is None:
+            return self.write_queue.write(sql, params)
+        with self.connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            conn.commit()
+            return cursor.lastrowid
+
+    def cached(self, key, loader):
+        """
+        Read-through lookup: returns the cached result for key, or runs loader() and caches it.
+        Inside a write transaction the loader always runs, so uncommitted rows are never cached.
+        """
+        if self.cache is None or self._writer.held_connection() is not None:
+            return loader()
+        return self.cache.get_or_load(key, loader)
+
+    def invalidate(self, *keys):
+        """Drops cached results after a write has changed the rows they were loaded from."""
+        if self.cache is not None:
+            for key in keys:
+                self.cache.invalidate(key)
+
+    def close(self):
+        """Writes any queued rows, then closes every idle connection."""
+        if self.write_queue is not None:
+            self.write_queue.close()
+        self._readers.close()
+        self._writer.close()
@@ -12,11 +12,7 @@ class Feedback:
         sql = "INSERT INTO feedback (sessionID, learnerID, rating, comment, feedbackDate) VALUES (?, ?, ?, ?, ?)"
         feedback_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         try:
-            with self.db.connect() as conn:
-                cursor = conn.cursor()
-                cursor.execute(sql, (session_id, learner_id, rating, comment, feedback_date))
-                conn.commit()
-                return cursor.lastrowid
+            return self.db.insert(sql, (session_id, learner_id, rating, comment, feedback_date))
         except sqlite3.Error as e:
             print(f"Database error creating feedback: {e}")
             return None
@@ -24,7 +20,7 @@ class Feedback:
     def check_exists(self, session_id):
         """Checks if feedback already exists for a given session."""
         sql = "SELECT feedbackID FROM feedback WHERE sessionID = ?"
-        with self.db.connect() as conn:
+        with self.db.connect(read_only=True) as conn:
             cursor = conn.cursor()
             cursor.execute(sql, (session_id,))
             return cursor.fetchone() is not None
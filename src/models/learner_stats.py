@@ -14,7 +14,7 @@ class LearnerStats:
             JOIN skills s ON ls.skillID = s.skillID
             WHERE ls.learnerID = ?
         """
-        with self.db.connect() as conn:
+        with self.db.connect(read_only=True) as conn:
             cursor = conn.cursor()
             cursor.execute(sql, (learner_id,))
             return cursor.fetchall()
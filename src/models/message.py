@@ -2,48 +2,132 @@
 import sqlite3
 from datetime import datetime
 
+from models.search import fts_query, SNIPPET_START, SNIPPET_END, SNIPPET_ELLIPSIS
+
+
+def conversation_cursor(page, limit=50):
+    """Returns the `before` cursor for the page older than `page`, or None when `page` reached the first message."""
+    if len(page) < limit:
+        return None
+    return (page[0]['timestamp'], page[0]['messageID'])
+
+
 class Message:
     """Model for the 'messages' table."""
     def __init__(self, db):
         self.db = db
 
-    def create(self, sender_id, receiver_id, content):
-        """Creates a new message."""
+    def create(self, sender_id, receiver_id, content, timestamp=None):
+        """
+        Creates a new message, stamped now unless a timestamp ("%Y-%m-%d %H:%M:%S") is given;
+        a trigger updates both users' conversation_summary rows in the same transaction.
+        """
         sql = "INSERT INTO messages (senderID, receiverID, content, timestamp) VALUES (?, ?, ?, ?)"
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         try:
-            with self.db.connect() as conn:
-                cursor = conn.cursor()
-                cursor.execute(sql, (sender_id, receiver_id, content, timestamp))
-                conn.commit()
-                return cursor.lastrowid
+            # Group-committed with other messages when write-behind is enabled (see Database.insert).
+            return self.db.insert(sql, (sender_id, receiver_id, content, timestamp))
         except sqlite3.Error as e:
             print(f"Database error creating message: {e}")
             return None
 
     def get_conversation_partners(self, user_id):
-        """Gets a list of users someone has messaged or received messages from."""
+        """
+        Gets someone's inbox from conversation_summary, most recent conversation first: each
+        partner's userId and userName with the last message's preview and timestamp and the
+        number of unread messages from them.
+        """
         sql = """
-            SELECT DISTINCT u.userId, u.userName
-            FROM user u
-            JOIN messages m ON u.userId = m.senderID OR u.userId = m.receiverID
-            WHERE (m.senderID = ? OR m.receiverID = ?) AND u.userId != ?
+            SELECT s.partnerID AS userId, u.userName, s.lastPreview, s.lastTimestamp, s.unreadCount
+            FROM conversation_summary s
+            JOIN user u ON u.userId = s.partnerID
+            WHERE s.userID = ? AND s.partnerID != s.userID
+            ORDER BY s.lastTimestamp DESC
         """
-        with self.db.connect() as conn:
+        with self.db.connect(read_only=True) as conn:
             cursor = conn.cursor()
-            cursor.execute(sql, (user_id, user_id, user_id))
+            cursor.execute(sql, (user_id,))
             return cursor.fetchall()
 
-    def get_conversation(self, user1_id, user2_id):
-        """Gets the full message history between two users."""
-        sql = """
+    def mark_read(self, user_id, partner_id):
+        """Marks every message from partner_id to user_id as read and clears the inbox's unread count, in one transaction."""
+        try:
+            with self.db.connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "UPDATE messages SET isRead = 1 WHERE receiverID = ? AND senderID = ? AND isRead = 0",
+                    (user_id, partner_id)
+                )
+                cursor.execute(
+                    "UPDATE conversation_summary SET unreadCount = 0 WHERE userID = ? AND partnerID = ?",
+                    (user_id, partner_id)
+                )
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            print(f"Database error marking messages as read: {e}")
+            return False
+
+    def get_conversation(self, user1_id, user2_id, limit=50, before=None):
+        """
+        Gets one page of the message history between two users, in chronological order: the
+        `limit` newest messages, or with `before` (a (timestamp, messageID) cursor from
+        conversation_cursor) the `limit` messages just older than it.
+        Each direction is read as a keyset range of idx_messages_pair, whose entries end with
+        messageID, so a page costs the same however long the history is.
+        """
+        if before is None:
+            keyset, cursor_params = "", ()
+        else:
+            keyset, cursor_params = "AND (timestamp, messageID) < (?, ?)", tuple(before)
+        direction = f"""
+            SELECT * FROM (
+                SELECT messageID, timestamp FROM messages
+                WHERE senderID = ? AND receiverID = ? {keyset}
+                ORDER BY timestamp DESC, messageID DESC
+                LIMIT ?
+            )
+        """
+        sql = f"""
             SELECT m.*, u_sender.userName as senderName
-            FROM messages m
+            FROM ({direction} UNION {direction}) page
+            JOIN messages m ON m.messageID = page.messageID
             JOIN user u_sender ON m.senderID = u_sender.userId
-            WHERE (senderID = ? AND receiverID = ?) OR (senderID = ? AND receiverID = ?)
-            ORDER BY timestamp ASC
+            ORDER BY page.timestamp DESC, page.messageID DESC
+            LIMIT ?
         """
-        with self.db.connect() as conn:
+        params = (user1_id, user2_id, *cursor_params, limit, user2_id, user1_id, *cursor_params, limit, limit)
+        with self.db.connect(read_only=True) as conn:
             cursor = conn.cursor()
-            cursor.execute(sql, (user1_id, user2_id, user2_id, user1_id))
-            return cursor.fetchall()
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        rows.reverse()
+        return rows
+
+    def search(self, user_id, text, limit=20):
+        """
+        Full-text search over the messages user_id sent or received, best match first.
+        Each row has the message's IDs, timestamp and senderName plus a snippet with the matched
+        words marked. Returns an empty list for text without words.
+        """
+        query = fts_query(text, user_id, "content")
+        if query is None:
+            return []
+        sql = """
+            SELECT m.messageID, m.senderID, m.receiverID, m.timestamp, u_sender.userName as senderName,
+                   snippet(messages_fts, 0, ?, ?, ?, 12) AS snippet
+            FROM messages_fts
+            JOIN messages m ON m.messageID = messages_fts.rowid
+            JOIN user u_sender ON m.senderID = u_sender.userId
+            WHERE messages_fts MATCH ?
+            ORDER BY messages_fts.rank
+            LIMIT ?
+        """
+        try:
+            with self.db.connect(read_only=True) as conn:
+                cursor = conn.cursor()
+                cursor.execute(sql, (SNIPPET_START, SNIPPET_END, SNIPPET_ELLIPSIS, query, limit))
+                return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Database error searching messages: {e}")
+            return []
@@ -0,0 +1,354 @@
+# models/migrations.py
+import sqlite3
+from datetime import date, datetime
+
+from models.request import session_date
+from models.skill import stored_skill_mask
+
+# The schema of the tables the models use, as found in the shipped database. Every statement
+# is idempotent, so this migration only fills in what a database is missing.
+BASELINE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS user (
+    userID INTEGER PRIMARY KEY AUTOINCREMENT,
+    userRole TEXT NOT NULL CHECK(userRole IN ('learner', 'instructor', 'admin')),
+    userName TEXT UNIQUE NOT NULL,
+    userPass TEXT NOT NULL,
+    userEmail TEXT UNIQUE NOT NULL,
+    userLat REAL,
+    userLong REAL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS "skills" ( "skillID" INTEGER NOT NULL UNIQUE, "skillName" TEXT NOT NULL UNIQUE, PRIMARY KEY("skillID" AUTOINCREMENT) );
+CREATE TABLE IF NOT EXISTS "user_profiles" ( "userID" INTEGER NOT NULL UNIQUE, "firstName" TEXT, "lastName" TEXT, "middleInitial" TEXT, "age" INTEGER, "educationLevel" TEXT, "aboutMe" TEXT, "profilePicture" TEXT, "school" TEXT, "occupation" TEXT, "specialization" TEXT, "resumePath" TEXT, FOREIGN KEY("userID") REFERENCES "user"("userId") ON DELETE CASCADE, PRIMARY KEY("userID") );
+CREATE TABLE IF NOT EXISTS request (
+    reqId INTEGER PRIMARY KEY AUTOINCREMENT,
+    userId INTEGER,
+    reqSkills TEXT, -- Storing as comma-separated string
+    requestDay TEXT,
+    requestDate TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fulfilled TEXT DEFAULT 'pending', -- pending, matched, accepted, declined, cancelled
+    instructorId INTEGER,
+    FOREIGN KEY(userId) REFERENCES user(userID),
+    FOREIGN KEY(instructorId) REFERENCES user(userID)
+);
+CREATE TABLE IF NOT EXISTS session (
+    sessionID INTEGER PRIMARY KEY AUTOINCREMENT,
+    requestID INTEGER,
+    instructorID INTEGER,
+    session_date TEXT,
+    status TEXT,
+    FOREIGN KEY(requestID) REFERENCES request(requestID),
+    FOREIGN KEY(instructorID) REFERENCES user(userID)
+);
+CREATE TABLE IF NOT EXISTS feedback (
+    feedbackID INTEGER PRIMARY KEY AUTOINCREMENT,
+    sessionID INTEGER,
+    rating INTEGER,
+    comment TEXT,
+    FOREIGN KEY(sessionID) REFERENCES session(sessionID)
+);
+CREATE TABLE IF NOT EXISTS "instructor_skills" ( "instructorID" INTEGER NOT NULL, "skillID" INTEGER NOT NULL, FOREIGN KEY("instructorID") REFERENCES "user"("userId") ON DELETE CASCADE, FOREIGN KEY("skillID") REFERENCES "skills"("skillID"), PRIMARY KEY("instructorID", "skillID") );
+CREATE TABLE IF NOT EXISTS "instructor_availability" ( "instructorID" INTEGER NOT NULL, "day" TEXT NOT NULL, "startTime" TEXT, "endTime" TEXT, FOREIGN KEY("instructorID") REFERENCES "user"("userId") ON DELETE CASCADE, PRIMARY KEY("instructorID", "day") );
+CREATE TABLE IF NOT EXISTS "learner_stats" ( "learnerID" INTEGER NOT NULL, "skillID" INTEGER NOT NULL, "proficiencyScore" INTEGER NOT NULL DEFAULT 0, "sessionsCompleted" INTEGER NOT NULL DEFAULT 0, FOREIGN KEY("learnerID") REFERENCES "user"("userId") ON DELETE CASCADE, FOREIGN KEY("skillID") REFERENCES "skills"("skillID"), PRIMARY KEY("learnerID", "skillID") );
+CREATE TABLE IF NOT EXISTS "practice_material" ( "materialID" INTEGER NOT NULL UNIQUE, "learnerID" INTEGER NOT NULL, "instructorID" INTEGER NOT NULL, "skillID" INTEGER NOT NULL, "materialTitle" TEXT NOT NULL, "materialLink" TEXT NOT NULL, "submittedDate" TEXT NOT NULL, FOREIGN KEY("learnerID") REFERENCES "user"("userId"), FOREIGN KEY("instructorID") REFERENCES "user"("userId"), FOREIGN KEY("skillID") REFERENCES "skills"("skillID"), PRIMARY KEY("materialID" AUTOINCREMENT) );
+CREATE TABLE IF NOT EXISTS "assignments" ( "assignmentID" INTEGER NOT NULL UNIQUE, "instructorID" INTEGER NOT NULL, "skillID" INTEGER NOT NULL, "title" TEXT NOT NULL, "description" TEXT, "dueDate" TEXT, FOREIGN KEY("instructorID") REFERENCES "user"("userId"), FOREIGN KEY("skillID") REFERENCES "skills"("skillID"), PRIMARY KEY("assignmentID" AUTOINCREMENT) );
+CREATE TABLE IF NOT EXISTS "submissions" ( "submissionID" INTEGER NOT NULL UNIQUE, "assignmentID" INTEGER NOT NULL, "learnerID" INTEGER NOT NULL, "submissionDate" TEXT NOT NULL, "status" TEXT NOT NULL DEFAULT 'Completed', FOREIGN KEY("assignmentID") REFERENCES "assignments"("assignmentID"), FOREIGN KEY("learnerID") REFERENCES "user"("userId"), PRIMARY KEY("submissionID" AUTOINCREMENT) );
+CREATE TABLE IF NOT EXISTS "messages" ( "messageID" INTEGER NOT NULL UNIQUE, "senderID" INTEGER NOT NULL, "receiverID" INTEGER NOT NULL, "content" TEXT NOT NULL, "timestamp" TEXT NOT NULL, "isRead" INTEGER NOT NULL DEFAULT 0, FOREIGN KEY("senderID") REFERENCES "user"("userId"), FOREIGN KEY("receiverID") REFERENCES "user"("userId"), PRIMARY KEY("messageID" AUTOINCREMENT) );
+CREATE TABLE IF NOT EXISTS "surveys" (
+    "surveyID" INTEGER NOT NULL UNIQUE,
+    "creatorID" INTEGER NOT NULL,
+    "title" TEXT NOT NULL,
+    "questions" TEXT NOT NULL, -- Storing questions as a JSON string
+    "creationDate" TEXT NOT NULL,
+    FOREIGN KEY("creatorID") REFERENCES "user"("userId") ON DELETE CASCADE,
+    PRIMARY KEY("surveyID" AUTOINCREMENT)
+);
+CREATE TABLE IF NOT EXISTS "survey_responses" (
+    "responseID" INTEGER NOT NULL UNIQUE,
+    "surveyID" INTEGER NOT NULL,
+    "learnerID" INTEGER NOT NULL,
+    "responses" TEXT NOT NULL, -- Storing responses as a JSON string
+    "responseDate" TEXT NOT NULL,
+    FOREIGN KEY("surveyID") REFERENCES "surveys"("surveyID") ON DELETE CASCADE,
+    FOREIGN KEY("learnerID") REFERENCES "user"("userId") ON DELETE CASCADE,
+    PRIMARY KEY("responseID" AUTOINCREMENT)
+);
+"""
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _add_column(conn, table, column, declaration):
+    if column not in _columns(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+
+def _baseline(conn):
+    for statement in BASELINE_SCHEMA.split(";"):
+        if statement.strip():
+            conn.execute(statement)
+
+
+def _align_session_and_feedback(conn):
+    """Adds the columns the Session and Feedback models use, keeping the old ones and their data."""
+    _add_column(conn, "session", "learnerID", "INTEGER")
+    _add_column(conn, "session", "sessionDate", "TEXT")
+    conn.execute("UPDATE session SET sessionDate = session_date WHERE sessionDate IS NULL")
+    conn.execute("""
+        UPDATE session SET learnerID = (SELECT r.userId FROM request r WHERE r.reqId = session.requestID)
+        WHERE learnerID IS NULL
+    """)
+    _add_column(conn, "feedback", "learnerID", "INTEGER")
+    _add_column(conn, "feedback", "feedbackDate", "TEXT")
+
+
+def _normalize_request_skills(conn):
+    """Backfills request_skills and request.skillMask from the comma-separated reqSkills column."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS request_skills (
+            reqId INTEGER NOT NULL,
+            skillID INTEGER NOT NULL,
+            PRIMARY KEY (reqId, skillID),
+            FOREIGN KEY (reqId) REFERENCES request(reqId) ON DELETE CASCADE,
+            FOREIGN KEY (skillID) REFERENCES skills(skillID)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_request_skills_skill ON request_skills (skillID, reqId)")
+    _add_column(conn, "request", "skillMask", "INTEGER NOT NULL DEFAULT 0")
+
+    links, masks = [], []
+    for req_id, req_skills in conn.execute("SELECT reqId, reqSkills FROM request").fetchall():
+        try:
+            skill_ids = {int(part) for part in (req_skills or "").split(",") if part.strip()}
+            mask = stored_skill_mask(skill_ids)
+        except ValueError:
+            # Malformed rows keep an empty mask; matching skips them as before.
+            continue
+        links.extend((req_id, skill_id) for skill_id in skill_ids)
+        masks.append((mask, req_id))
+    conn.executemany("INSERT OR IGNORE INTO request_skills (reqId, skillID) VALUES (?, ?)", links)
+    conn.executemany("UPDATE request SET skillMask = ? WHERE reqId = ?", masks)
+
+
+# Characters of the last message kept in conversation_summary.lastPreview.
+PREVIEW_LENGTH = 100
+
+
+def _conversation_summary(conn):
+    """
+    Creates the per-user inbox table, keeps it current with a trigger on new messages and
+    backfills it from the existing messages.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS conversation_summary (
+            userID INTEGER NOT NULL,
+            partnerID INTEGER NOT NULL,
+            lastMessageID INTEGER NOT NULL,
+            lastPreview TEXT NOT NULL,
+            lastTimestamp TEXT NOT NULL,
+            unreadCount INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (userID, partnerID),
+            FOREIGN KEY (userID) REFERENCES user(userID) ON DELETE CASCADE,
+            FOREIGN KEY (partnerID) REFERENCES user(userID) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    """)
+    # The inbox, most recent conversation first.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_conversation_summary_recent ON conversation_summary (userID, lastTimestamp)")
+    # Message.mark_read only touches unread messages.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_unread ON messages (receiverID, senderID) WHERE isRead = 0")
+
+    # Runs inside the transaction of the INSERT, so the inbox can never disagree with messages.
+    # The sender's row gets the new last message; the receiver's row also gets one more unread.
+    last_message = """
+        lastMessageID = CASE WHEN (excluded.lastTimestamp, excluded.lastMessageID) >= (lastTimestamp, lastMessageID)
+                             THEN excluded.lastMessageID ELSE lastMessageID END,
+        lastPreview = CASE WHEN (excluded.lastTimestamp, excluded.lastMessageID) >= (lastTimestamp, lastMessageID)
+                           THEN excluded.lastPreview ELSE lastPreview END,
+        lastTimestamp = MAX(excluded.lastTimestamp, lastTimestamp)
+    """
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_messages_summary AFTER INSERT ON messages
+        BEGIN
+            INSERT INTO conversation_summary (userID, partnerID, lastMessageID, lastPreview, lastTimestamp, unreadCount)
+            VALUES (NEW.senderID, NEW.receiverID, NEW.messageID, substr(NEW.content, 1, {PREVIEW_LENGTH}), NEW.timestamp, 0)
+            ON CONFLICT (userID, partnerID) DO UPDATE SET {last_message};
+            INSERT INTO conversation_summary (userID, partnerID, lastMessageID, lastPreview, lastTimestamp, unreadCount)
+            VALUES (NEW.receiverID, NEW.senderID, NEW.messageID, substr(NEW.content, 1, {PREVIEW_LENGTH}), NEW.timestamp, NEW.isRead = 0)
+            ON CONFLICT (userID, partnerID) DO UPDATE SET {last_message}, unreadCount = unreadCount + (NEW.isRead = 0);
+        END
+    """)
+
+    summaries = {}
+    rows = conn.execute("SELECT messageID, senderID, receiverID, content, timestamp, isRead FROM messages ORDER BY timestamp, messageID")
+    for message_id, sender_id, receiver_id, content, timestamp, is_read in rows:
+        preview = (content or "")[:PREVIEW_LENGTH]
+        for user_id, partner_id, unread in ((sender_id, receiver_id, 0), (receiver_id, sender_id, int(not is_read))):
+            previous_unread = summaries.get((user_id, partner_id), (None, None, None, 0))[3]
+            summaries[(user_id, partner_id)] = (message_id, preview, timestamp, previous_unread + unread)
+    conn.executemany(
+        "INSERT OR REPLACE INTO conversation_summary (userID, partnerID, lastMessageID, lastPreview, lastTimestamp, unreadCount) VALUES (?, ?, ?, ?, ?, ?)",
+        [(user_id, partner_id, *summary) for (user_id, partner_id), summary in summaries.items()]
+    )
+
+
+def _full_text_search(conn):
+    """
+    Creates FTS5 indexes over message content and practice material titles, kept in sync by
+    triggers. Each document also indexes its participants as 'u<userID>' tokens, so a search can
+    be limited to the caller's own rows inside the index (see models/search.py).
+    The FTS tables are external-content tables over views: the text itself is not stored twice.
+    """
+    conn.execute("""
+        CREATE VIEW IF NOT EXISTS messages_search_source AS
+        SELECT messageID, content, 'u' || senderID || ' u' || receiverID AS participants FROM messages
+    """)
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+            content, participants,
+            content='messages_search_source', content_rowid='messageID', tokenize='porter unicode61'
+        )
+    """)
+    conn.execute("""
+        CREATE VIEW IF NOT EXISTS practice_material_search_source AS
+        SELECT materialID, materialTitle, 'u' || learnerID || ' u' || instructorID AS participants FROM practice_material
+    """)
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS practice_material_fts USING fts5(
+            materialTitle, participants,
+            content='practice_material_search_source', content_rowid='materialID', tokenize='porter unicode61'
+        )
+    """)
+
+    for table, key, text, owners in (
+        ("messages", "messageID", "content", ("senderID", "receiverID")),
+        ("practice_material", "materialID", "materialTitle", ("learnerID", "instructorID")),
+    ):
+        fts = f"{table}_fts"
+        new_row = f"NEW.{key}, NEW.{text}, 'u' || NEW.{owners[0]} || ' u' || NEW.{owners[1]}"
+        old_row = f"OLD.{key}, OLD.{text}, 'u' || OLD.{owners[0]} || ' u' || OLD.{owners[1]}"
+        columns = f"rowid, {text}, participants"
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO {fts} ({columns}) VALUES ({new_row});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table}
+            BEGIN
+                INSERT INTO {fts} ({fts}, {columns}) VALUES ('delete', {old_row});
+            END
+        """)
+        # Only the indexed columns: marking messages as read does not touch the index.
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE OF {text}, {', '.join(owners)} ON {table}
+            BEGIN
+                INSERT INTO {fts} ({fts}, {columns}) VALUES ('delete', {old_row});
+                INSERT INTO {fts} ({columns}) VALUES ({new_row});
+            END
+        """)
+        # Rank by the text only; the participant tokens are there for filtering.
+        conn.execute(f"INSERT INTO {fts} ({fts}, rank) VALUES ('rank', 'bm25(1.0, 0.0)')")
+        conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+
+def _request_slots(conn):
+    """
+    Adds the booked session to request: slotStart ('HH:MM', or NULL for a day-only booking) and
+    slotDate, the date of the session. Existing bookings get the first requestDay on or after the
+    day they were requested, and no start, so the slot book gives them the earliest free slot.
+    """
+    _add_column(conn, "request", "slotStart", "TEXT")
+    _add_column(conn, "request", "slotDate", "TEXT")
+    rows = conn.execute("""
+        SELECT reqId, requestDay, requestDate FROM request
+        WHERE fulfilled IN ('matched', 'accepted') AND instructorId IS NOT NULL AND slotDate IS NULL
+    """).fetchall()
+    dates = []
+    for req_id, request_day, request_date in rows:
+        try:
+            requested = date.fromisoformat(request_date[:10])
+        except (TypeError, ValueError):
+            requested = date.today()
+        dates.append((session_date(request_day, requested), req_id))
+    conn.executemany("UPDATE request SET slotDate = ? WHERE reqId = ?", dates)
+    # Request.get_booked_slots (covering).
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_request_booked_slots ON request (fulfilled, slotDate, instructorId, requestDay, slotStart)")
+
+
+# (version, description, migration). A migration is a function taking the connection, or a list of
+# SQL statements. Migrations only move forward: never edit one that has shipped, add a new one.
+MIGRATIONS = [
+    (1, "baseline schema", _baseline),
+    (2, "session and feedback columns used by the models", _align_session_and_feedback),
+    # Chosen from EXPLAIN QUERY PLAN of the model queries; check_query_plans.py keeps them honest.
+    (3, "indexes for model queries", [
+        "CREATE INDEX IF NOT EXISTS idx_user_role ON user (userRole)",
+        # get_pending and get_pending_for_instructor.
+        "CREATE INDEX IF NOT EXISTS idx_request_status_instructor ON request (fulfilled, instructorId, requestDay)",
+        "CREATE INDEX IF NOT EXISTS idx_session_instructor ON session (instructorID, sessionDate)",
+        "CREATE INDEX IF NOT EXISTS idx_session_learner ON session (learnerID, sessionDate)",
+        "CREATE INDEX IF NOT EXISTS idx_feedback_session ON feedback (sessionID)",
+        "CREATE INDEX IF NOT EXISTS idx_practice_material_learner ON practice_material (learnerID, submittedDate)",
+        "CREATE INDEX IF NOT EXISTS idx_submissions_learner ON submissions (learnerID, assignmentID)",
+        # One conversation direction each; the other direction and the partner list use the second index.
+        "CREATE INDEX IF NOT EXISTS idx_messages_pair ON messages (senderID, receiverID, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_messages_receiver ON messages (receiverID, senderID)",
+    ]),
+    (4, "request_skills junction table and request.skillMask", _normalize_request_skills),
+    (5, "conversation_summary inbox table with unread counts", _conversation_summary),
+    (6, "FTS5 search over messages and practice material", _full_text_search),
+    (7, "request.slotStart and request.slotDate for booked sessions", _request_slots),
+]
+
+
+def get_version(conn):
+    """Returns the highest applied migration version, or 0 for a database that was never migrated."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            appliedAt TEXT NOT NULL
+        )
+    """)
+    row = conn.execute("SELECT MAX(version) FROM schema_migrations").fetchone()
+    return row[0] or 0
+
+
+def apply_migrations(conn, target=None):
+    """
+    Applies every migration newer than the database's version on a connection, each in its own
+    transaction. Returns the list of versions applied; a failing migration is rolled back and re-raised.
+    """
+    applied = []
+    current = get_version(conn)
+    conn.commit()
+    for version, description, migration in MIGRATIONS:
+        if version <= current or (target is not None and version > target):
+            continue
+        try:
+            conn.execute("BEGIN")
+            if callable(migration):
+                migration(conn)
+            else:
+                for statement in migration:
+                    conn.execute(statement)
+            conn.execute(
+                "INSERT INTO schema_migrations (version, description, appliedAt) VALUES (?, ?, ?)",
+                (version, description, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            print(f"Migration {version} ({description}) failed: {e}")
+            raise
+        applied.append(version)
+    return applied
+
+
+def migrate(db, target=None):
+    """Brings a Database up to date through its writer connection (see apply_migrations)."""
+    with db.connect() as conn:
+        return apply_migrations(conn, target)
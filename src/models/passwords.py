@@ -0,0 +1,69 @@
+# models/passwords.py
+import base64
+import hashlib
+import hmac
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# Unsalted SHA-256 hex digests, as stored before scrypt; still accepted, and replaced on the next login.
+_LEGACY_SHA256 = re.compile(r"[0-9a-f]{64}")
+
+
+def create_hash_executor(max_workers):
+    """
+    Thread pool that hashes passwords off the Flet event loop. hashlib.scrypt releases the GIL,
+    so hashes run in parallel; the pool's size also bounds the memory used by a burst of logins.
+    """
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hash")
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+class ScryptHasher:
+    """
+    Salted scrypt password hashes, stored as "scrypt$N$r$p$salt$key" (salt and key in base64)
+    so every hash carries its own cost settings. Any object with the same hash/verify/needs_rehash
+    methods can be passed to the User model instead.
+    """
+    scheme = "scrypt"
+
+    def __init__(self, n=2 ** 14, r=8, p=1, salt_bytes=16, key_bytes=32):
+        self.n, self.r, self.p = n, r, p
+        self.salt_bytes = salt_bytes
+        self.key_bytes = key_bytes
+
+    @staticmethod
+    def _derive(password, salt, n, r, p, key_bytes):
+        # OpenSSL's default limit is 32 MB; allow what these settings need (128 * r * N bytes and a little more).
+        maxmem = 128 * r * (n + p + 2) + 1024 * 1024
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=maxmem, dklen=key_bytes)
+
+    def hash(self, password):
+        """Hashes a password with a new random salt at the current cost."""
+        salt = os.urandom(self.salt_bytes)
+        key = self._derive(password, salt, self.n, self.r, self.p, self.key_bytes)
+        return f"{self.scheme}${self.n}${self.r}${self.p}${_b64(salt)}${_b64(key)}"
+
+    def verify(self, password, stored):
+        """Checks a password against a stored scrypt hash, or a legacy SHA-256 one, in constant time."""
+        if not stored:
+            return False
+        if _LEGACY_SHA256.fullmatch(stored):
+            return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored)
+        try:
+            scheme, n, r, p, salt, key = stored.split("$")
+            if scheme != self.scheme:
+                return False
+            key = base64.b64decode(key)
+            derived = self._derive(password, base64.b64decode(salt), int(n), int(r), int(p), len(key))
+        except ValueError:
+            return False
+        return hmac.compare_digest(derived, key)
+
+    def needs_rehash(self, stored):
+        """True for legacy hashes and for hashes made with other cost settings than the current ones."""
+        parts = (stored or "").split("$")
+        return len(parts) != 6 or parts[:4] != [self.scheme, str(self.n), str(self.r), str(self.p)]
@@ -2,6 +2,8 @@
 import sqlite3
 from datetime import datetime
 
+from models.search import fts_query, SNIPPET_START, SNIPPET_END, SNIPPET_ELLIPSIS
+
 class PracticeMaterial:
     """Model for the 'practice_material' table."""
     def __init__(self, db):
@@ -15,11 +17,7 @@ class PracticeMaterial:
         """
         submitted_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         try:
-            with self.db.connect() as conn:
-                cursor = conn.cursor()
-                cursor.execute(sql, (learner_id, instructor_id, skill_id, title, link, submitted_date))
-                conn.commit()
-                return cursor.lastrowid
+            return self.db.insert(sql, (learner_id, instructor_id, skill_id, title, link, submitted_date))
         except sqlite3.Error as e:
             print(f"Database error creating practice material: {e}")
             return None
@@ -34,7 +32,34 @@ class PracticeMaterial:
             WHERE pm.learnerID = ?
             ORDER BY pm.submittedDate DESC
         """
-        with self.db.connect() as conn:
+        with self.db.connect(read_only=True) as conn:
             cursor = conn.cursor()
             cursor.execute(sql, (learner_id,))
             return cursor.fetchall()
+
+    def search(self, user_id, text, limit=20):
+        """
+        Full-text search over the titles of practice materials user_id gave or received, best
+        match first, with a snippet of the title with the matched words marked.
+        """
+        query = fts_query(text, user_id, "materialTitle")
+        if query is None:
+            return []
+        sql = """
+            SELECT pm.materialID, pm.materialTitle, pm.materialLink, pm.submittedDate, s.skillName,
+                   snippet(practice_material_fts, 0, ?, ?, ?, 12) AS snippet
+            FROM practice_material_fts
+            JOIN practice_material pm ON pm.materialID = practice_material_fts.rowid
+            JOIN skills s ON pm.skillID = s.skillID
+            WHERE practice_material_fts MATCH ?
+            ORDER BY practice_material_fts.rank
+            LIMIT ?
+        """
+        try:
+            with self.db.connect(read_only=True) as conn:
+                cursor = conn.cursor()
+                cursor.execute(sql, (SNIPPET_START, SNIPPET_END, SNIPPET_ELLIPSIS, query, limit))
+                return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Database error searching practice materials: {e}")
+            return []
@@ -7,9 +7,12 @@ class Profile:
         self.db = db
 
     def get(self, user_id):
-        """Retrieves a user's profile data by their user ID."""
+        """Retrieves a user's profile data by their user ID (cached; see Database.cached)."""
+        return self.db.cached(('profile', user_id), lambda: self._load(user_id))
+
+    def _load(self, user_id):
         sql = "SELECT * FROM user_profiles WHERE userID = ?"
-        with self.db.connect() as conn:
+        with self.db.connect(read_only=True) as conn:
             cursor = conn.cursor()
             cursor.execute(sql, (user_id,))
             return cursor.fetchone()
@@ -54,7 +57,8 @@ class Profile:
                 cursor = conn.cursor()
                 cursor.execute(sql, full_data)
                 conn.commit()
-                return True
+            self.db.invalidate(('profile', user_id))
+            return True
         except sqlite3.Error as e:
             print(f"Database error updating profile: {e}")
             return False
@@ -1,5 +1,30 @@
 # models/request.py
 import sqlite3
+from datetime import date, timedelta
+
+from models.skill import stored_skill_mask
+
+# Number of request IDs bound per IN (...) list, kept below SQLite's host parameter limit.
+BULK_CHUNK_SIZE = 500
+
+# In date.weekday() order.
+DAYS_OF_WEEK = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def parse_skill_ids(req_skills):
+    """Parses a comma-separated skill ID string such as '1,3' into a sorted list of ints."""
+    return sorted({int(part) for part in req_skills.split(',') if part.strip()})
+
+
+def session_date(day, today=None):
+    """Returns the ISO date of the next `day` (e.g. 'Monday') on or after today, or None for an unknown day."""
+    today = today or date.today()
+    try:
+        offset = (DAYS_OF_WEEK.index(day) - today.weekday()) % 7
+    except ValueError:
+        return None
+    return (today + timedelta(days=offset)).isoformat()
+
 
 class Request:
     """Model for the 'request' table."""
@@ -7,52 +32,123 @@ class Request:
         self.db = db
 
     def create(self, user_id, req_skills, request_day):
-        """Creates a new session request with 'pending' status."""
-        sql = "INSERT INTO request(userId, reqSkills, requestDay, fulfilled) VALUES(?,?,?,?)"
+        """
+        Creates a new session request with 'pending' status.
+        The requested skills are stored as the reqSkills string, the skillMask bitmask and
+        request_skills rows, all in one transaction.
+        """
+        sql = "INSERT INTO request(userId, reqSkills, skillMask, requestDay, fulfilled) VALUES(?,?,?,?,?)"
+        try:
+            skill_ids = parse_skill_ids(req_skills)
+            skill_mask = stored_skill_mask(skill_ids)
+        except (ValueError, AttributeError):
+            return f"Invalid skills for request: {req_skills!r}"
         try:
             with self.db.connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute(sql, (user_id, req_skills, request_day, 'pending'))
+                cursor.execute(sql, (user_id, req_skills, skill_mask, request_day, 'pending'))
+                req_id = cursor.lastrowid
+                cursor.executemany(
+                    "INSERT INTO request_skills (reqId, skillID) VALUES (?, ?)",
+                    [(req_id, skill_id) for skill_id in skill_ids]
+                )
                 conn.commit()
-                return cursor.lastrowid
+                return req_id
         except sqlite3.Error as e:
             return f"Database error creating request: {e}"
 
     def get_pending(self):
         """Retrieves all requests that are pending a match."""
         sql = """
-            SELECT r.reqId, r.userId, r.reqSkills, r.requestDay, u.userName, u.userLat, u.userLong
+            SELECT r.reqId, r.userId, r.reqSkills, r.skillMask, r.requestDay, u.userName, u.userLat, u.userLong
             FROM request r
             JOIN user u ON r.userId = u.userId
             WHERE r.fulfilled = 'pending'
+            ORDER BY r.reqId
         """
-        with self.db.connect() as conn:
+        with self.db.connect(read_only=True) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute(sql)
             return [dict(row) for row in cursor.fetchall()]
 
+    def get_by_id(self, req_id):
+        """Retrieves a single request with its learner's location, or None if it does not exist."""
+        sql = """
+            SELECT r.reqId, r.userId, r.reqSkills, r.skillMask, r.requestDay, r.fulfilled, u.userName, u.userLat, u.userLong
+            FROM request r
+            JOIN user u ON r.userId = u.userId
+            WHERE r.reqId = ?
+        """
+        with self.db.connect(read_only=True) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(sql, (req_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
+    def get_by_ids(self, req_ids):
+        """Retrieves several requests with their learners' locations in one query, in reqId order."""
+        req_ids = list(req_ids)
+        if not req_ids:
+            return []
+        sql = f"""
+            SELECT r.reqId, r.userId, r.reqSkills, r.skillMask, r.requestDay, r.fulfilled, u.userName, u.userLat, u.userLong
+            FROM request r
+            JOIN user u ON r.userId = u.userId
+            WHERE r.reqId IN ({",".join("?" * len(req_ids))})
+            ORDER BY r.reqId
+        """
+        with self.db.connect(read_only=True) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(sql, req_ids)
+            return [dict(row) for row in cursor.fetchall()]
+
     def get_pending_for_instructor(self, instructor_id):
         """Retrieves all requests assigned to a specific instructor that are pending their approval."""
         sql = """
-            SELECT r.reqId, r.userId, r.reqSkills, r.requestDay, u.userName AS learner_name
+            SELECT r.reqId, r.userId, r.reqSkills, r.skillMask, r.requestDay, u.userName AS learner_name
             FROM request r
             JOIN user u ON r.userId = u.userId
             WHERE r.fulfilled = 'matched' AND r.instructorId = ?
         """
-        with self.db.connect() as conn:
+        with self.db.connect(read_only=True) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute(sql, (instructor_id,))
             return [dict(row) for row in cursor.fetchall()]
 
-    def assign_instructor(self, req_id, instructor_id):
-        """Assigns an instructor to a request and updates its status to 'matched'."""
-        sql = "UPDATE request SET instructorId = ?, fulfilled = 'matched' WHERE reqId = ?"
+    def get_booked_slots(self, today=None):
+        """
+        Lists the matched or accepted requests holding a session in the coming week: those whose
+        slotDate is today or later. slotStart is the booked 'HH:MM' start, or None for a day-only
+        booking. Sessions already past no longer count against the instructor's capacity.
+        """
+        sql = """
+            SELECT instructorId, requestDay, slotStart
+            FROM request
+            WHERE slotDate >= ? AND fulfilled IN ('matched', 'accepted') AND instructorId IS NOT NULL
+        """
+        with self.db.connect(read_only=True) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(sql, ((today or date.today()).isoformat(),))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def assign_instructor(self, req_id, instructor_id, slot_start=None):
+        """
+        Assigns an instructor to a request and updates its status to 'matched'. The session is
+        booked on the next requestDay, at slot_start ('HH:MM') if given.
+        """
+        sql = "UPDATE request SET instructorId = ?, fulfilled = 'matched', slotStart = ?, slotDate = ? WHERE reqId = ?"
         try:
             with self.db.connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute(sql, (instructor_id, req_id))
+                cursor.execute("SELECT requestDay FROM request WHERE reqId = ?", (req_id,))
+                row = cursor.fetchone()
+                slot_date = session_date(row[0]) if row else None
+                cursor.execute(sql, (instructor_id, slot_start, slot_date, req_id))
                 conn.commit()
                 return True
         except sqlite3.Error as e:
@@ -73,3 +169,114 @@ class Request:
             # It's good practice to log the error
             print(f"Database error in update_status for reqId {req_id}: {e}")
             return False
+
+    def _existing_ids(self, cursor, req_ids):
+        """Returns the subset of req_ids present in the table, in chunks of IN lists."""
+        found = set()
+        for start in range(0, len(req_ids), BULK_CHUNK_SIZE):
+            chunk = req_ids[start:start + BULK_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"SELECT reqId FROM request WHERE reqId IN ({placeholders})", chunk)
+            found.update(row[0] for row in cursor.fetchall())
+        return found
+
+    def _pending_days(self, cursor, req_ids):
+        """Returns {reqId: requestDay} for the requests in req_ids that are still pending, in chunks of IN lists."""
+        days = {}
+        for start in range(0, len(req_ids), BULK_CHUNK_SIZE):
+            chunk = req_ids[start:start + BULK_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"SELECT reqId, requestDay FROM request WHERE reqId IN ({placeholders}) AND fulfilled = 'pending'", chunk)
+            days.update((row[0], row[1]) for row in cursor.fetchall())
+        return days
+
+    def _held_slots(self, cursor, instructor_ids, today):
+        """Returns the (instructorId, slotDate, slotStart) sessions booked today or later for the given instructors."""
+        held = set()
+        instructor_ids = list(instructor_ids)
+        for start in range(0, len(instructor_ids), BULK_CHUNK_SIZE):
+            chunk = instructor_ids[start:start + BULK_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"""
+                SELECT instructorId, slotDate, slotStart FROM request
+                WHERE fulfilled IN ('matched', 'accepted') AND slotDate >= ? AND slotStart IS NOT NULL
+                    AND instructorId IN ({placeholders})
+            """, [today.isoformat(), *chunk])
+            held.update((row[0], row[1], row[2]) for row in cursor.fetchall())
+        return held
+
+    def assign_many(self, assignments):
+        """
+        Assigns instructors to many requests in one transaction.
+        `assignments` is an iterable of (reqId, instructorId) or (reqId, instructorId, slotStart)
+        pairs; each session is booked on the next requestDay, at slotStart if given. Only requests
+        that are still pending are assigned, so a request matched elsewhere in the meantime is not
+        overwritten, and a session whose instructor, date and start are already booked (by an
+        earlier request or an earlier row of the batch) is refused, so two matchers working from
+        stale slot books cannot double-book a slot. Returns {reqId: True/False} with the outcome
+        of every row; on a database error the whole batch is rolled back and every row reports False.
+        """
+        assignments = list(assignments)
+        req_ids = [assignment[0] for assignment in assignments]
+        if not assignments:
+            return {}
+        sql = """
+            UPDATE request SET instructorId = ?, fulfilled = 'matched', slotStart = ?, slotDate = ?
+            WHERE reqId = ? AND fulfilled = 'pending'
+        """
+        today = date.today()
+        try:
+            with self.db.connect() as conn:
+                cursor = conn.cursor()
+                # The writer connection is held for the whole block, so no other write can slip in
+                # between this check and the update.
+                pending = self._pending_days(cursor, req_ids)
+                timed = {assignment[1] for assignment in assignments if len(assignment) > 2 and assignment[2]}
+                held = self._held_slots(cursor, timed, today) if timed else set()
+                rows = []
+                outcomes = {}
+                for req_id, instructor_id, *slot in assignments:
+                    # A request listed twice is only assigned once, to its first instructor.
+                    if req_id in outcomes:
+                        continue
+                    outcomes[req_id] = req_id in pending
+                    if not outcomes[req_id]:
+                        continue
+                    slot_start = slot[0] if slot else None
+                    slot_date = session_date(pending[req_id], today)
+                    if slot_start:
+                        if (instructor_id, slot_date, slot_start) in held:
+                            outcomes[req_id] = False
+                            continue
+                        held.add((instructor_id, slot_date, slot_start))
+                    rows.append((instructor_id, slot_start, slot_date, req_id))
+                cursor.executemany(sql, rows)
+                conn.commit()
+                return outcomes
+        except sqlite3.Error as e:
+            print(f"Error assigning {len(assignments)} requests: {e}")
+            return {req_id: False for req_id in req_ids}
+
+    def update_status_many(self, updates):
+        """
+        Updates the status of many requests in one transaction.
+        `updates` is an iterable of (reqId, status) pairs. Returns {reqId: True/False}, False for
+        requests that do not exist; on a database error the whole batch is rolled back and every
+        row reports False.
+        """
+        updates = list(updates)
+        req_ids = [req_id for req_id, _ in updates]
+        if not updates:
+            return {}
+        sql = "UPDATE request SET fulfilled = ? WHERE reqId = ?"
+        try:
+            with self.db.connect() as conn:
+                cursor = conn.cursor()
+                existing = self._existing_ids(cursor, req_ids)
+                rows = [(status, req_id) for req_id, status in updates if req_id in existing]
+                cursor.executemany(sql, rows)
+                conn.commit()
+                return {req_id: req_id in existing for req_id in req_ids}
+        except sqlite3.Error as e:
+            print(f"Database error in update_status_many for {len(updates)} requests: {e}")
+            return {req_id: False for req_id in req_ids}
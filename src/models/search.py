@@ -0,0 +1,35 @@
+# models/search.py
+import re
+
+# FTS5 tables created by migration 6 and kept in sync with their content tables by triggers.
+SEARCH_TABLES = ("messages_fts", "practice_material_fts")
+# Markers around matched words in search snippets.
+SNIPPET_START, SNIPPET_END, SNIPPET_ELLIPSIS = "[", "]", "…"
+
+
+def fts_query(text, user_id, column):
+    """
+    Builds an FTS5 MATCH expression for free text typed by a user: every word must appear in
+    `column` (the last one as a prefix, for search-as-you-type), and the row must be one of
+    user_id's own. Words are quoted, so FTS5 operators in the input are searched for literally.
+    Returns None when the text has no words.
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return None
+    terms = " ".join(f'"{word}"' for word in words[:-1])
+    terms = f'{terms} "{words[-1]}"*'.strip()
+    return f'participants : "u{int(user_id)}" AND {column} : ({terms})'
+
+
+def rebuild_search_index(conn):
+    """Rebuilds every FTS index from its content table, e.g. after rows were changed with triggers disabled."""
+    for table in SEARCH_TABLES:
+        conn.execute(f"INSERT INTO {table} ({table}) VALUES ('rebuild')")
+    conn.commit()
+
+
+def check_search_index(conn):
+    """Checks every FTS index against its content table; raises sqlite3.DatabaseError if one is out of sync."""
+    for table in SEARCH_TABLES:
+        conn.execute(f"INSERT INTO {table} ({table}, rank) VALUES ('integrity-check', 1)")
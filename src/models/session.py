@@ -29,7 +29,7 @@ class Session:
             WHERE s.instructorID = ?
             ORDER BY s.sessionDate DESC
         """
-        with self.db.connect() as conn:
+        with self.db.connect(read_only=True) as conn:
             cursor = conn.cursor()
             cursor.execute(sql, (instructor_id,))
             return cursor.fetchall()
@@ -44,7 +44,7 @@ class Session:
             WHERE s.learnerID = ?
             ORDER BY s.sessionDate DESC
         """
-        with self.db.connect() as conn:
+        with self.db.connect(read_only=True) as conn:
             cursor = conn.cursor()
             cursor.execute(sql, (learner_id,))
             return cursor.fetchall()
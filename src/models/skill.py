@@ -1,5 +1,31 @@
 # models/skill.py
-import sqlite3
+
+# request.skillMask is a signed 64-bit SQLite INTEGER, so only skill IDs 0-62 have a bit in it.
+MAX_SKILL_ID = 62
+# Stored in request.skillMask when a request uses a larger skill ID; readers then build the mask
+# from reqSkills instead, as a Python int, which has no size limit.
+OVERSIZED_MASK = -1
+
+
+def skills_to_mask(skill_ids):
+    """
+    Packs an iterable of skill IDs into an integer bitmask (bit N = skill N), of any size.
+    Raises ValueError for a negative or non-numeric ID.
+    """
+    mask = 0
+    for skill_id in skill_ids:
+        skill_id = int(skill_id)
+        if skill_id < 0:
+            raise ValueError(f"Skill ID {skill_id} is negative")
+        mask |= 1 << skill_id
+    return mask
+
+
+def stored_skill_mask(skill_ids):
+    """The value for request.skillMask: the bitmask, or OVERSIZED_MASK if a skill ID is above MAX_SKILL_ID."""
+    mask = skills_to_mask(skill_ids)
+    return mask if mask.bit_length() <= MAX_SKILL_ID + 1 else OVERSIZED_MASK
+
 
 class Skill:
     """Model for the 'skills' table."""
@@ -7,9 +33,12 @@ class Skill:
         self.db = db
 
     def get_all(self):
-        """Retrieves all available skills."""
+        """Retrieves all available skills; the list is served from the cache when one is configured."""
+        return list(self.db.cached(('skills',), self._load_all))
+
+    def _load_all(self):
         sql = "SELECT * FROM skills ORDER BY skillName"
-        with self.db.connect() as conn:
+        with self.db.connect(read_only=True) as conn:
             cursor = conn.cursor()
             cursor.execute(sql)
-            return cursor.fetchall()
+            return tuple(cursor.fetchall())
@@ -1,20 +1,21 @@
 # models/user.py
 import sqlite3
-import hashlib
+
+from models.passwords import ScryptHasher
 
 class User:
-    """Model for the 'user' table."""
-    def __init__(self, db):
+    """
+    Model for the 'user' table. Passwords are stored as hashes made by `hasher` (scrypt by
+    default). Hashing is deliberately slow, so create and authenticate should not be run on
+    the event loop (see Controller).
+    """
+    def __init__(self, db, hasher=None):
         self.db = db
-
-    @staticmethod
-    def _hash_password(password):
-        """Hashes the password using SHA256 for secure storage."""
-        return hashlib.sha256(password.encode()).hexdigest()
+        self.hasher = hasher or ScryptHasher()
 
     def create(self, user_role, user_name, user_pass, user_email, user_lat=None, user_long=None):
         """Creates a new user in the database."""
-        hashed_pass = self._hash_password(user_pass)
+        hashed_pass = self.hasher.hash(user_pass)
         sql = '''INSERT INTO user(userRole, userName, userPass, userEmail, userLat, userLong)
                  VALUES(?,?,?,?,?,?)'''
         try:
@@ -22,26 +23,47 @@ class User:
                 cursor = conn.cursor()
                 cursor.execute(sql, (user_role, user_name, hashed_pass, user_email, user_lat, user_long))
                 conn.commit()
-                return cursor.lastrowid
+            # A lookup of this name made before it was registered may have cached "no such user".
+            self.db.invalidate(('user', user_name))
+            return cursor.lastrowid
         except sqlite3.IntegrityError:
             return "Error: Username or email already exists."
         except sqlite3.Error as e:
             return f"Database error: {e}"
 
     def authenticate(self, user_name, password):
-        """Authenticates a user by checking username and hashed password."""
+        """
+        Authenticates a user by checking username and hashed password. A legacy SHA-256 hash, or
+        one made with older cost settings, is replaced by a current hash once the password is known to match.
+        """
         user = self.get_by_username(user_name)
-        if user:
-            print(f"Stored Hashed Pass: {user['userPass']}")
-            print(f"Input Hashed Pass: {self._hash_password(password)}")
-        if user and user['userPass'] == self._hash_password(password):
-            return user
-        return None
+        if not user or not self.hasher.verify(password, user['userPass']):
+            return None
+        if self.hasher.needs_rehash(user['userPass']):
+            self._rehash_password(user, password)
+        return user
+
+    def _rehash_password(self, user, password):
+        """Stores a current hash of a verified password, unless the password was changed meanwhile."""
+        sql = "UPDATE user SET userPass = ? WHERE userId = ? AND userPass = ?"
+        # Hashed before taking the writer, which other sessions are waiting for.
+        new_hash = self.hasher.hash(password)
+        try:
+            with self.db.connect() as conn:
+                conn.execute(sql, (new_hash, user['userId'], user['userPass']))
+                conn.commit()
+            self.db.invalidate(('user', user['userName']))
+        except sqlite3.Error as e:
+            # The old hash still works, so the login goes ahead and the upgrade is retried next time.
+            print(f"Database error upgrading password hash: {e}")
 
     def get_by_username(self, user_name):
-        """Retrieves a single user by their username."""
+        """Retrieves a single user by their username (cached; see Database.cached)."""
+        return self.db.cached(('user', user_name), lambda: self._load_by_username(user_name))
+
+    def _load_by_username(self, user_name):
         sql = "SELECT * FROM user WHERE userName = ?"
-        with self.db.connect() as conn:
+        with self.db.connect(read_only=True) as conn:
             cursor = conn.cursor()
             cursor.execute(sql, (user_name,))
             return cursor.fetchone()
@@ -49,7 +71,7 @@ class User:
     def check_username(self, user_name):
         """Checks if a username already exists. Returns True if it exists, False otherwise."""
         sql = "SELECT 1 FROM user WHERE userName = ?"
-        with self.db.connect() as conn:
+        with self.db.connect(read_only=True) as conn:
             cursor = conn.cursor()
             cursor.execute(sql, (user_name,))
             return cursor.fetchone() is not None
@@ -57,7 +79,7 @@ class User:
     def get_all_instructors(self):
         """Retrieves all users with the 'instructor' role."""
         sql = "SELECT * FROM user WHERE userRole = 'instructor'"
-        with self.db.connect() as conn:
+        with self.db.connect(read_only=True) as conn:
             cursor = conn.cursor()
             cursor.execute(sql)
             return cursor.fetchall()
@@ -65,7 +87,7 @@ class User:
     def get_instructor_availability(self, instructor_id):
         """Gets the weekly availability for a specific instructor."""
         sql = "SELECT day, startTime, endTime FROM instructor_availability WHERE instructorID = ?"
-        with self.db.connect() as conn:
+        with self.db.connect(read_only=True) as conn:
             cursor = conn.cursor()
             cursor.execute(sql, (instructor_id,))
             return cursor.fetchall()
@@ -73,8 +95,24 @@ class User:
     def get_instructor_skills(self, instructor_id):
         """Gets the skill IDs for a specific instructor."""
         sql = "SELECT skillID FROM instructor_skills WHERE instructorID = ?"
-        with self.db.connect() as conn:
+        with self.db.connect(read_only=True) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute(sql, (instructor_id,))
             return [row['skillID'] for row in cursor.fetchall()]
+
+    def get_all_instructor_skills(self):
+        """Gets every (instructorID, skillID) pair in a single query."""
+        sql = "SELECT instructorID, skillID FROM instructor_skills"
+        with self.db.connect(read_only=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql)
+            return cursor.fetchall()
+
+    def get_all_instructor_availability(self):
+        """Gets the weekly availability of every instructor in a single query."""
+        sql = "SELECT instructorID, day, startTime, endTime FROM instructor_availability"
+        with self.db.connect(read_only=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql)
+            return cursor.fetchall()
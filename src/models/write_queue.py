@@ -0,0 +1,123 @@
+# models/write_queue.py
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """
+    Group commit for single-row inserts: statements submitted from any thread are written by one
+    background thread, up to `max_batch_rows` at a time in a single transaction, so a burst of
+    chat messages costs one commit (and one fsync) instead of one per message. A batch is
+    written as soon as it is full or `max_delay_ms` after its first row arrived; with the
+    default of 0 it holds the rows that queued up while the previous batch was committing,
+    so a lone writer is not delayed.
+
+    `write` is what Database.insert uses: when no rows are queued and the writer connection is
+    free it commits the row inline, since a lone writer has no other rows to share the commit
+    with and the hand-off to the background thread would only add latency. Group commit
+    therefore only pays off with concurrent writers.
+
+    `submit` returns a concurrent.futures.Future that resolves to the row's lastrowid once the
+    batch has committed, or raises the sqlite3.Error that row caused. At most `max_pending`
+    rows wait in the queue; when it is full, `submit` blocks for up to `put_timeout` seconds
+    and then raises sqlite3.OperationalError. `close` writes everything already queued.
+    """
+    def __init__(self, db, max_batch_rows=200, max_delay_ms=0, max_pending=10000, put_timeout=10):
+        self.db = db
+        self.max_batch_rows = max_batch_rows
+        self.max_delay_ms = max_delay_ms
+        self.put_timeout = put_timeout
+        self.batches_written = 0
+        self.rows_written = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        self._close_lock = threading.Lock()
+        # A daemon thread, so a missing close() cannot hang interpreter exit; Database.close flushes it.
+        self._thread = threading.Thread(target=self._run, name="db-write-behind", daemon=True)
+        self._thread.start()
+
+    def write(self, sql, params=()):
+        """Inserts one row and returns its rowid: inline without contention, otherwise through the queue."""
+        if self._queue.empty() and not self._closed:
+            with self.db.connect(blocking=False) as conn:
+                if conn is not None:
+                    return self._execute([(sql, params, None)])[0]
+        return self.submit(sql, params).result()
+
+    def submit(self, sql, params=()):
+        """Queues one INSERT and returns a Future for its rowid."""
+        future = Future()
+        # Held while queueing, so no row can land behind the stop marker put by close().
+        with self._close_lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("The write queue is closed.")
+            try:
+                self._queue.put((sql, params, future), timeout=self.put_timeout)
+            except queue.Full:
+                raise sqlite3.OperationalError(f"Write queue still full after {self.put_timeout}s") from None
+        return future
+
+    def close(self, timeout=None):
+        """Stops accepting rows, writes the ones already queued and waits for the writer thread."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.max_delay_ms / 1000
+            while len(batch) < self.max_batch_rows:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch):
+        """Writes a batch in one transaction; if it fails, retries each row alone so one bad row fails only its own future."""
+        try:
+            rowids = self._execute(batch)
+        except Exception:
+            for item in batch:
+                self._write_one(item)
+            return
+        for (_, _, future), rowid in zip(batch, rowids):
+            future.set_result(rowid)
+
+    def _write_one(self, item):
+        try:
+            rowid = self._execute([item])[0]
+        except Exception as e:
+            item[2].set_exception(e)
+        else:
+            item[2].set_result(rowid)
+
+    def _execute(self, batch):
+        with self.db.connect() as conn:
+            cursor = conn.cursor()
+            rowids = []
+            for sql, params, _ in batch:
+                cursor.execute(sql, params)
+                rowids.append(cursor.lastrowid)
+            conn.commit()
+        self.batches_written += 1
+        self.rows_written += len(batch)
+        return rowids
@@ -0,0 +1,50 @@
+# search_index.py
+"""
+Maintenance for the full-text search indexes over messages and practice materials.
+
+The FTS5 indexes are kept in sync by triggers, so this is only needed after rows were changed
+outside the app with the triggers missing (e.g. a bulk import), or to confirm that they match.
+
+Run from the src directory:
+    python search_index.py check
+    python search_index.py rebuild
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+src_dir = os.path.dirname(os.path.abspath(__file__))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+import config
+from models.search import SEARCH_TABLES, check_search_index, rebuild_search_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check or rebuild the full-text search indexes.")
+    parser.add_argument("command", choices=("check", "rebuild"))
+    options = parser.parse_args()
+
+    conn = sqlite3.connect(config.DB_PATH, timeout=config.DB_POOL_TIMEOUT)
+    try:
+        start = time.perf_counter()
+        if options.command == "rebuild":
+            rebuild_search_index(conn)
+            print(f"Rebuilt {', '.join(SEARCH_TABLES)} in {time.perf_counter() - start:.2f}s.")
+        else:
+            check_search_index(conn)
+            print(f"{', '.join(SEARCH_TABLES)} match their tables.")
+    except sqlite3.Error as e:
+        print(f"Search index {options.command} failed: {e}")
+        if options.command == "check":
+            print("Run `python search_index.py rebuild` to rebuild the indexes.")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
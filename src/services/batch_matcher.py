@@ -0,0 +1,110 @@
+# services/batch_matcher.py
+import asyncio
+import threading
+
+
+class BatchMatcher:
+    """
+    Background matcher that groups learners' new requests into micro-batches.
+
+    Request IDs submitted from the UI are queued on an asyncio event loop running in its own
+    daemon thread. The first request of a batch opens a window of `window_seconds`; every
+    request that arrives before it closes (up to `max_batch_size`) is matched in the same pass
+    with MatchingService.match_request_ids, so a burst of clicks costs one matching pass per
+    window and simultaneous learners no longer race for the same instructor. Matches are saved
+    and each submitter's callback is then called with its match dict, or None if no instructor
+    was found. Requests still queued when the app exits stay 'pending' for the next admin run.
+    """
+    def __init__(self, matching_service, window_seconds=0.5, max_batch_size=200, strategy="greedy"):
+        self.matching_service = matching_service
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self.strategy = strategy
+        self.batches_run = 0
+        self._loop = None
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Starts the event loop thread; called automatically by the first submit."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run_loop, args=(ready,), name="batch-matcher", daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    def stop(self, timeout=None):
+        """Matches whatever is already queued, then stops the event loop thread."""
+        with self._lock:
+            if not self._thread:
+                return
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, request_id, callback=None):
+        """Queues a request for the next batch. Safe to call from any thread."""
+        self.start()
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (request_id, callback))
+
+    def _run_loop(self, ready):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        ready.set()
+        try:
+            self._loop.run_until_complete(self._collect())
+        finally:
+            self._loop.close()
+
+    async def _collect(self):
+        """Waits for a request, gathers more until the window closes, then matches the batch."""
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = self._loop.time() + self.window_seconds
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._process(batch)
+        # Anything submitted right before stop() still gets an answer.
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                await self._process([item])
+
+    async def _process(self, batch):
+        # The database work runs off the loop thread, so new submissions keep queueing meanwhile.
+        results = await asyncio.to_thread(self._match_and_assign, [request_id for request_id, _ in batch])
+        self.batches_run += 1
+        for request_id, callback in batch:
+            if callback is None:
+                continue
+            try:
+                callback(results.get(request_id))
+            except Exception as e:
+                print(f"Error notifying request {request_id}: {e}")
+
+    def _match_and_assign(self, request_ids):
+        """Matches one batch and saves its assignments in one transaction; returns {reqId: match}."""
+        try:
+            matches = self.matching_service.match_request_ids(request_ids, self.strategy, assign=True)
+        except Exception as e:
+            print(f"Error matching batch of {len(request_ids)} requests: {e}")
+            return {}
+        return {match['request']['reqId']: match for match in matches}
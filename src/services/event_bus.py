@@ -0,0 +1,41 @@
+# services/event_bus.py
+
+# Events published to a user's topic.
+MESSAGE_CREATED = "message.created"
+REQUEST_MATCHED = "request.matched"
+
+
+def user_topic(user_id, event):
+    """Returns the pub/sub topic on which `event`s for one user are published."""
+    return f"user/{int(user_id)}/{event}"
+
+
+class EventBus:
+    """
+    Per-user notifications between the open sessions of the app, built on Flet's page.pubsub.
+
+    Every session's page.pubsub is a client of the same in-process hub, which keeps its
+    subscribers indexed by topic. A user's sessions subscribe to that user's topics when they
+    log in, so publishing an event reaches only those sessions: fan-out costs O(subscribers of
+    the topic), however many other sessions are connected. Flet runs the handlers on its thread
+    pool and drops a session's subscriptions when the session closes.
+    """
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+        self._topics = set()
+
+    def publish(self, user_id, event, payload):
+        """Delivers payload to every handler subscribed to `event` for user_id; returns at once."""
+        self.pubsub.send_all_on_topic(user_topic(user_id, event), payload)
+
+    def subscribe(self, user_id, event, handler):
+        """Calls handler(payload) for each `event` published for user_id, until unsubscribe_all."""
+        topic = user_topic(user_id, event)
+        self.pubsub.subscribe_topic(topic, lambda _topic, payload: handler(payload))
+        self._topics.add(topic)
+
+    def unsubscribe_all(self):
+        """Removes this session's subscriptions, e.g. when its user logs out."""
+        for topic in self._topics:
+            self.pubsub.unsubscribe_topic(topic)
+        self._topics.clear()
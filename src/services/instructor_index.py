@@ -0,0 +1,62 @@
+# services/instructor_index.py
+from models.request import DAYS_OF_WEEK
+
+
+def day_to_mask(day):
+    """Returns the 7-bit mask for a day name, or 0 if the day is not recognised."""
+    try:
+        return 1 << DAYS_OF_WEEK.index(day)
+    except ValueError:
+        return 0
+
+
+class InstructorIndex:
+    """
+    In-memory snapshot of every instructor's skills and weekly availability.
+    Built once per matching run with two bulk queries, so that the skill and
+    day checks become bitwise operations instead of a database round trip per pair.
+    """
+    def __init__(self, instructors, skill_rows, availability_rows):
+        self.instructors = list(instructors)
+        self.positions = {instructor['userId']: position for position, instructor in enumerate(self.instructors)}
+        self.by_id = {instructor['userId']: instructor for instructor in self.instructors}
+        self.availability_rows = list(availability_rows)
+        self.skill_masks = {}
+        self.day_masks = {}
+
+        for row in skill_rows:
+            instructor_id = row['instructorID']
+            self.skill_masks[instructor_id] = self.skill_masks.get(instructor_id, 0) | (1 << row['skillID'])
+
+        for row in self.availability_rows:
+            instructor_id = row['instructorID']
+            self.day_masks[instructor_id] = self.day_masks.get(instructor_id, 0) | day_to_mask(row['day'])
+
+    @classmethod
+    def build(cls, user_model):
+        """Loads all instructors, their skills and their availability from the User model."""
+        return cls(
+            user_model.get_all_instructors(),
+            user_model.get_all_instructor_skills(),
+            user_model.get_all_instructor_availability()
+        )
+
+    @classmethod
+    def from_masks(cls, instructors, skill_masks, day_masks):
+        """Rebuilds an index from masks that were already computed (e.g. inside a worker process)."""
+        index = cls(instructors, (), ())
+        index.skill_masks = dict(skill_masks)
+        index.day_masks = dict(day_masks)
+        return index
+
+    def skill_mask(self, instructor_id):
+        return self.skill_masks.get(instructor_id, 0)
+
+    def day_mask(self, instructor_id):
+        return self.day_masks.get(instructor_id, 0)
+
+    def can_teach(self, instructor_id, required_mask, day_bit):
+        """True if the instructor has every required skill and is available on the requested day."""
+        if not day_bit:
+            return False
+        return (required_mask & ~self.skill_mask(instructor_id)) == 0 and (self.day_mask(instructor_id) & day_bit) != 0
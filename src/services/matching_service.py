@@ -1,14 +1,112 @@
 # services/matching_service.py
 from math import radians, cos, sin, asin, sqrt
-from datetime import datetime
+import functools
+import threading
+import time
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+from models.skill import MAX_SKILL_ID, OVERSIZED_MASK, skills_to_mask
+from services.instructor_index import InstructorIndex, DAYS_OF_WEEK, day_to_mask
+from services.slot_book import SlotBook
+from services.spatial_index import SpatialGrid
+
+MATCHING_STRATEGIES = ("greedy", "optimal")
+# Instructors this far away or further earn no proximity points.
+MAX_MATCH_DISTANCE_KM = 50
+
+def _synchronized(method):
+    """Runs a MatchingService method while holding the service's lock."""
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return locked
+
+def _match_day_shard(requests, instructors, skill_masks, day_masks, slots=None):
+    """
+    Process-pool worker for parallel matching: runs the greedy batch matcher over the requests
+    of a single requestDay and returns (reqId, instructor userId, score) tuples.
+    """
+    index = InstructorIndex.from_masks(instructors, skill_masks, day_masks)
+    matches = MatchingService(None, None)._match_batch(requests, instructors, index, slots)
+    return [(m['request']['reqId'], m['instructor']['userId'], m['score']) for m in matches]
 
 class MatchingService:
     """
-    Handles the logic for matching learners with instructors using a greedy algorithm.
+    Handles the logic for matching learners with instructors, either with a greedy
+    first-come algorithm or as a globally optimal assignment. Instructors either take one
+    learner per run or, given a session length, one learner per free session slot.
+    The app shares one service between all sessions, so the methods that read or change the
+    warm index, the slot book or the spatial index take turns on a lock.
     """
-    def __init__(self, user_model, request_model):
+    def __init__(self, user_model, request_model, cache_ttl=300, session_minutes=None):
         self.user_model = user_model
         self.request_model = request_model
+        # With a session length, instructors take as many learners as their weekly hours allow;
+        # without one, each instructor is matched at most once per run.
+        self.session_minutes = session_minutes
+        # Kept across runs and updated incrementally as instructors register or move.
+        self.spatial_index = SpatialGrid()
+        # Warm instructor index reused by single-request matching; refreshed by every full build.
+        self.cache_ttl = cache_ttl
+        self._warm_index = None
+        self._warm_slots = None
+        self._warm_index_built_at = 0.0
+        # Reentrant, since full runs rebuild the index through build_instructor_index.
+        self._lock = threading.RLock()
+
+    @_synchronized
+    def build_instructor_index(self):
+        """
+        Loads every instructor's skills and availability in bulk for one matching run,
+        together with a fresh slot book when matching by capacity.
+        """
+        index = InstructorIndex.build(self.user_model)
+        self._sync_spatial_index(index.instructors)
+        self._warm_index = index
+        self._warm_slots = self.build_slot_book(index)
+        self._warm_index_built_at = time.monotonic()
+        return index
+
+    def build_slot_book(self, index):
+        """Cuts the instructors' availability into session slots, minus those already booked; None without a session length."""
+        if self.session_minutes is None:
+            return None
+        return SlotBook(index.availability_rows, self.session_minutes, self.request_model.get_booked_slots())
+
+    @_synchronized
+    def get_warm_instructor_index(self):
+        """Returns the cached instructor index, rebuilding it if it is missing or older than cache_ttl seconds."""
+        if self._warm_index is None or time.monotonic() - self._warm_index_built_at > self.cache_ttl:
+            return self.build_instructor_index()
+        return self._warm_index
+
+    @_synchronized
+    def invalidate_instructor_cache(self):
+        """Forces the next single-request match to reload instructors (e.g. after one registers)."""
+        self._warm_index = None
+
+    @_synchronized
+    def update_instructor_location(self, instructor_id, lat, lon):
+        """Inserts or moves a single instructor in the spatial index (e.g. after registration)."""
+        self.spatial_index.insert(instructor_id, lat, lon)
+
+    def _sync_spatial_index(self, instructors):
+        """Applies only the inserts, moves and removals needed to match the current instructor list."""
+        current = set()
+        for instructor in instructors:
+            instructor_id = instructor['userId']
+            current.add(instructor_id)
+            location = (instructor['userLat'], instructor['userLong'])
+            if instructor_id not in self.spatial_index or self.spatial_index.location(instructor_id) != location:
+                self.spatial_index.insert(instructor_id, *location)
+        if len(self.spatial_index) != len(current):
+            for instructor_id in list(self.spatial_index.points) + list(self.spatial_index.unlocated):
+                if instructor_id not in current:
+                    self.spatial_index.remove(instructor_id)
 
     def _haversine_distance(self, lon1, lat1, lon2, lat2):
         """
@@ -29,84 +127,640 @@ class MatchingService:
         r = 6371 # Radius of earth in kilometers.
         return c * r
 
-    def _calculate_match_score(self, request, required_skills, instructor):
+    def _calculate_match_score(self, request, required_mask, instructor, index):
         """
         Calculates a compatibility score. Higher is better. Returns -1 if incompatible.
         """
-        # 1. Skill Check (Essential)
-        instructor_skills = set(self.user_model.get_instructor_skills(instructor['userId']))
-        if not required_skills.issubset(instructor_skills):
-            return -1
-
-        # 2. Availability Check (Essential)
-        # The request now provides the day of the week directly.
-        request_day_of_week = request.get('requestDay')
-        if not request_day_of_week:
-            return -1
-
-        instructor_availability = self.user_model.get_instructor_availability(instructor['userId'])
-        if not any(avail['day'] == request_day_of_week for avail in instructor_availability):
+        # 1. Skill and Availability Checks (Essential)
+        # Both are answered from the preloaded index with bitwise operations.
+        # The request provides the day of the week directly.
+        request_day_bit = day_to_mask(request.get('requestDay'))
+        if not index.can_teach(instructor['userId'], required_mask, request_day_bit):
             return -1
 
-        # 3. Proximity Score (Bonus)
+        # 2. Proximity Score (Bonus)
         distance = self._haversine_distance(
             request['userLong'], request['userLat'],
             instructor['userLong'], instructor['userLat']
         )
         
         # Normalize distance: 100 points for 0km, 0 points for 50km or more.
-        max_dist = 50 
+        max_dist = MAX_MATCH_DISTANCE_KM
         proximity_score = max(0, 100 * (1 - (distance / max_dist)))
         
         return proximity_score
 
-    def _find_best_instructor_for_request(self, request, available_instructors):
-        """Finds the single best instructor for a given request from a list of available instructors."""
+    def _find_best_instructor_for_request(self, request, available_instructors, index=None):
+        """
+        Finds the single best instructor for a given request from a list of available instructors.
+        An InstructorIndex from the current matching run should be passed in; one is built if omitted.
+        """
         best_instructor = None
         best_score = -1
 
         try:
-            required_skills = set(map(int, request['reqSkills'].split(',')))
+            required_mask = self._required_mask(request)
         except (ValueError, AttributeError):
             return None, -1 # Skip request if skills are malformed
 
+        if index is None:
+            index = self.build_instructor_index()
+
         for instructor in available_instructors:
-            score = self._calculate_match_score(request, required_skills, instructor)
+            score = self._calculate_match_score(request, required_mask, instructor, index)
             if score > best_score:
                 best_score = score
                 best_instructor = instructor
         
         return best_instructor, best_score
 
-    def match_requests(self, single_request_id=None):
+    def _find_best_nearby_instructor(self, request, available, index, slots=None):
+        """
+        Same result as _find_best_instructor_for_request, but only scores the instructors the
+        spatial index places within MAX_MATCH_DISTANCE_KM of the learner. `available` maps
+        instructor IDs to rows; ties go to the instructor listed first in the index.
+        With a slot book, instructors without a free slot on the requested day are skipped.
+
+        Every feasible instructor beyond that radius scores 0, so if nobody nearby scores above 0
+        (always the case for learners with no location) the first feasible available instructor is taken.
+        """
+        try:
+            required_mask = self._required_mask(request)
+        except (ValueError, AttributeError):
+            return None, -1 # Skip request if skills are malformed
+
+        day = request.get('requestDay')
+        best_instructor = None
+        best_score = 0
+        best_position = None
+        nearby = self.spatial_index.query_radius(request['userLat'], request['userLong'], MAX_MATCH_DISTANCE_KM)
+        for instructor_id in nearby:
+            instructor = available.get(instructor_id)
+            if instructor is None or (slots and not slots.has_free_slot(instructor_id, day)):
+                continue
+            score = self._calculate_match_score(request, required_mask, instructor, index)
+            position = index.positions[instructor_id]
+            if score > best_score or (score > 0 and score == best_score and position < best_position):
+                best_instructor, best_score, best_position = instructor, score, position
+
+        if best_instructor:
+            return best_instructor, best_score
+
+        # Fallback: nobody nearby, so only the skill and day checks decide.
+        request_day_bit = day_to_mask(day)
+        for instructor_id, instructor in available.items():
+            if slots and not slots.has_free_slot(instructor_id, day):
+                continue
+            if index.can_teach(instructor_id, required_mask, request_day_bit):
+                return instructor, self._calculate_match_score(request, required_mask, instructor, index)
+        return None, -1
+
+    @_synchronized
+    def top_k(self, request, k=5):
+        """
+        Returns up to k compatible instructors for a request, best first, with distance_km (None
+        without locations) and, when matching by capacity, free_slots on the requested day. Every
+        candidate teaches all the requested skills on the requested day, so those are not reported.
+
+        Candidates come from the warm instructor index. Only instructors within MAX_MATCH_DISTANCE_KM
+        are scored, and a bounded heap keeps the best k. Everyone further away scores 0, so any places
+        left are filled with the first compatible instructors in index order. Nothing is booked.
+        """
+        try:
+            required_mask = self._required_mask(request)
+        except (ValueError, AttributeError):
+            return []
+        if k <= 0:
+            return []
+
+        index = self.get_warm_instructor_index()
+        slots = self._warm_slots
+        day = request.get('requestDay')
+        request_day_bit = day_to_mask(day)
+
+        def is_candidate(instructor_id):
+            if slots and not slots.has_free_slot(instructor_id, day):
+                return False
+            return index.can_teach(instructor_id, required_mask, request_day_bit)
+
+        scored = []
+        nearby = self.spatial_index.query_radius(request.get('userLat'), request.get('userLong'), MAX_MATCH_DISTANCE_KM)
+        for instructor_id in nearby:
+            if instructor_id in index.by_id and is_candidate(instructor_id):
+                score = self._calculate_match_score(request, required_mask, index.by_id[instructor_id], index)
+                if score > 0:
+                    scored.append((score, -index.positions[instructor_id], instructor_id))
+        best = [(score, instructor_id) for score, _, instructor_id in heapq.nlargest(k, scored)]
+
+        if len(best) < k:
+            chosen = {instructor_id for _, instructor_id in best}
+            for instructor in index.instructors:
+                instructor_id = instructor['userId']
+                if instructor_id not in chosen and is_candidate(instructor_id):
+                    best.append((0, instructor_id))
+                    if len(best) == k:
+                        break
+
+        recommendations = []
+        for score, instructor_id in best:
+            instructor = index.by_id[instructor_id]
+            distance = self._haversine_distance(
+                request.get('userLong'), request.get('userLat'), instructor['userLong'], instructor['userLat']
+            )
+            recommendations.append({
+                'instructor': instructor,
+                'score': score,
+                'distance_km': distance if distance != float('inf') else None,
+                'free_slots': slots.free_count(instructor_id, day) if slots else None,
+            })
+        return recommendations
+
+    # --- Batch (vectorized) scoring ---
+    @staticmethod
+    def _coordinate_arrays(rows):
+        """Returns (lat, lon) float arrays for a list of rows; missing locations become NaN."""
+        lat = np.array([row['userLat'] for row in rows], dtype=float)
+        lon = np.array([row['userLong'] for row in rows], dtype=float)
+        return lat, lon
+
+    @staticmethod
+    def _mask_array(masks, widest=0):
+        """
+        Packs skill bitmasks into an int64 array, or an array of Python ints when a mask, or the
+        `widest` one it will be combined with, needs more than 63 bits (skill IDs above MAX_SKILL_ID).
+        """
+        if max(max(masks, default=0), widest).bit_length() <= MAX_SKILL_ID + 1:
+            return np.array(masks, dtype=np.int64)
+        return np.array(masks, dtype=object)
+
+    @staticmethod
+    def _haversine_terms(req_lat, req_lon, inst_lat, inst_lon):
+        """
+        Returns the (requests x instructors) matrix of the haversine term
+        a = sin(dlat/2)^2 + cos(lat1)cos(lat2)sin(dlon/2)^2; pairs with a missing location are NaN.
+        The half-angle differences are expanded with sin(x - y) = sin(x)cos(y) - cos(x)sin(y),
+        so trigonometric functions are evaluated once per point instead of once per pair.
+        """
+        half_lat1 = np.radians(req_lat)[:, None] / 2
+        half_lon1 = np.radians(req_lon)[:, None] / 2
+        half_lat2 = np.radians(inst_lat)[None, :] / 2
+        half_lon2 = np.radians(inst_lon)[None, :] / 2
+
+        sin_dlat = np.sin(half_lat2) * np.cos(half_lat1) - np.cos(half_lat2) * np.sin(half_lat1)
+        sin_dlon = np.sin(half_lon2) * np.cos(half_lon1) - np.cos(half_lon2) * np.sin(half_lon1)
+        cos_lat = np.cos(2 * half_lat1) * np.cos(2 * half_lat2)
+
+        a = sin_dlat ** 2 + cos_lat * sin_dlon ** 2
+        return np.clip(a, 0, 1, out=a)
+
+    @classmethod
+    def _haversine_matrix(cls, req_lat, req_lon, inst_lat, inst_lon):
+        """
+        Vectorized version of _haversine_distance: returns the (requests x instructors)
+        distance matrix in kilometers. Pairs with a missing location are infinitely far apart.
+        """
+        distance = 2 * np.arcsin(np.sqrt(cls._haversine_terms(req_lat, req_lon, inst_lat, inst_lon))) * 6371
+        distance[np.isnan(distance)] = np.inf
+        return distance
+
+    @staticmethod
+    def _required_mask(request):
+        """
+        Returns the request's required skills as a bitmask: the stored skillMask column when the
+        row has one, otherwise parsed from reqSkills (e.g. an unsaved request from the UI, or one
+        whose skill IDs do not fit in the stored mask).
+        Raises ValueError or AttributeError if the skills are malformed.
+        """
+        mask = request.get('skillMask')
+        if mask and mask != OVERSIZED_MASK:
+            return mask
+        return skills_to_mask(map(int, request['reqSkills'].split(',')))
+
+    @classmethod
+    def _request_profile(cls, request):
+        """Returns (required skill mask, day bit) for a request, or None if its skills are malformed."""
+        try:
+            required_mask = cls._required_mask(request)
+        except (ValueError, AttributeError):
+            return None
+        return required_mask, day_to_mask(request.get('requestDay'))
+
+    def _score_blocks(self, requests, instructors, index, block_size=256):
+        """
+        Scores every request against every instructor in one vectorized pass per block of requests.
+        Yields (first_row, scores) where scores[i, j] equals
+        _calculate_match_score(requests[first_row + i], ..., instructors[j], index).
+        Blocking keeps memory bounded for large backlogs.
+        """
+        inst_lat, inst_lon = self._coordinate_arrays(instructors)
+        inst_ids = [instructor['userId'] for instructor in instructors]
+        inst_days = np.array([index.day_mask(i) for i in inst_ids], dtype=np.int64)
+
+        # 1. Skill and Availability Checks (Essential)
+        # Requests share a handful of (skills, day) profiles, so feasibility is computed
+        # once per distinct profile and then gathered into each block.
+        profiles = {}
+        profile_rows = np.array([profiles.setdefault(self._request_profile(r), len(profiles)) for r in requests], dtype=np.intp)
+        widest_request = max((profile[0] for profile in profiles if profile), default=0)
+        inst_skills = self._mask_array([index.skill_mask(i) for i in inst_ids], widest_request)
+        profile_feasible = np.zeros((len(profiles), len(instructors)), dtype=bool)
+        for profile, row in profiles.items():
+            if profile is None or not profile[1]:
+                continue # Malformed skills or unknown day never match, as in the scalar path
+            required_mask, day_bit = profile
+            profile_feasible[row] = ((required_mask & ~inst_skills) == 0) & ((inst_days & day_bit) != 0)
+
+        # 2. Proximity Score (Bonus)
+        # Only pairs closer than 50 km (a < sin^2(50 / 2R)) can score above 0,
+        # so the arcsin is evaluated for those pairs alone.
+        near_threshold = sin(MAX_MATCH_DISTANCE_KM / (2 * 6371)) ** 2
+
+        for start in range(0, len(requests), block_size):
+            block = requests[start:start + block_size]
+            feasible = profile_feasible[profile_rows[start:start + block_size]]
+
+            req_lat, req_lon = self._coordinate_arrays(block)
+            a = self._haversine_terms(req_lat, req_lon, inst_lat, inst_lon)
+            near = feasible & (a < near_threshold)
+
+            scores = np.where(feasible, 0.0, -1.0)
+            distance = 2 * np.arcsin(np.sqrt(a[near])) * 6371
+            scores[near] = np.maximum(0, 100 * (1 - distance / MAX_MATCH_DISTANCE_KM))
+            yield start, scores
+
+    def score_matrix(self, requests, instructors, index):
+        """Returns the full (requests x instructors) score matrix, with -1 for incompatible pairs."""
+        scores = np.empty((len(requests), len(instructors)), dtype=float)
+        for start, block in self._score_blocks(requests, instructors, index):
+            scores[start:start + len(block)] = block
+        return scores
+
+    def _match_batch(self, requests, instructors, index, slots=None):
+        """
+        Greedy matching driven by the vectorized score matrix; same result as the scalar loop.
+        Remaining capacity is tracked as a (day x instructor) count matrix: without a slot book
+        every instructor has one match for the whole run, with one it holds their free slots per day.
+        """
+        ids = [instructor['userId'] for instructor in instructors]
+        if slots is None:
+            free = np.ones((len(DAYS_OF_WEEK), len(instructors)), dtype=np.int64)
+        else:
+            free = np.array([[slots.free_count(i, day) for i in ids] for day in DAYS_OF_WEEK], dtype=np.int64).reshape(len(DAYS_OF_WEEK), len(ids))
+
+        matches = []
+        for start, block in self._score_blocks(requests, instructors, index):
+            for offset, row in enumerate(block):
+                request = requests[start + offset]
+                day = request.get('requestDay')
+                if day not in DAYS_OF_WEEK:
+                    continue # Unknown days never match
+                day_row = DAYS_OF_WEEK.index(day)
+                row[free[day_row] == 0] = -np.inf
+                best = int(np.argmax(row))
+                if row[best] > -1:
+                    match = {
+                        'request': request,
+                        'instructor': instructors[best],
+                        'score': float(row[best])
+                    }
+                    if slots is None:
+                        free[:, best] = 0
+                    else:
+                        free[day_row, best] -= 1
+                        match['slot'] = slots.book(ids[best], day)
+                    matches.append(match)
+            if not free.any():
+                break
+        return matches
+
+    @staticmethod
+    def _solve_assignment(n_rows, n_cols, rows, cols, scores):
+        """
+        Maximum-weight assignment of rows (requests) to columns over the given edges, with scores in [0, 100].
+        The number of assigned rows is maximised first and the total score second.
+        Returns (column per row or -1, score per row or NaN).
+
+        Each row also gets a private "unmatched" column so a full matching always exists;
+        the problem is then handed to SciPy's sparse LAPJV solver as a min-cost assignment.
+        """
+        # Sorted row-major, so each chosen pair's score can be found again by binary search.
+        edge_order = np.lexsort((cols, rows))
+        rows, cols, scores = rows[edge_order], cols[edge_order], scores[edge_order]
+
+        # A real match costs 101 - score (kept strictly positive, since the solver ignores
+        # zero-weight entries). Leaving a row unmatched costs more than any possible difference
+        # in total score, which makes the match count the primary objective.
+        match_cost = 101.0
+        unmatched_cost = match_cost + 100.0 * min(n_rows, n_cols) + 1
+        biadjacency = csr_matrix(
+            (
+                np.concatenate([match_cost - scores, np.full(n_rows, unmatched_cost)]),
+                (np.concatenate([rows, np.arange(n_rows)]), np.concatenate([cols, n_cols + np.arange(n_rows)]))
+            ),
+            shape=(n_rows, n_cols + n_rows)
+        )
+        _, assigned = min_weight_full_bipartite_matching(biadjacency)
+
+        assigned = np.where(assigned < n_cols, assigned, -1)
+        chosen_scores = np.full(n_rows, np.nan)
+        matched_rows = np.flatnonzero(assigned >= 0)
+        edge_keys = rows.astype(np.int64) * n_cols + cols
+        chosen = np.searchsorted(edge_keys, matched_rows.astype(np.int64) * n_cols + assigned[matched_rows])
+        chosen_scores[matched_rows] = scores[chosen]
+        return assigned, chosen_scores
+
+    def _match_optimal(self, requests, instructors, index, slots=None):
+        """
+        Solves the run as a maximum-weight bipartite matching over the feasible pairs.
+        The number of matches is maximised first and the total score second, so an early
+        request can no longer take the only instructor a later request could use.
+        With a slot book the run is solved per day instead (see _match_optimal_by_capacity).
+        """
+        if slots is not None:
+            return self._match_optimal_by_capacity(requests, instructors, index, slots)
+        if not requests:
+            return []
+
+        rows, cols, scores = [], [], []
+        for start, block in self._score_blocks(requests, instructors, index):
+            block_rows, block_cols = np.nonzero(block >= 0)
+            rows.append(block_rows + start)
+            cols.append(block_cols)
+            scores.append(block[block_rows, block_cols])
+
+        assigned, chosen_scores = self._solve_assignment(
+            len(requests), len(instructors), np.concatenate(rows), np.concatenate(cols), np.concatenate(scores)
+        )
+        return [
+            {'request': requests[row], 'instructor': instructors[assigned[row]], 'score': float(chosen_scores[row])}
+            for row in np.flatnonzero(assigned >= 0)
+        ]
+
+    def _match_optimal_by_capacity(self, requests, instructors, index, slots):
+        """
+        Optimal matching when instructors have several session slots per day.
+        Slots belong to a single day, so every requestDay is an independent problem. Each instructor
+        with k free slots on that day becomes k identical columns.
+
+        To keep the graph small, each request only keeps its best feasible instructors until their
+        combined free slots cover every request of the day. This loses nothing: in any assignment
+        that uses a dropped instructor, one of the kept (higher scoring) instructors still has a free slot.
+        """
+        order = {id(request): position for position, request in enumerate(requests)}
+        matches = []
+        for day in DAYS_OF_WEEK:
+            day_requests = [request for request in requests if request.get('requestDay') == day]
+            day_bit = day_to_mask(day)
+            day_instructors = [
+                instructor for instructor in instructors
+                if index.day_mask(instructor['userId']) & day_bit and slots.has_free_slot(instructor['userId'], day)
+            ]
+            if not day_requests or not day_instructors:
+                continue
+            n_day = len(day_requests)
+            capacity = np.array([slots.free_count(i['userId'], day) for i in day_instructors], dtype=np.int64)
+
+            rows, owners, scores = [], [], []
+            for start, block in self._score_blocks(day_requests, day_instructors, index):
+                by_score = np.argsort(-block, axis=1, kind='stable')
+                sorted_scores = np.take_along_axis(block, by_score, axis=1)
+                sorted_capacity = np.where(sorted_scores >= 0, capacity[by_score], 0)
+                slots_before = np.cumsum(sorted_capacity, axis=1) - sorted_capacity
+                keep_rows, keep_ranks = np.nonzero((sorted_scores >= 0) & (slots_before < n_day))
+                rows.append(keep_rows + start)
+                owners.append(by_score[keep_rows, keep_ranks])
+                scores.append(sorted_scores[keep_rows, keep_ranks])
+            rows, owners, scores = np.concatenate(rows), np.concatenate(owners), np.concatenate(scores)
+            if not len(rows):
+                continue
+
+            # One column per usable slot: never more copies than requests that kept the instructor.
+            copies = np.minimum(capacity, np.bincount(owners, minlength=len(day_instructors)))
+            first_column = np.cumsum(copies) - copies
+            repeats = copies[owners]
+            edge_start = np.cumsum(repeats) - repeats
+            cols = np.repeat(first_column[owners], repeats) + (np.arange(repeats.sum()) - np.repeat(edge_start, repeats))
+            column_owner = np.repeat(np.arange(len(day_instructors)), copies)
+
+            assigned, chosen_scores = self._solve_assignment(
+                n_day, int(copies.sum()), np.repeat(rows, repeats), cols, np.repeat(scores, repeats)
+            )
+            for row in np.flatnonzero(assigned >= 0):
+                instructor = day_instructors[column_owner[assigned[row]]]
+                matches.append({
+                    'request': day_requests[row],
+                    'instructor': instructor,
+                    'score': float(chosen_scores[row]),
+                    'slot': slots.book(instructor['userId'], day)
+                })
+
+        matches.sort(key=lambda match: order[id(match['request'])])
+        return matches
+
+    def _match_parallel(self, requests, instructors, index, workers=None, slots=None):
+        """
+        Greedy matching with the backlog partitioned by requestDay, one shard per worker process.
+        Availability is a hard per-day constraint, so a shard only needs the instructors available
+        on its day. Without a slot book, an instructor available on several days can still be claimed
+        by several shards: the earliest request (in table order) keeps them and the other claimants
+        are re-matched against the instructors left over until no conflicts remain. Those requests
+        pick from what is left after every shard has run, not after the requests before them, so the
+        result can differ from a sequential greedy run (bench_parallel reports both totals). With a
+        slot book each shard owns its day's slots, so there is nothing to resolve.
+        """
+        order = {request['reqId']: position for position, request in enumerate(requests)}
+        by_req_id = {request['reqId']: request for request in requests}
+        shards = {}
+        for request in requests:
+            if day_to_mask(request.get('requestDay')):
+                shards.setdefault(request['requestDay'], []).append(request)
+
+        # Worker processes need plain, picklable rows.
+        plain_instructors = [
+            {'userId': i['userId'], 'userLat': i['userLat'], 'userLong': i['userLong']} for i in instructors
+        ]
+        taken = set()
+        matched = {}
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            while shards:
+                futures = {}
+                for day, shard in shards.items():
+                    day_bit = day_to_mask(day)
+                    shard_instructors = [
+                        i for i in plain_instructors
+                        if i['userId'] not in taken and index.day_mask(i['userId']) & day_bit
+                        and (slots is None or slots.has_free_slot(i['userId'], day))
+                    ]
+                    if not shard_instructors:
+                        continue
+                    ids = [i['userId'] for i in shard_instructors]
+                    futures[day] = pool.submit(
+                        _match_day_shard, shard, shard_instructors,
+                        {i: index.skill_mask(i) for i in ids}, {i: index.day_mask(i) for i in ids},
+                        slots.for_day(day, ids) if slots is not None else None
+                    )
+
+                if slots is not None:
+                    for day, future in futures.items():
+                        for req_id, instructor_id, score in future.result():
+                            matched[req_id] = (instructor_id, score, slots.book(instructor_id, day))
+                    break
+
+                claims = {}
+                for day, future in futures.items():
+                    for req_id, instructor_id, score in future.result():
+                        claims.setdefault(instructor_id, []).append((order[req_id], req_id, score, day))
+
+                shards = {}
+                for instructor_id, claimants in claims.items():
+                    claimants.sort()
+                    _, req_id, score, _ = claimants[0]
+                    matched[req_id] = (instructor_id, score, None)
+                    taken.add(instructor_id)
+                    for _, lost_req_id, _, day in claimants[1:]:
+                        shards.setdefault(day, []).append(by_req_id[lost_req_id])
+                for shard in shards.values():
+                    shard.sort(key=lambda request: order[request['reqId']])
+
+        matches = []
+        for req_id, (instructor_id, score, slot) in sorted(matched.items(), key=lambda item: order[item[0]]):
+            match = {'request': by_req_id[req_id], 'instructor': index.by_id[instructor_id], 'score': score}
+            if slots is not None:
+                match['slot'] = slot
+            matches.append(match)
+        return matches
+
+    def _run_slots(self, assign):
+        """
+        The slot book a run books into: the warm one when its matches are saved, otherwise a copy,
+        so a run whose bookings never reach the database leaves the warm book as the database has it.
+        """
+        if assign or self._warm_slots is None:
+            return self._warm_slots
+        return self._warm_slots.copy()
+
+    def _match_single(self, request_id, assign):
+        """
+        Fast path for a learner's "Find Match" click: fetches the one request by ID and scores it
+        against the warm instructor index, so latency does not grow with the pending backlog.
         """
-        Matches requests with the best available instructors using a greedy approach.
+        request = self.request_model.get_by_id(request_id)
+        if not request or request['fulfilled'] != 'pending':
+            return []
+
+        index = self.get_warm_instructor_index()
+        slots = self._run_slots(assign)
+        best_instructor, best_score = self._find_best_nearby_instructor(request, index.by_id, index, slots)
+        if not best_instructor:
+            return []
+        match = {'request': request, 'instructor': best_instructor, 'score': best_score}
+        if slots is not None:
+            # When saved, the booking stays in the warm slot book, so the next click sees this
+            # instructor's remaining capacity.
+            match['slot'] = slots.book(best_instructor['userId'], request['requestDay'])
+        return [match]
+
+    def _save_matches(self, matches, slots=None):
+        """
+        Writes a run's assignments with one bulk update, so the run commits or rolls back as a whole.
+        Matches whose request could not be assigned (no longer pending, its slot booked meanwhile
+        by another matcher, or a failed write) are dropped; the saved matches are returned. The
+        slot book then disagrees with the database, so the warm index is rebuilt on next use.
+        """
+        if not matches:
+            return matches
+        assignments = []
+        for match in matches:
+            # The booked start time is saved with the request, so later slot books keep it taken.
+            slot = match.get('slot')
+            assignments.append((match['request']['reqId'], match['instructor']['userId'], slot[0] if slot else None))
+        outcomes = self.request_model.assign_many(assignments)
+        saved = [match for match in matches if outcomes.get(match['request']['reqId'])]
+        if slots is not None and len(saved) < len(matches):
+            self.invalidate_instructor_cache()
+        return saved
+
+    @_synchronized
+    def match_request_ids(self, request_ids, strategy="greedy", assign=False):
+        """
+        Matches a group of new requests together against the warm instructor index, so that
+        requests submitted at the same moment compete in one pass instead of racing each other.
+        Requests that are no longer pending are skipped. With assign=True the matches are also
+        saved in one transaction and only the saved ones are returned.
+        """
+        if strategy not in MATCHING_STRATEGIES:
+            raise ValueError(f"Unknown matching strategy: {strategy}")
+
+        requests = [request for request in self.request_model.get_by_ids(request_ids) if request['fulfilled'] == 'pending']
+        index = self.get_warm_instructor_index()
+        if not requests or not index.instructors:
+            return []
+        slots = self._run_slots(assign)
+        if strategy == "optimal":
+            matches = self._match_optimal(requests, index.instructors, index, slots)
+        else:
+            matches = self._match_batch(requests, index.instructors, index, slots)
+        return self._save_matches(matches, slots) if assign else matches
+
+    @_synchronized
+    def match_requests(self, single_request_id=None, batch=False, strategy="greedy", parallel=False, workers=None, assign=False):
+        """
+        Matches requests with the best available instructors.
         If a specific request ID is given, it only matches that one.
+        With batch=True, scores are computed as vectorized request x instructor matrices.
+        strategy="greedy" processes requests in table order, each taking its best remaining instructor;
+        strategy="optimal" solves the whole run as a maximum-weight assignment (always vectorized).
+        parallel=True runs the greedy strategy as requestDay shards on a pool of `workers` processes.
+        When the service has a session length, each match also books a slot, returned as 'slot';
+        the warm slot book only keeps those bookings when the run is saved.
+        assign=True saves the run's assignments in a single transaction (see _save_matches) and
+        returns only the matches that were saved.
         """
+        if strategy not in MATCHING_STRATEGIES:
+            raise ValueError(f"Unknown matching strategy: {strategy}")
+
         if single_request_id:
-            # To match a single request, we need a way to fetch it by ID.
-            # Let's add a get_by_id method to the Request model.
-            # For now, we'll filter the full pending list.
-            all_pending = self.request_model.get_pending()
-            requests_to_process = [r for r in all_pending if r['reqId'] == single_request_id]
+            matches = self._match_single(single_request_id, assign)
         else:
-            requests_to_process = self.request_model.get_pending()
+            matches = self._match_pending(batch, strategy, parallel, workers, assign)
+        return self._save_matches(matches, self._warm_slots) if assign else matches
 
-        available_instructors = self.user_model.get_all_instructors()
+    def _match_pending(self, batch, strategy, parallel, workers, assign):
+        """Matches the whole pending backlog; see match_requests."""
+        requests_to_process = self.request_model.get_pending()
+
+        index = self.build_instructor_index()
+        slots = self._run_slots(assign)
+        available_instructors = list(index.instructors)
         if not available_instructors:
             return [] # No instructors to match with
 
+        if strategy == "optimal":
+            return self._match_optimal(requests_to_process, available_instructors, index, slots)
+        if parallel:
+            return self._match_parallel(requests_to_process, available_instructors, index, workers, slots)
+        if batch:
+            return self._match_batch(requests_to_process, available_instructors, index, slots)
+
+        # Keyed by instructor ID (in index order) so candidates from the spatial index can be looked up directly.
+        available = {instructor['userId']: instructor for instructor in available_instructors}
         matches = []
         for request in requests_to_process:
-            best_instructor, best_score = self._find_best_instructor_for_request(request, available_instructors)
+            best_instructor, best_score = self._find_best_nearby_instructor(request, available, index, slots)
             
             if best_instructor:
-                matches.append({
+                match = {
                     'request': request,
                     'instructor': best_instructor,
                     'score': best_score
-                })
-                # This instructor is now assigned and cannot be matched again in this run.
-                available_instructors.remove(best_instructor)
+                }
+                if slots is None:
+                    # This instructor is now assigned and cannot be matched again in this run.
+                    del available[best_instructor['userId']]
+                else:
+                    # The instructor stays available while they have free slots on other requests' days.
+                    match['slot'] = slots.book(best_instructor['userId'], request['requestDay'])
+                matches.append(match)
         
         return matches
@@ -0,0 +1,167 @@
+# services/slot_book.py
+import heapq
+from collections import Counter
+from datetime import datetime
+
+TIME_FORMATS = ("%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M%p")
+
+
+def parse_minutes(value):
+    """Parses a time of day such as '09:30' or '9:30 AM' into minutes after midnight; None if unparseable."""
+    if not value:
+        return None
+    for fmt in TIME_FORMATS:
+        try:
+            parsed = datetime.strptime(value.strip(), fmt)
+            return parsed.hour * 60 + parsed.minute
+        except ValueError:
+            continue
+    return None
+
+
+def format_minutes(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class _DaySlots:
+    """
+    Free slot starts of one instructor on one day: a min-heap for the earliest slot, and a count
+    per start time so a given slot can be checked and taken without searching the heap. Slots
+    taken by claim() stay in the heap and are skipped when they reach the top (lazy deletion).
+    """
+    __slots__ = ("heap", "free", "claimed", "size")
+
+    def __init__(self, starts=()):
+        self.heap = list(starts)
+        heapq.heapify(self.heap)
+        self.free = Counter(self.heap)
+        self.claimed = Counter()
+        self.size = len(self.heap)
+
+    def copy(self):
+        slots = _DaySlots()
+        slots.heap = list(self.heap)
+        slots.free = Counter(self.free)
+        slots.claimed = Counter(self.claimed)
+        slots.size = self.size
+        return slots
+
+    def pop(self):
+        """Removes and returns the earliest free start; the caller checks that size > 0."""
+        while True:
+            start = heapq.heappop(self.heap)
+            if self.claimed[start]:
+                self.claimed[start] -= 1
+                continue
+            self.free[start] -= 1
+            self.size -= 1
+            return start
+
+    def take(self, start):
+        """Removes a given start if it is free; True on success."""
+        if not self.free[start]:
+            return False
+        self.free[start] -= 1
+        self.claimed[start] += 1
+        self.size -= 1
+        return True
+
+    def push(self, start):
+        heapq.heappush(self.heap, start)
+        self.free[start] += 1
+        self.size += 1
+
+
+class SlotBook:
+    """
+    Bookable session slots for every instructor and weekday.
+
+    Each instructor_availability row (day, startTime, endTime) is cut into back-to-back sessions
+    of `session_minutes`. Free slot start times are kept in a min-heap per (instructor, day), with
+    a count per start time beside it, so checking for a free slot is O(1), booking the earliest
+    one or releasing one is O(log n), and booking a given start (claim) is O(1). Rows without
+    usable times count as a single untimed slot, which matches the old day-only availability.
+    `booked_slots` are the sessions already booked (see Request.get_booked_slots); each takes
+    its own start time, or the earliest free slot of its day when it has none.
+    """
+    def __init__(self, availability_rows, session_minutes, booked_slots=()):
+        self.session_minutes = session_minutes
+        self._free = {}
+        self._untimed = set()
+
+        starts = {}
+        for row in availability_rows:
+            key = (row['instructorID'], row['day'])
+            start, end = parse_minutes(row['startTime']), parse_minutes(row['endTime'])
+            slots = starts.setdefault(key, [])
+            if start is None or end is None or end <= start:
+                self._untimed.add(key)
+                slots.append(0)
+            else:
+                slots.extend(range(start, end - session_minutes + 1, session_minutes))
+        for key, slots in starts.items():
+            self._free[key] = _DaySlots(slots)
+
+        for row in booked_slots:
+            if not self.claim(row['instructorId'], row['requestDay'], row['slotStart']):
+                self.book(row['instructorId'], row['requestDay'])
+
+    def free_count(self, instructor_id, day):
+        slots = self._free.get((instructor_id, day))
+        return slots.size if slots else 0
+
+    def has_free_slot(self, instructor_id, day):
+        return self.free_count(instructor_id, day) > 0
+
+    def book(self, instructor_id, day):
+        """
+        Books the earliest free slot of an instructor on a day.
+        Returns (start, end) as 'HH:MM' strings, (None, None) for an untimed slot, or None if fully booked.
+        """
+        key = (instructor_id, day)
+        slots = self._free.get(key)
+        if not slots or not slots.size:
+            return None
+        start = slots.pop()
+        if key in self._untimed:
+            return None, None
+        return format_minutes(start), format_minutes(start + self.session_minutes)
+
+    def claim(self, instructor_id, day, start):
+        """
+        Books one specific slot by its 'HH:MM' start time. Returns False if that slot is not free
+        (already booked, or no longer in the instructor's availability).
+        """
+        key = (instructor_id, day)
+        slots = self._free.get(key)
+        if not slots:
+            return False
+        minutes = 0 if key in self._untimed else parse_minutes(start)
+        return slots.take(minutes)
+
+    def release(self, instructor_id, day, start=None):
+        """Returns a booked slot (by its 'HH:MM' start time) to the pool."""
+        key = (instructor_id, day)
+        if key not in self._free:
+            return
+        minutes = 0 if key in self._untimed else parse_minutes(start)
+        if minutes is not None:
+            self._free[key].push(minutes)
+
+    def copy(self):
+        """Returns an independent copy, e.g. to book tentatively without changing this book."""
+        book = SlotBook((), self.session_minutes)
+        book._free = {key: slots.copy() for key, slots in self._free.items()}
+        book._untimed = set(self._untimed)
+        return book
+
+    def for_day(self, day, instructor_ids):
+        """Returns a copy holding only the given instructors' slots on one day (e.g. for a worker process)."""
+        book = SlotBook((), self.session_minutes)
+        for instructor_id in instructor_ids:
+            key = (instructor_id, day)
+            if key in self._free:
+                book._free[key] = self._free[key].copy()
+                if key in self._untimed:
+                    book._untimed.add(key)
+        return book
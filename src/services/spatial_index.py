@@ -0,0 +1,91 @@
+# services/spatial_index.py
+from math import radians, degrees, cos, sin, floor, ceil, pi
+
+EARTH_RADIUS_KM = 6371
+
+
+def to_unit_vector(lat, lon):
+    """Converts latitude/longitude in degrees to a point on the unit sphere."""
+    lat, lon = radians(lat), radians(lon)
+    return cos(lat) * cos(lon), cos(lat) * sin(lon), sin(lat)
+
+
+class SpatialGrid:
+    """
+    Incremental spatial index over user locations, bucketed into a latitude/longitude grid.
+
+    Points can be inserted, moved and removed one at a time, so the index can live across
+    matching runs instead of being rebuilt. Radius queries only visit the grid cells that
+    overlap the search area and then filter exactly by chord length between 3D unit vectors.
+    Keys whose location is NULL are kept in `unlocated` and are never returned by a radius query.
+    """
+    def __init__(self, cell_deg=0.5):
+        self.cell_deg = cell_deg
+        self.lon_cells = ceil(360 / cell_deg)
+        self.cells = {}
+        self.points = {}
+        self.unlocated = set()
+
+    def __len__(self):
+        return len(self.points) + len(self.unlocated)
+
+    def __contains__(self, key):
+        return key in self.points or key in self.unlocated
+
+    def _cell(self, lat, lon):
+        return floor(lat / self.cell_deg), floor(lon / self.cell_deg) % self.lon_cells
+
+    def location(self, key):
+        """Returns the (lat, lon) stored for a key, (None, None) if it has no location."""
+        point = self.points.get(key)
+        return (point[0], point[1]) if point else (None, None)
+
+    def insert(self, key, lat, lon):
+        """Adds a key, or moves it if it is already indexed."""
+        if key in self:
+            self.remove(key)
+        if lat is None or lon is None:
+            self.unlocated.add(key)
+            return
+        cell = self._cell(lat, lon)
+        self.cells.setdefault(cell, set()).add(key)
+        self.points[key] = (lat, lon, to_unit_vector(lat, lon), cell)
+
+    def remove(self, key):
+        """Removes a key from the index; unknown keys are ignored."""
+        self.unlocated.discard(key)
+        point = self.points.pop(key, None)
+        if point:
+            bucket = self.cells[point[3]]
+            bucket.discard(key)
+            if not bucket:
+                del self.cells[point[3]]
+
+    def query_radius(self, lat, lon, radius_km):
+        """Returns the set of keys within radius_km (great-circle distance) of the given point."""
+        if lat is None or lon is None:
+            return set()
+
+        dlat = degrees(radius_km / EARTH_RADIUS_KM)
+        min_lat, max_lat = max(lat - dlat, -90), min(lat + dlat, 90)
+        widest = cos(radians(max(abs(min_lat), abs(max_lat))))
+        if widest <= 0 or dlat / widest >= 180:
+            # The search area reaches a pole or wraps the whole globe: scan every longitude.
+            lon_range = range(self.lon_cells)
+        else:
+            dlon = dlat / widest
+            lon_range = {i % self.lon_cells for i in range(floor((lon - dlon) / self.cell_deg), floor((lon + dlon) / self.cell_deg) + 1)}
+        lat_range = range(floor(min_lat / self.cell_deg), floor(max_lat / self.cell_deg) + 1)
+
+        # Great-circle distance d corresponds to a chord of 2 sin(d / 2R) on the unit sphere.
+        max_chord_sq = (2 * sin(min(radius_km / EARTH_RADIUS_KM, pi) / 2)) ** 2
+        x, y, z = to_unit_vector(lat, lon)
+
+        found = set()
+        for lat_cell in lat_range:
+            for lon_cell in lon_range:
+                for key in self.cells.get((lat_cell, lon_cell), ()):
+                    px, py, pz = self.points[key][2]
+                    if (px - x) ** 2 + (py - y) ** 2 + (pz - z) ** 2 <= max_chord_sq:
+                        found.add(key)
+        return found
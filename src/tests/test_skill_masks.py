@@ -0,0 +1,75 @@
+# tests/test_skill_masks.py
+"""
+Skill IDs above MAX_SKILL_ID do not fit in request.skillMask; requests using them must still be
+created and matched. Run from the src directory:
+    python -m unittest discover tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from benchmarks.synthetic import make_population, write_database
+from models.database import Database
+from models.request import Request
+from models.skill import MAX_SKILL_ID, OVERSIZED_MASK
+from models.user import User
+from services.matching_service import MatchingService
+
+LARGE_SKILL_ID = MAX_SKILL_ID + 38
+
+
+class LargeSkillIdTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "skills.db")
+        write_database(path, *make_population(0, 0))
+        self.db = Database(path)
+        with self.db.connect() as conn:
+            conn.execute("INSERT INTO skills (skillID, skillName) VALUES (?, 'Large skill ID test')", (LARGE_SKILL_ID,))
+            conn.execute("INSERT INTO user (userRole, userName, userPass, userEmail, userLat, userLong) VALUES ('instructor', 'teacher', 'x', 't@example.com', 14.6, 121.0)")
+            self.instructor_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            conn.executemany("INSERT INTO instructor_skills VALUES (?, ?)", [(self.instructor_id, 1), (self.instructor_id, LARGE_SKILL_ID)])
+            conn.execute("INSERT INTO instructor_availability VALUES (?, 'Monday', '09:00', '17:00')", (self.instructor_id,))
+            conn.execute("INSERT INTO user (userRole, userName, userPass, userEmail, userLat, userLong) VALUES ('learner', 'student', 'x', 's@example.com', 14.6, 121.0)")
+            self.learner_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            conn.commit()
+        self.requests = Request(self.db)
+        self.service = MatchingService(User(self.db), self.requests)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def _create_request(self):
+        req_id = self.requests.create(self.learner_id, f"1,{LARGE_SKILL_ID}", "Monday")
+        self.assertIsInstance(req_id, int)
+        self.assertEqual(self.requests.get_by_id(req_id)['skillMask'], OVERSIZED_MASK)
+        return req_id
+
+    def test_single_request_is_matched(self):
+        req_id = self._create_request()
+        matches = self.service.match_requests(single_request_id=req_id)
+        self.assertEqual([m['instructor']['userId'] for m in matches], [self.instructor_id])
+
+    def test_batch_and_optimal_runs_match(self):
+        self._create_request()
+        for options in ({'batch': True}, {'strategy': 'optimal'}):
+            matches = self.service.match_requests(**options)
+            self.assertEqual([m['instructor']['userId'] for m in matches], [self.instructor_id], options)
+
+    def test_instructor_without_the_skill_is_not_matched(self):
+        with self.db.connect() as conn:
+            conn.execute("DELETE FROM instructor_skills WHERE skillID = ?", (LARGE_SKILL_ID,))
+            conn.commit()
+        req_id = self._create_request()
+        self.assertEqual(self.service.match_requests(single_request_id=req_id), [])
+        self.assertEqual(self.service.match_requests(batch=True), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
 # view.py
+import asyncio
 import flet as ft
+import inspect
 import shutil
 import os
 import time
@@ -75,9 +77,12 @@ class View:
         self.page.update()
         
     def show_confirmation_dialog(self, title, message, on_confirm):
-        def yes_click(e):
+        async def yes_click(e):
             self._close_dialog()
-            on_confirm(e)
+            # on_confirm may be a coroutine function, e.g. one that awaits a controller handler.
+            result = on_confirm(e)
+            if inspect.isawaitable(result):
+                await result
 
         def no_click(e):
             self._close_dialog()
@@ -114,7 +119,7 @@ class View:
         self.controls['learner_reg_firstname'] = ft.TextField(label="First Name", width=150, border_color=config.C_SECONDARY)
         self.controls['learner_reg_lastname'] = ft.TextField(label="Last Name", width=150, border_color=config.C_SECONDARY)
         self.controls['learner_reg_mi'] = ft.TextField(label="M.I.", width=70, border_color=config.C_SECONDARY)
-        self.controls['learner_reg_username'] = ft.TextField(label="Username", width=380, border_color=config.C_SECONDARY, on_blur=lambda e: self.controller.check_username_availability(e.control.value))
+        self.controls['learner_reg_username'] = ft.TextField(label="Username", width=380, border_color=config.C_SECONDARY, on_blur=lambda e: self.page.run_task(self.controller.check_username_availability, e.control.value))
         self.controls['learner_reg_email'] = ft.TextField(label="Email", width=380, border_color=config.C_SECONDARY)
         self.controls['learner_reg_password'] = ft.TextField(label="Password", password=True, can_reveal_password=True, width=380, border_color=config.C_SECONDARY)
         self.controls['learner_reg_verify_password'] = ft.TextField(label="Verify Password", password=True, can_reveal_password=True, width=380, border_color=config.C_SECONDARY)
@@ -124,7 +129,7 @@ class View:
         self.controls['inst_reg_firstname'] = ft.TextField(label="First Name", width=150, border_color=config.C_SECONDARY)
         self.controls['inst_reg_lastname'] = ft.TextField(label="Last Name", width=150, border_color=config.C_SECONDARY)
         self.controls['inst_reg_mi'] = ft.TextField(label="M.I.", width=70, border_color=config.C_SECONDARY)
-        self.controls['inst_reg_username'] = ft.TextField(label="Username", width=380, border_color=config.C_SECONDARY, on_blur=lambda e: self.controller.check_username_availability(e.control.value))
+        self.controls['inst_reg_username'] = ft.TextField(label="Username", width=380, border_color=config.C_SECONDARY, on_blur=lambda e: self.page.run_task(self.controller.check_username_availability, e.control.value))
         self.controls['inst_reg_email'] = ft.TextField(label="Email", width=380, border_color=config.C_SECONDARY)
         self.controls['inst_reg_password'] = ft.TextField(label="Password", password=True, can_reveal_password=True, width=380, border_color=config.C_SECONDARY)
         self.controls['inst_reg_verify_password'] = ft.TextField(label="Verify Password", password=True, can_reveal_password=True, width=380, border_color=config.C_SECONDARY)
@@ -156,7 +161,7 @@ class View:
             ft.ElevatedButton("Apply as Instructor", on_click=lambda _: self._toggle_form('instructor'), width=300, height=50, bgcolor=config.C_SECONDARY, color="white"),
         ], spacing=15, horizontal_alignment=ft.CrossAxisAlignment.CENTER)
 
-        self.controls['login_form'] = ft.Container(visible=False, content=ft.Column([ft.Text("User Login", font_family="Oskari G2", size=32, color=config.C_ACCENT), self.controls['login_username'], self.controls['login_password'], ft.ElevatedButton("Login", on_click=lambda _: self.controller.handle_login(self.controls['login_username'].value, self.controls['login_password'].value), width=300, bgcolor=config.C_PRIMARY, color="white"), ft.TextButton("<- Back", on_click=lambda _: self._toggle_form('initial'))], spacing=15, horizontal_alignment=ft.CrossAxisAlignment.CENTER))
+        self.controls['login_form'] = ft.Container(visible=False, content=ft.Column([ft.Text("User Login", font_family="Oskari G2", size=32, color=config.C_ACCENT), self.controls['login_username'], self.controls['login_password'], ft.ElevatedButton("Login", on_click=lambda _: self.page.run_task(self.controller.handle_login, self.controls['login_username'].value, self.controls['login_password'].value), width=300, bgcolor=config.C_PRIMARY, color="white"), ft.TextButton("<- Back", on_click=lambda _: self._toggle_form('initial'))], spacing=15, horizontal_alignment=ft.CrossAxisAlignment.CENTER))
         self.controls['learner_register_form'] = ft.Container(visible=False, content=ft.Column([ft.Text("Create Learner Account", font_family="Oskari G2", size=32, color=config.C_ACCENT), ft.Row([self.controls['learner_reg_firstname'], self.controls['learner_reg_lastname'], self.controls['learner_reg_mi']], alignment=ft.MainAxisAlignment.CENTER), self.controls['learner_reg_username'], self.controls['learner_reg_email'], self.controls['learner_reg_password'], self.controls['learner_reg_verify_password'], ft.Container(self.controls['learner_reg_consent'], alignment=ft.alignment.center), ft.ElevatedButton("Register", on_click=lambda e: self._handle_register_click(e, 'learner'), width=300, bgcolor=config.C_PRIMARY, color="white"), ft.TextButton("Return to Splash Screen", on_click=lambda _: self._toggle_form('initial'))], spacing=15, horizontal_alignment=ft.CrossAxisAlignment.CENTER))
         self.controls['instructor_register_form'] = ft.Container(visible=False, content=ft.Column([ft.Text("Apply as Instructor", font_family="Oskari G2", size=32, color=config.C_ACCENT), ft.Row([self.controls['inst_reg_firstname'], self.controls['inst_reg_lastname'], self.controls['inst_reg_mi']], alignment=ft.MainAxisAlignment.CENTER), self.controls['inst_reg_username'], self.controls['inst_reg_email'], self.controls['inst_reg_password'], self.controls['inst_reg_verify_password'], ft.Row([ft.ElevatedButton("Upload Resume (PDF)", icon=ft.Icons.UPLOAD_FILE, on_click=lambda _: resume_picker.pick_files(allow_multiple=False, allowed_extensions=["pdf"])), self.controls['resume_filename']], alignment=ft.MainAxisAlignment.CENTER), ft.Container(self.controls['inst_reg_consent_teach'], alignment=ft.alignment.center), ft.Container(self.controls['inst_reg_consent_location'], alignment=ft.alignment.center), ft.ElevatedButton("Register", on_click=lambda e: self._handle_register_click(e, 'instructor'), width=300, bgcolor=config.C_PRIMARY, color="white"), ft.TextButton("Return to Splash Screen", on_click=lambda _: self._toggle_form('initial'))], spacing=15, horizontal_alignment=ft.CrossAxisAlignment.CENTER))
 
@@ -223,8 +228,8 @@ class View:
             data['resume_path'] = self.controls['resume_path'].value
 
         # Pass the dictionary to the controller
-        self.controller.handle_register(
-            **data
+        self.page.run_task(
+            self.controller.handle_register, **data
         )
     
     # --- DASHBOARD VIEWS ---
@@ -239,12 +244,15 @@ class View:
             expand=True,
         )
 
-        def on_nav_change(e):
+        async def on_nav_change(e):
             """Updates the content_area based on sidebar selection."""
             idx = e.control.selected_index
             if idx == 0:
                 # Build the matchmaking UI when "Find Instructor" is selected
-                content_area.controls = [self._build_learner_matchmaking_content()]
+                content = await self._build_learner_matchmaking_content()
+                if e.control.selected_index != idx:
+                    return  # Another page was chosen while this one was loading.
+                content_area.controls = [content]
             else:
                 # Placeholder for other pages
                 pages = {
@@ -287,6 +295,8 @@ class View:
 
     def get_instructor_view(self):
         self._setup_page()
+        # A new view starts without the request list; the matchmaking page adds it when opened.
+        self.controls.pop('pending_requests', None)
 
         # This will hold the content for the currently selected sidebar item.
         content_area = ft.Column(
@@ -296,12 +306,18 @@ class View:
             expand=True,
         )
 
-        def on_nav_change(e):
+        async def on_nav_change(e):
             """Updates the content_area based on sidebar selection."""
             idx = e.control.selected_index
+            # The request list of the page being left must not receive new requests any more.
+            self.controls.pop('pending_requests', None)
             if idx == 0:
                 # Build the matchmaking UI when "Matchmaking" is selected
-                content_area.controls = [self._build_instructor_matchmaking_content()]
+                content = await self._build_instructor_matchmaking_content()
+                if e.control.selected_index != idx:
+                    self.controls.pop('pending_requests', None)
+                    return  # Another page was chosen while this one was loading.
+                content_area.controls = [content]
             else:
                 # Placeholder for other pages
                 pages = {
@@ -342,12 +358,21 @@ class View:
         run_matching_button = ft.ElevatedButton(
             text="Run Matching Algorithm",
             icon=ft.Icons.GROUP_ADD,
-            on_click=lambda _: self.controller.handle_run_matching(),
+            on_click=lambda _: self.page.run_task(self.controller.handle_run_matching),
             bgcolor=config.C_PRIMARY,
             color="white",
             height=50,
             tooltip="Find matches for all pending learner requests."
         )
+        query_stats_button = ft.ElevatedButton(
+            text="Query Statistics",
+            icon=ft.Icons.QUERY_STATS,
+            on_click=lambda _: self.show_query_stats_dialog(),
+            bgcolor=config.C_SECONDARY,
+            color="white",
+            height=50,
+            tooltip="Show the slowest database statements and the slow-query log."
+        )
 
         # --- View Layout ---
         content = ft.Column(
@@ -356,6 +381,7 @@ class View:
                 ft.Text("Use the tools below to manage the application.", opacity=0.8),
                 ft.Divider(),
                 run_matching_button,
+                query_stats_button,
                 # You can add more admin controls here in the future
             ],
             spacing=20,
@@ -373,10 +399,55 @@ class View:
             padding=0
         )
 
-    def _build_learner_matchmaking_content(self):
+    def show_query_stats_dialog(self):
+        """Shows the statements with the most total time and the number of slow queries."""
+        stats = self.controller.get_query_stats()
+        if stats is None:
+            self.show_error_dialog("Query statistics are disabled. Set DB_QUERY_STATS = True in config.py.")
+            return
+
+        rows = [
+            ft.DataRow(cells=[
+                ft.DataCell(ft.Text(item['sql'][:70] + ("..." if len(item['sql']) > 70 else ""), size=11, tooltip=item['sql'])),
+                ft.DataCell(ft.Text(str(item['calls']))),
+                ft.DataCell(ft.Text(f"{item['total_ms']:.1f}")),
+                ft.DataCell(ft.Text(f"{item['p50_ms']:.2f} / {item['p95_ms']:.2f} / {item['p99_ms']:.2f}")),
+                ft.DataCell(ft.Text(str(item['rows']))),
+            ])
+            for item in stats['statements'][:10]
+        ]
+        self.dialog.title = ft.Text("Query Statistics", font_family="Oskari G2", color=config.C_ACCENT)
+        cache = self.controller.get_cache_stats()
+        cache_text = (
+            f"Cache: {cache['hits']} hits, {cache['misses']} misses, {cache['entries']}/{cache['max_entries']} entries."
+            if cache else "Cache: disabled."
+        )
+        self.dialog.content = ft.Column([
+            ft.Text(f"{len(stats['slow_queries'])} statement(s) slower than {stats['slow_query_ms']} ms in the slow-query log."),
+            ft.Text(cache_text, opacity=0.8),
+            ft.DataTable(
+                columns=[
+                    ft.DataColumn(ft.Text("Statement")),
+                    ft.DataColumn(ft.Text("Calls"), numeric=True),
+                    ft.DataColumn(ft.Text("Total ms"), numeric=True),
+                    ft.DataColumn(ft.Text("p50 / p95 / p99 ms")),
+                    ft.DataColumn(ft.Text("Rows"), numeric=True),
+                ],
+                rows=rows
+            ) if rows else ft.Text("No statements recorded yet.", opacity=0.6),
+        ], scroll=ft.ScrollMode.ADAPTIVE, tight=True)
+        self.dialog.actions = [
+            ft.TextButton("Export JSON", on_click=lambda _: self.page.run_task(self.controller.handle_export_query_stats)),
+            ft.TextButton("Close", on_click=lambda _: self._close_dialog())
+        ]
+        self.dialog.actions_alignment = ft.MainAxisAlignment.END
+        self.dialog.open = True
+        self.page.update()
+
+    async def _build_learner_matchmaking_content(self):
         """Builds the UI for the learner's matchmaking/find instructor page."""
         # --- Data and State ---
-        all_skills = self.controller.get_all_skills() or []
+        all_skills = await self.controller.get_all_skills() or []
         selected_skills = set()
 
         # --- UI Controls ---
@@ -393,6 +464,7 @@ class View:
                 e.control.bgcolor = None
                 e.control.label.color = None
             e.control.update()
+            self.page.run_task(show_recommendations)
 
         skill_chips = ft.Row(
             wrap=True,
@@ -411,14 +483,55 @@ class View:
             label="2. Select a Day",
             hint_text="Choose a day of the week",
             border_color=config.C_SECONDARY,
-            options=[ft.dropdown.Option(day) for day in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]]
+            options=[ft.dropdown.Option(day) for day in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]],
+            on_change=lambda _: self.page.run_task(show_recommendations)
         )
 
         results_area = ft.Column(spacing=10, horizontal_alignment=ft.CrossAxisAlignment.CENTER)
 
-        def find_match_click(e):
+        def build_recommendation_card(rec):
+            distance = rec['distance_km']
+            details = [f"{distance:.1f} km away" if distance is not None else "Location not set"]
+            if rec['free_slots'] is not None:
+                details.append(f"{rec['free_slots']} open session(s)")
+            return ft.Card(
+                elevation=2,
+                content=ft.Container(
+                    padding=10,
+                    content=ft.Row([
+                        ft.Column([
+                            ft.Text(rec['instructor']['userName'], weight=ft.FontWeight.BOLD),
+                            ft.Text(" · ".join(details), opacity=0.8, size=12),
+                        ], expand=True),
+                        ft.Text(f"{rec['score']:.0f} pts", color=config.C_ACCENT, weight=ft.FontWeight.BOLD),
+                    ])
+                )
+            )
+
+        # Counts selection changes, so results of an older selection that finish late are dropped.
+        selection_version = [0]
+
+        async def show_recommendations():
+            """Fills the results area with the best instructors for the current selection."""
+            selection_version[0] += 1
+            version = selection_version[0]
+            recommendations = None
+            if selected_skills and day_dropdown.value:
+                recommendations = await self.controller.get_instructor_recommendations(selected_skills, day_dropdown.value)
+                if version != selection_version[0]:
+                    return
+            results_area.controls.clear()
+            if recommendations is not None:
+                if recommendations:
+                    results_area.controls.append(ft.Text("Suggested Instructors", weight=ft.FontWeight.BOLD))
+                    results_area.controls.extend(build_recommendation_card(rec) for rec in recommendations)
+                else:
+                    results_area.controls.append(ft.Text("No instructors match this selection yet.", opacity=0.6))
+            self.page.update()
+
+        async def find_match_click(e):
             """Calls the controller to find an instructor based on selected criteria."""
-            self.controller.handle_find_instructor(
+            await self.controller.handle_find_instructor(
                 selected_skills=selected_skills,
                 day=day_dropdown.value
             )
@@ -443,19 +556,16 @@ class View:
             scroll=ft.ScrollMode.ADAPTIVE,
         )
 
-    def _build_instructor_matchmaking_content(self):
+    async def _build_instructor_matchmaking_content(self):
         """Builds the UI for the instructor to view and respond to requests."""
-        pending_requests = self.controller.get_pending_requests_for_instructor()
-        all_skills_dict = {skill['skillId']: skill['skillName'] for skill in self.controller.get_all_skills()}
-
-        if not pending_requests:
-            return ft.Column([
-                ft.Text("No pending matchmaking requests.", size=18, opacity=0.7)
-            ], alignment=ft.MainAxisAlignment.CENTER, horizontal_alignment=ft.CrossAxisAlignment.CENTER, expand=True)
+        pending_requests, all_skills = await asyncio.gather(
+            self.controller.get_pending_requests_for_instructor(), self.controller.get_all_skills()
+        )
+        all_skills_dict = {skill['skillId']: skill['skillName'] for skill in all_skills}
 
         def handle_response_click(e, request_id, response):
-            def on_confirm(e_inner):
-                self.controller.handle_request_response(request_id, response)
+            async def on_confirm(e_inner):
+                await self.controller.handle_request_response(request_id, response)
             
             self.show_confirmation_dialog(
                 title=f"Confirm {response.capitalize()}",
@@ -463,12 +573,13 @@ class View:
                 on_confirm=on_confirm
             )
 
-        def get_skill_names(skill_ids_str):
-            if not skill_ids_str: return "N/A"
-            return ", ".join([all_skills_dict.get(int(id), "Unknown Skill") for id in skill_ids_str.split(',')])
+        def get_skill_names(req_skills):
+            skill_ids = {int(part) for part in (req_skills or "").split(',') if part.strip().isdigit()}
+            if not skill_ids: return "N/A"
+            return ", ".join([name for skill_id, name in sorted(all_skills_dict.items()) if skill_id in skill_ids])
 
-        request_cards = [
-            ft.Card(
+        def build_request_card(req):
+            return ft.Card(
                 elevation=4,
                 content=ft.Container(
                     padding=15,
@@ -486,21 +597,57 @@ class View:
                         alignment=ft.MainAxisAlignment.SPACE_BETWEEN
                     )
                 )
-            ) for req in pending_requests
-        ]
+            )
+
+        empty_text = ft.Text("No pending matchmaking requests.", size=18, opacity=0.7)
+        request_list = ft.ListView(
+            controls=[build_request_card(req) for req in pending_requests] or [empty_text], expand=True, spacing=10
+        )
+        # Kept so requests matched while the page is open are added in place (see add_pending_request).
+        self.controls['pending_requests'] = (request_list, build_request_card, empty_text)
 
         return ft.Column(
             [
                 ft.Text("Pending Learner Requests", size=22, weight=ft.FontWeight.BOLD, color=config.C_ACCENT),
                 ft.Text("Accept a request to open a direct message channel and schedule a session.", opacity=0.8),
                 ft.Divider(height=20),
-                ft.ListView(controls=request_cards, expand=True, spacing=10)
+                request_list
             ],
             expand=True,
             scroll=ft.ScrollMode.ADAPTIVE,
             padding=ft.padding.symmetric(horizontal=30)
         )
 
+    # --- Real-time Updates ---
+    @staticmethod
+    def _is_mounted(control):
+        """True if the control is still attached to the page."""
+        try:
+            return control.page is not None
+        except RuntimeError:
+            return False
+
+    def add_pending_request(self, request):
+        """Adds a request just matched to this instructor to the open request list, then announces it."""
+        if 'pending_requests' in self.controls:
+            request_list, build_request_card, empty_text = self.controls['pending_requests']
+            if self._is_mounted(request_list):
+                if empty_text in request_list.controls:
+                    request_list.controls.remove(empty_text)
+                request_list.controls.append(build_request_card(request))
+            else:
+                # Left behind by navigation; the list is rebuilt from the database when reopened.
+                del self.controls['pending_requests']
+        self.show_snackbar(f"New request from {request.get('learner_name') or 'a learner'} for {request['requestDay']}.", "blue")
+
+    def notify_new_message(self, message, outgoing=False):
+        """Announces a message sent to the current user, or sent by them from another session."""
+        preview = message['content'] if len(message['content']) <= 60 else message['content'][:60] + "..."
+        if outgoing:
+            self.show_snackbar(f"You (from another session): {preview}", "blue")
+        else:
+            self.show_snackbar(f"{message['senderName']}: {preview}", "blue")
+
     def _build_header(self, title):
         """Builds the standard header for dashboard views."""
         # A safety check to prevent errors if current_user is not set